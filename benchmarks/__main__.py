@@ -0,0 +1,110 @@
+"""
+Runs the benchmark suite and compares it with the stored results of the same
+machine.
+
+```sh
+python -m benchmarks                  # Run and compare with the baseline
+python -m benchmarks --save           # Run and store the results as the baseline
+python -m benchmarks -k batched.cast  # Only run matching benchmarks
+```
+
+The exit status is 1 if a tracked benchmark regressed past the threshold.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.runner import (
+    DEFAULT_THRESHOLD,
+    Result,
+    load_results,
+    machine_info,
+    machine_tag,
+    regressions,
+    run_suite,
+    save_results,
+)
+from benchmarks.suite import benchmarks
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def setup_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "-k",
+        "--filter",
+        type=str,
+        help="Only run benchmarks whose name contains this string",
+    )
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Store the results as the baseline of this machine",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        help="Fraction of ops/sec a tracked benchmark may lose before failing",
+        default=DEFAULT_THRESHOLD,
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        help="Seconds spent timing each benchmark",
+        default=0.2,
+    )
+    parser.add_argument(
+        "--results-dir",
+        type=Path,
+        help="Directory holding the machine-tagged results",
+        default=RESULTS_DIR,
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = setup_args()
+    info = machine_info()
+    path = args.results_dir / f"{machine_tag(info)}.json"
+    baseline = load_results(path)
+
+    suite = benchmarks()
+    if args.filter:
+        suite = [bench for bench in suite if args.filter in bench.name]
+
+    def report(name: str, result: Result):
+        line = (
+            f"{name:<32} {result.ops_per_sec:>12.1f} ops/s "
+            f"{result.allocations_per_op:>9.1f} allocs/op "
+            f"{result.bytes_per_op / 1024:>10.1f} KiB/op"
+        )
+        if baseline is not None and name in baseline:
+            change = result.ops_per_sec / baseline[name].ops_per_sec - 1
+            line += f" {change:>+8.1%}"
+        print(line)
+
+    print(f"Machine {machine_tag(info)} ({info['processor']})")
+    results = run_suite(suite, args.min_time, report)
+
+    if args.save:
+        if baseline is not None:
+            # Keep the results of the benchmarks which were filtered out
+            results = {**baseline, **results}
+        save_results(path, info, results)
+        print(f"Saved results to {path}")
+        return 0
+
+    if baseline is None:
+        print(f"No baseline at {path}. Run with --save to store one.")
+        return 0
+
+    slower = regressions(baseline, results, args.threshold)
+    for name, change in slower:
+        print(f"Regression: {name} changed by {change:+.1%}", file=sys.stderr)
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Compares the quantizer engines on the fixture images.
+
+Every engine quantizes the histogram of every fixture image, and is reported
+with its runtime, the memory it allocates, and the quality of its palette. The
+quality is the mean OKLab distance from every pixel to the nearest color of
+the palette, so lower is better. The `top` row is the palette the backends use
+without a quantizer, the most frequent colors of the image.
+
+```sh
+python -m benchmarks.quantizers                  # Compare every engine
+python -m benchmarks.quantizers --colors 32      # Quantize to 32 colors
+python -m benchmarks.quantizers --max-error 0.02 # Pick the fastest good engine
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.runner import Benchmark, measure
+from chroma.colors.convert import unpack_rgb
+from chroma.colors.kdtree import KDTree
+from chroma.colors.oklab import rgb_to_oklab
+from chroma.generators.quantizers import QUANTIZE_COLORS, QUANTIZERS, quantize
+from chroma.utils.palette import pixel_histogram, top_colors
+
+FIXTURES_DIR = Path(__file__).parent.parent / "tests" / "fixtures" / "images"
+
+# The engine which keeps the most frequent colors, like the backends do
+BASELINE = "top"
+
+
+@dataclass
+class Comparison:
+    image: str
+    engine: str
+    ms_per_op: float
+    kib_per_op: float
+    colors: int
+    error: float
+
+
+def palette_error(packed, counts, palette) -> float:
+    """Returns the mean OKLab distance from every pixel of a histogram to the
+    nearest color of a palette."""
+
+    tree = KDTree(rgb_to_oklab(unpack_rgb(palette)))
+    _, distances = tree.query(rgb_to_oklab(unpack_rgb(packed)))
+    counts = np.asarray(counts, dtype=np.float64)
+    return float(distances @ counts / counts.sum())
+
+
+def load_histograms(image_size: int = 256) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Returns the histogram of every fixture image, by file name."""
+
+    from chroma.generators.pillow import load_pixels
+
+    return {
+        path.name: pixel_histogram(load_pixels(path, image_size))
+        for path in sorted(FIXTURES_DIR.glob("*.jpg"))
+    }
+
+
+def _engine(name: str, n_colors: int):
+    if name == BASELINE:
+        return lambda packed, counts: top_colors(packed, counts, n_colors)
+    return lambda packed, counts: quantize(packed, counts, name, n_colors)
+
+
+def compare(
+    histograms: dict[str, tuple[np.ndarray, np.ndarray]],
+    engines: list[str],
+    n_colors: int = QUANTIZE_COLORS,
+    min_time: float = 0.2,
+) -> list[Comparison]:
+    comparisons = []
+    for image, (packed, counts) in histograms.items():
+        for name in engines:
+            run = _engine(name, n_colors)
+            result = measure(
+                Benchmark(name, setup=lambda: (packed, counts), run=run), min_time
+            )
+            palette, _ = run(packed, counts)
+            comparisons.append(
+                Comparison(
+                    image=image,
+                    engine=name,
+                    ms_per_op=1000 / result.ops_per_sec,
+                    kib_per_op=result.bytes_per_op / 1024,
+                    colors=len(palette),
+                    error=palette_error(packed, counts, palette),
+                )
+            )
+    return comparisons
+
+
+def fastest_within(comparisons: list[Comparison], max_error: float) -> str | None:
+    """Returns the engine with the lowest total runtime whose palettes all
+    stay within `max_error`, or `None` if no engine does."""
+
+    engines = {}
+    for comparison in comparisons:
+        time, worst = engines.get(comparison.engine, (0.0, 0.0))
+        engines[comparison.engine] = (
+            time + comparison.ms_per_op,
+            max(worst, comparison.error),
+        )
+
+    good = [
+        (time, name) for name, (time, worst) in engines.items() if worst <= max_error
+    ]
+    return min(good)[1] if good else None
+
+
+def setup_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.quantizers")
+    parser.add_argument(
+        "-e",
+        "--engine",
+        action="append",
+        choices=[BASELINE, *QUANTIZERS],
+        help="Only compare these engines",
+    )
+    parser.add_argument(
+        "--colors",
+        type=int,
+        help="Number of colors to quantize to",
+        default=QUANTIZE_COLORS,
+    )
+    parser.add_argument(
+        "--image-size",
+        type=int,
+        help="Image size in NxN pixels to downscale to",
+        default=256,
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        help="Seconds spent timing each engine",
+        default=0.2,
+    )
+    parser.add_argument(
+        "--max-error",
+        type=float,
+        help="Report the fastest engine whose mean OKLab error stays below this",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = setup_args()
+    engines = args.engine or [BASELINE, *QUANTIZERS]
+    histograms = load_histograms(args.image_size)
+
+    comparisons = compare(histograms, engines, args.colors, args.min_time)
+    for c in comparisons:
+        print(
+            f"{c.image:<20} {c.engine:<12} {c.ms_per_op:>9.2f} ms/op "
+            f"{c.kib_per_op:>10.1f} KiB/op {c.colors:>5} colors "
+            f"{c.error:>8.4f} error"
+        )
+
+    if args.max_error is not None:
+        engine = fastest_within(comparisons, args.max_error)
+        if engine is None:
+            print(f"No engine stays within an error of {args.max_error}")
+            return 1
+        print(f"Fastest engine within an error of {args.max_error}: {engine}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Timing, allocation tracking and result storage for the benchmark suite.
+
+Every benchmark is a function called once per operation. It is first timed in
+rounds long enough to be measured reliably, and the best round is kept, as the
+slower rounds only add noise from the rest of the machine. It is then called
+again with `tracemalloc` running, to count the memory blocks and bytes it
+allocates per call.
+
+Results are stored as JSON, one file per machine, so they are only compared
+with results from the same hardware and Python version.
+"""
+
+from __future__ import annotations
+
+import gc
+import hashlib
+import json
+import os
+import platform
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+RESULTS_VERSION = 1
+
+# The default fraction by which the ops/sec of a tracked benchmark may drop
+# before it counts as a regression
+DEFAULT_THRESHOLD = 0.25
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A single operation to measure.
+
+    `setup` builds the arguments once, outside of the timed region, and `run`
+    is called with them for every operation. Only tracked benchmarks can fail
+    a comparison, the others are informative.
+    """
+
+    name: str
+    setup: Callable[[], tuple]
+    run: Callable[..., object]
+    tracked: bool = True
+
+
+@dataclass
+class Result:
+    ops_per_sec: float
+    allocations_per_op: float
+    bytes_per_op: float
+    tracked: bool
+
+
+def machine_info() -> dict:
+    """Describes the machine the benchmarks run on."""
+
+    processor = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    processor = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+
+    return {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": processor,
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+    }
+
+
+def machine_tag(info: dict) -> str:
+    """Returns a short, file-name friendly tag identifying a machine."""
+
+    digest = hashlib.sha1(json.dumps(info, sort_keys=True).encode()).hexdigest()
+    python = ".".join(info["python"].split(".")[:2])
+    return f"{info['system']}-{info['machine']}-py{python}-{digest[:8]}".lower()
+
+
+def measure(benchmark: Benchmark, min_time: float = 0.2, rounds: int = 5) -> Result:
+    """Measures the ops/sec and the allocations per op of a benchmark."""
+
+    args = benchmark.setup()
+    run = benchmark.run
+
+    # Find a number of calls which takes at least `min_time / rounds`
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            run(*args)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / rounds:
+            break
+        calls *= 2 if elapsed == 0 else max(2, int(min_time / rounds / elapsed))
+
+    gc.disable()
+    try:
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(calls):
+                run(*args)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+
+    allocations, size = _allocations(run, args)
+    return Result(
+        ops_per_sec=calls / best,
+        allocations_per_op=allocations,
+        bytes_per_op=size,
+        tracked=benchmark.tracked,
+    )
+
+
+def _allocations(run: Callable, args: tuple, calls: int = 8) -> tuple[float, float]:
+    """Returns the mean number of blocks and bytes allocated by a call.
+
+    Blocks are counted by keeping the results of every call alive until the
+    snapshot is taken, so temporary blocks freed inside a call are left out.
+    The peak traced memory is used for the bytes instead, which includes them.
+    """
+
+    run(*args)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        kept = [run(*args) for _ in range(calls)]
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del kept
+
+    stats = after.compare_to(before, "filename")
+    blocks = sum(max(stat.count_diff, 0) for stat in stats)
+    return blocks / calls, (peak - start) / calls
+
+
+def run_suite(
+    benchmarks: list[Benchmark],
+    min_time: float = 0.2,
+    report: Callable[[str, Result], None] | None = None,
+) -> dict[str, Result]:
+    results = {}
+    for benchmark in benchmarks:
+        results[benchmark.name] = measure(benchmark, min_time)
+        if report is not None:
+            report(benchmark.name, results[benchmark.name])
+    return results
+
+
+def save_results(path: Path, info: dict, results: dict[str, Result]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "version": RESULTS_VERSION,
+        "machine": info,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": {name: asdict(result) for name, result in results.items()},
+    }
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n")
+    os.replace(tmp_path, path)
+
+
+def load_results(path: Path) -> dict[str, Result] | None:
+    """Reads stored results, or returns `None` if there are none to read."""
+
+    try:
+        document = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if document.get("version") != RESULTS_VERSION:
+        return None
+    return {name: Result(**result) for name, result in document["results"].items()}
+
+
+def regressions(
+    baseline: dict[str, Result],
+    results: dict[str, Result],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[tuple[str, float]]:
+    """Returns the tracked benchmarks slower than the baseline by more than
+    `threshold`, along with their relative change in ops/sec.
+    """
+
+    slower = []
+    for name, result in results.items():
+        if not result.tracked or name not in baseline:
+            continue
+        change = result.ops_per_sec / baseline[name].ops_per_sec - 1
+        if change < -threshold:
+            slower.append((name, change))
+    return slower
@@ -0,0 +1,153 @@
+"""
+The benchmarks of `chroma.colors`, on fixed random palettes of several sizes.
+
+Scalar benchmarks apply an operation to every color of a palette one color at
+a time, the way the generators do, while batched benchmarks apply it to a
+whole `ColorArray`. An op is one pass over the palette in both cases, so the
+two can be compared at the same size. Kernel benchmarks call the bare scalar
+conversion functions of `chroma.colors.convert` next to the `colorsys`
+functions they compete with, on the same colors.
+
+Only the benchmarks on palettes of `TRACKED_SIZE` colors or more can fail a
+comparison. The smaller ones are dominated by call overhead, and are too noisy
+to gate changes on.
+"""
+
+from __future__ import annotations
+
+import colorsys
+
+import numpy as np
+
+from benchmarks.runner import Benchmark
+from chroma.colors import ColorArray, ColorHex, ColorHSL, ColorRGB, lazy
+from chroma.colors.convert import (
+    HUE_SCALE,
+    PERCENT_SCALE,
+    hsl_to_rgb_fixed,
+    rgb_to_hsl_fixed,
+    rgb_to_hsl_fixed_array,
+)
+from chroma.utils.generator import match_color_from_hslmap
+from chroma.utils.palette import HSL_MAP
+
+SEED = 0x5EED
+SCALAR_SIZES = [16, 256]
+BATCHED_SIZES = [16, 256, 4096, 65536]
+TRACKED_SIZE = 256
+
+
+def palette(size: int) -> np.ndarray:
+    """Returns a fixed random palette of 8-bit RGB colors."""
+
+    return np.random.default_rng(SEED + size).integers(0, 256, (size, 3))
+
+
+def batched_palette(size: int, space=ColorHex) -> ColorArray:
+    return ColorArray(palette(size), ColorRGB).cast(space)
+
+
+def scalar_palette(size: int, space=ColorHex) -> list:
+    return batched_palette(size, space).to_colors()
+
+
+# Each operation maps a color, or a whole array, to a new one
+OPERATIONS = {
+    "cast_hex_hsl": (ColorHex, lambda c: c.cast(ColorHSL)),
+    "cast_hsl_rgb": (ColorHSL, lambda c: c.cast(ColorRGB)),
+    "cast_rgb_hex": (ColorRGB, lambda c: c.cast(ColorHex)),
+    "normalized": (ColorRGB, lambda c: c.normalized()),
+    "darkened": (ColorHex, lambda c: c.darkened(0.2)),
+    "lightened": (ColorHex, lambda c: c.lightened(0.2)),
+    "saturated": (ColorHSL, lambda c: c.saturated(0.2)),
+    "blended": (ColorHex, lambda c: c.blended(ColorHex("#7aa2f7"), 0.3)),
+}
+
+
+def _fixed_hsl(size: int) -> list:
+    return rgb_to_hsl_fixed_array(palette(size)).tolist()
+
+
+def _colorsys_hls(size: int) -> list:
+    # `colorsys` orders the components as (h, l, s)
+    h, s, l = (
+        rgb_to_hsl_fixed_array(palette(size))
+        / [HUE_SCALE, PERCENT_SCALE, PERCENT_SCALE]
+    ).T
+    return np.stack((h, l, s), axis=1).tolist()
+
+
+# Each kernel takes the three components of a color, built from the palette
+KERNELS = {
+    "rgb_to_hsl_fixed": (lambda size: palette(size).tolist(), rgb_to_hsl_fixed),
+    "colorsys_rgb_to_hls": (
+        lambda size: (palette(size) / 255.0).tolist(),
+        colorsys.rgb_to_hls,
+    ),
+    "hsl_to_rgb_fixed": (_fixed_hsl, hsl_to_rgb_fixed),
+    "colorsys_hls_to_rgb": (_colorsys_hls, colorsys.hls_to_rgb),
+}
+
+
+def _scalar(name: str, size: int, space, operation) -> Benchmark:
+    return Benchmark(
+        name=f"scalar.{name}[{size}]",
+        setup=lambda: (scalar_palette(size, space),),
+        run=lambda colors: [operation(color) for color in colors],
+        tracked=size >= TRACKED_SIZE,
+    )
+
+
+def _batched(name: str, size: int, space, operation) -> Benchmark:
+    return Benchmark(
+        name=f"batched.{name}[{size}]",
+        setup=lambda: (batched_palette(size, space),),
+        run=operation,
+        tracked=size >= TRACKED_SIZE,
+    )
+
+
+def _kernel(name: str, size: int, colors, kernel) -> Benchmark:
+    return Benchmark(
+        name=f"kernel.{name}[{size}]",
+        setup=lambda: (colors(size),),
+        run=lambda colors: [kernel(a, b, c) for a, b, c in colors],
+        tracked=size >= TRACKED_SIZE,
+    )
+
+
+def _lazy_chain(color):
+    # The same chain as the normal colors of the magick generator
+    mix = ColorHex("#ff8800")
+    return (
+        lazy(color)
+        .blended(mix, 0.75)
+        .saturated(0.2)
+        .darkened(0.2)
+        .blended(mix, 0.15)
+        .lightened(0.25)
+        .evaluate()
+    )
+
+
+def _match_hslmap(color):
+    return match_color_from_hslmap(color, HSL_MAP)
+
+
+def benchmarks() -> list[Benchmark]:
+    suite = []
+    for name, (space, operation) in OPERATIONS.items():
+        suite += [_scalar(name, size, space, operation) for size in SCALAR_SIZES]
+        suite += [_batched(name, size, space, operation) for size in BATCHED_SIZES]
+
+    for name, (colors, kernel) in KERNELS.items():
+        suite += [_kernel(name, size, colors, kernel) for size in SCALAR_SIZES]
+
+    suite += [
+        _scalar("lazy_chain", size, ColorHex, _lazy_chain) for size in SCALAR_SIZES
+    ]
+    # One lookup per color, like the generators classify their colors
+    suite += [
+        _scalar("match_hslmap", size, ColorHSL, _match_hslmap) for size in SCALAR_SIZES
+    ]
+    return suite
@@ -177,10 +177,11 @@ theme.gtk = {
   -- GTK additionally allows themes to set 5 extra colors as theme palettes.
   -- These can be set using the `palettes` table. In this table, you can
   -- update colors on `palette1` to `palette5` to correspond to each of the five
-  -- palettes. If left unset, they will not be present in the GTK stylesheet,
-  -- and might break some applications which rely on this. It is highly
-  -- recommended to at least create one palette, but ideally, create all five.
-  -- No default values exist for this attribute.
+  -- palettes. Palettes which are left unset are synthesized as lighter and
+  -- darker shades of the first palette which is set, going from palette1
+  -- (lightest) to palette5 (darkest). If no palette is set at all, they are
+  -- synthesized from the default Adwaita colors instead. It is recommended to
+  -- at least create one palette, ideally palette3.
   palettes = {},
 
   -- For some reason, even after setting most of the available colors, sidebars
@@ -293,6 +294,7 @@ theme.foot = {
 -- {name}: Color name (no spaces allowed)
 -- {hex}: Hexadecimal color value (with leading hashtag)
 -- {hexval}: Hexadecimal color value (without leading hashtag)
+-- {xterm256}: Index of the nearest color in the xterm-256 palette (16-255)
 ---@field format string
 -- Backups the file if it already exists at the target location if set.
 -- There usually is little reason to disable automatic backups or warnings
@@ -23,4 +23,21 @@ function lib.generated_or(theme_colors)
   end
 end
 
+---@param name string
+---@return string
+-- Returns the hex code of a named color. Every CSS color name is supported, along
+-- with an extended set of names like "charcoal" or "terracotta". Case, spaces
+-- and dashes are ignored, so "Slate Gray" is the same as "slategray".
+function lib.named(name)
+  return color_names.hex(name)
+end
+
+---@param color string
+---@return string
+-- Returns the name of the named color nearest to a hex color, as measured in a
+-- perceptual color space.
+function lib.name_of(color)
+  return color_names.nearest(color)
+end
+
 return lib
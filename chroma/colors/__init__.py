@@ -1,14 +1,21 @@
 from . import utils
 from .impl import ColorHex, ColorHSL, ColorRGB, ColorTypeHex, ColorTypeHSL, ColorTypeRGB
 from .base import Color
+from .array import ColorArray
+from .lazy import LazyColor, lazy
+from . import oklab
 
 __all__ = [
     "Color",
+    "ColorArray",
     "ColorHex",
     "ColorHSL",
     "ColorRGB",
     "ColorTypeHex",
     "ColorTypeHSL",
     "ColorTypeRGB",
+    "LazyColor",
+    "lazy",
+    "oklab",
     "utils",
 ]
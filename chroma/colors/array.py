@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from typing import Type
+
+import numpy as np
+
+from chroma.colors.base import Color
+from chroma.colors.convert import (
+    HSL_PRECISION,
+    HUE_SCALE,
+    PERCENT_SCALE,
+    format_hex,
+    hsl_to_rgb,
+    hsl_to_rgb_fixed_array,
+    pack_rgb,
+    parse_hex,
+    rgb_to_hsl,
+    rgb_to_hsl_fixed_array,
+    unpack_rgb,
+)
+from chroma.colors.impl import ColorHex, ColorHSL, ColorRGB
+
+# The maximum value of each component of a denormalized color. Dividing by
+# these normalizes a color, and multiplying by these denormalizes it.
+SCALES: dict[Type[Color], np.ndarray] = {
+    ColorRGB: np.array([255.0, 255.0, 255.0]),
+    ColorHSL: np.array([360.0, 100.0, 100.0]),
+}
+
+# The scales of a fixed-point HSL color, see `chroma.colors.convert`
+FIXED_HSL_SCALES = np.array([HUE_SCALE, PERCENT_SCALE, PERCENT_SCALE])
+
+
+class ColorArray:
+    """A batch of colors which all share the same color space.
+
+    The colors are stored as an N×3 NumPy buffer alongside a space tag, which
+    is one of `ColorHex`, `ColorRGB` or `ColorHSL`. The methods mirror the ones
+    defined by `Color`, but operate on every color at once, so entire palettes
+    or histograms can be converted without allocating a `Color` per entry.
+
+    Like the scalar colors, RGB and HSL buffers are denormalized if they hold
+    integers and normalized if they hold floats. Hex buffers always hold 8-bit
+    RGB components. The buffer is read-only, so every operation returns a new
+    array.
+    """
+
+    def __init__(self, data, space: Type[Color] = ColorRGB):
+        if space not in (ColorHex, ColorRGB, ColorHSL):
+            raise TypeError(f"Unsupported color space {space}")
+
+        array = np.array(data)
+        if array.size == 0:
+            array = array.reshape(0, 3)
+        if array.ndim != 2 or array.shape[1] != 3:
+            raise ValueError(f"Expected an array of shape (N, 3), got {array.shape}")
+
+        if array.dtype.kind in "iu":
+            limits = np.array([255, 255, 255]) if space is ColorHex else SCALES[space]
+            if (array < 0).any() or (array > limits).any():
+                raise ValueError("The color components have invalid values.")
+            array = array.astype(np.uint8 if space is ColorHex else np.int64)
+        elif array.dtype.kind == "f" and space is not ColorHex:
+            if (array < 0.0).any() or (array > 1.0).any():
+                raise ValueError("The color components have invalid values.")
+            array = array.astype(np.float64)
+        else:
+            raise TypeError(f"Unsupported component type {array.dtype}")
+
+        array.flags.writeable = False
+        self.__data = array
+        self.__space = space
+
+    @classmethod
+    def from_colors(
+        cls,
+        colors: Iterable[Color],
+        space: Type[Color] = ColorRGB,
+    ) -> ColorArray:
+        """Packs scalar colors into an array in the given color space."""
+
+        if space is ColorHex:
+            rgb = [color.cast(ColorRGB).denormalized().color for color in colors]
+            return cls(np.array(rgb, dtype=np.int64), space)
+        data = [color.cast(space).normalized().color for color in colors]
+        return cls(np.array(data, dtype=np.float64), space)
+
+    @classmethod
+    def from_hex(cls, values: Iterable[str]) -> ColorArray:
+        """Packs hex strings, with or without the leading `#`, into an array.
+
+        The values are parsed in bulk by `parse_hex()`, so a `TypeError` with
+        the index of the first malformed color is raised if any are invalid.
+        """
+
+        return cls(unpack_rgb(parse_hex(values)), ColorHex)
+
+    @property
+    def data(self) -> np.ndarray:
+        return self.__data
+
+    @property
+    def space(self) -> Type[Color]:
+        return self.__space
+
+    @property
+    def color(self) -> np.ndarray | list[str]:
+        if self.__space is ColorHex:
+            return format_hex(pack_rgb(self.__data))
+        return self.__data
+
+    def is_normalized(self) -> bool:
+        return self.__data.dtype.kind == "f"
+
+    def cast(self, _type: Type[Color]) -> ColorArray:
+        if _type not in (ColorHex, ColorRGB, ColorHSL):
+            raise TypeError(f"Cannot convert to type {_type}")
+        if _type is self.__space:
+            return self
+
+        if self.__space is ColorHex:
+            rgb = ColorArray(self.__data, ColorRGB)
+            return rgb.cast(_type)
+
+        if _type is ColorHex:
+            rgb = self.cast(ColorRGB).denormalized()
+            return ColorArray(rgb.data, ColorHex)
+
+        # Just like the scalar colors, denormalized colors are converted with
+        # the integer kernels and normalized colors with the float kernels
+        if _type is ColorHSL:
+            if self.is_normalized():
+                return ColorArray(rgb_to_hsl(self.__data), ColorHSL)
+            hsl = rgb_to_hsl_fixed_array(self.__data) / FIXED_HSL_SCALES
+            return ColorArray(hsl, ColorHSL)
+
+        if self.is_normalized():
+            return ColorArray(hsl_to_rgb(self.__data), ColorRGB)
+        hsl = self.__data * HSL_PRECISION
+        return ColorArray(hsl_to_rgb_fixed_array(hsl), ColorRGB)
+
+    def normalized(self) -> ColorArray:
+        if self.__space is ColorHex:
+            raise NotImplementedError("Cannot normalize ColorHex")
+        if self.is_normalized():
+            return self
+        return ColorArray(self.__data / SCALES[self.__space], self.__space)
+
+    def normalize(self) -> ColorArray:
+        return self.normalized()
+
+    def denormalized(self) -> ColorArray:
+        if self.__space is ColorHex:
+            raise NotImplementedError("Cannot normalize ColorHex")
+        if not self.is_normalized():
+            return self
+        # `np.rint()` rounds half to even, just like `round()` in the scalar colors
+        data = np.rint(self.__data * SCALES[self.__space]).astype(np.int64)
+        return ColorArray(data, self.__space)
+
+    def denormalize(self) -> ColorArray:
+        return self.denormalized()
+
+    def __adjust_hsl(self, index: int, amount: float) -> ColorArray:
+        hsl = self.cast(ColorHSL).normalized().data.copy()
+        hsl[:, index] = np.clip(hsl[:, index] + amount, 0.0, 1.0)
+        return ColorArray(hsl, ColorHSL).cast(self.__space)
+
+    def darkened(self, amount: float) -> ColorArray:
+        return self.__adjust_hsl(2, -amount)
+
+    def darken(self, amount: float) -> ColorArray:
+        return self.darkened(amount)
+
+    def lightened(self, amount: float) -> ColorArray:
+        return self.__adjust_hsl(2, amount)
+
+    def lighten(self, amount: float) -> ColorArray:
+        return self.lightened(amount)
+
+    def saturated(self, amount: float) -> ColorArray:
+        return self.__adjust_hsl(1, amount)
+
+    def saturate(self, amount: float) -> ColorArray:
+        return self.saturated(amount)
+
+    def desaturated(self, amount: float) -> ColorArray:
+        return self.__adjust_hsl(1, -amount)
+
+    def desaturate(self, amount: float) -> ColorArray:
+        return self.desaturated(amount)
+
+    def blended(self, color: Color | ColorArray, ratio: float = 0.5) -> ColorArray:
+        """Blends every color with `color` in RGB space.
+
+        If `color` is a single color, it is blended into every color of the
+        array. If it is another array of the same length, then the colors are
+        blended pairwise.
+        """
+
+        rgb1 = self.cast(ColorRGB).normalized().data
+        if isinstance(color, ColorArray):
+            if len(color) != len(self):
+                raise ValueError(
+                    f"Cannot blend arrays of length {len(self)} and {len(color)}"
+                )
+            rgb2 = color.cast(ColorRGB).normalized().data
+        else:
+            rgb2 = np.array(color.cast(ColorRGB).normalized().color, dtype=np.float64)
+        rgb3 = np.clip((1 - ratio) * rgb1 + ratio * rgb2, 0.0, 1.0)
+        return ColorArray(rgb3, ColorRGB).cast(self.__space)
+
+    def blend(self, color: Color | ColorArray, ratio: float = 0.5) -> ColorArray:
+        return self.blended(color, ratio)
+
+    def to_colors(self) -> list[Color]:
+        return [self[i] for i in range(len(self))]
+
+    def __len__(self) -> int:
+        return self.__data.shape[0]
+
+    def __iter__(self) -> Iterator[Color]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        """Returns a scalar color for integer indices, or an array otherwise."""
+
+        if isinstance(index, (int, np.integer)):
+            values = self.__data[index].tolist()
+            if self.__space is ColorHex:
+                r, g, b = values
+                return ColorHex(f"{r:02x}{g:02x}{b:02x}")
+            return self.__space(*values)
+        return ColorArray(self.__data[index], self.__space)
+
+    def __str__(self):
+        return f"[{', '.join(self.cast(ColorHex).color)}]"
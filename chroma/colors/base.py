@@ -7,6 +7,8 @@ T = TypeVar("T", bound="Color")
 
 
 class Color(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def color(self) -> Any:
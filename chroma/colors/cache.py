@@ -0,0 +1,109 @@
+"""
+A process-wide cache for conversions between color spaces.
+
+The same handful of colors gets converted between hex, RGB and HSL over and
+over during generation. Each instance already caches its own conversions, but
+fresh instances are created all the time, so this cache shares the results
+across instances. As colors are immutable, the cached colors can be handed out
+without copying them.
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAXSIZE = 4096
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class ConversionCache:
+    """A bounded LRU cache mapping (source value, target space) to a color.
+
+    Once the cache holds `maxsize` entries, the least recently used entry is
+    evicted to make space for the new one. The cache can be disabled, in which
+    case every lookup performs the conversion and nothing is stored.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, enabled: bool = True):
+        if maxsize < 0:
+            raise ValueError("The cache size cannot be negative.")
+        self.__entries: OrderedDict[Hashable, object] = OrderedDict()
+        self.__maxsize = maxsize
+        self.__enabled = enabled
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool) -> None:
+        self.__enabled = enabled
+        if not enabled:
+            self.clear()
+
+    @property
+    def maxsize(self) -> int:
+        return self.__maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError("The cache size cannot be negative.")
+        self.__maxsize = maxsize
+        while len(self.__entries) > maxsize:
+            self.__entries.popitem(last=False)
+
+    def get_or_convert(self, key: Hashable, convert: Callable[[], T]) -> T:
+        """Returns the cached result for `key`, or converts and caches it.
+
+        The key must identify both the source color and the target color
+        space, like `(ColorRGB, value, ColorHSL)`.
+        """
+
+        if not self.__enabled or self.__maxsize == 0:
+            return convert()
+
+        try:
+            result = self.__entries[key]
+        except KeyError:
+            self.__misses += 1
+        else:
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+            return result  # type: ignore[return-value]
+
+        result = convert()
+        self.__entries[key] = result
+        if len(self.__entries) > self.__maxsize:
+            self.__entries.popitem(last=False)
+        return result
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            self.__hits,
+            self.__misses,
+            self.__maxsize,
+            len(self.__entries),
+        )
+
+    def clear(self) -> None:
+        """Removes all entries and resets the hit and miss counters."""
+
+        self.__entries.clear()
+        self.__hits = 0
+        self.__misses = 0
+
+
+# The cache shared by all colors. Disable it with `CONVERSION_CACHE.enabled =
+# False` to test the conversions themselves.
+CONVERSION_CACHE = ConversionCache()
@@ -0,0 +1,179 @@
+"""
+WCAG contrast ratios, and a solver which adjusts palettes to reach them.
+
+The contrast ratio of two colors is `(L1 + 0.05) / (L2 + 0.05)`, where L1 and L2
+are the relative luminances of the lighter and the darker color. It ranges
+from 1 for identical colors to 21 for black on white. WCAG asks for at least
+4.5 for normal text, and 3 for large text and UI components.
+
+The solver takes a palette and a list of pairs `(name, against, ratio)`. Every
+pair which falls short of its ratio gets the lightness of `name` adjusted, as
+little as possible, away from the luminance of `against`. The search runs as
+a vectorized bisection over all pairs at once.
+"""
+
+from collections.abc import Iterable
+from typing import Type
+
+import numpy as np
+
+from chroma.colors.array import ColorArray
+from chroma.colors.base import Color
+from chroma.colors.convert import hsl_to_rgb
+from chroma.colors.impl import ColorHex, ColorHSL, ColorRGB
+from chroma.colors.oklab import linearize
+from chroma.logger import Logger
+from chroma.types import ContrastPair
+
+logger = Logger.get_logger()
+
+# The weights of the linear components in the relative luminance
+LUMINANCE_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+
+# Bisection steps per search. 20 steps narrow the lightness down well below
+# the resolution of fixed-point HSL colors.
+BISECTION_STEPS = 20
+
+# Adjusting one color can break a pair which was fine before, when a color is
+# read against a color which was adjusted. Give up after this many rounds.
+MAX_ROUNDS = 4
+
+
+def relative_luminance(rgb: np.ndarray) -> np.ndarray:
+    """Returns the relative luminances of N×3 8-bit or normalized RGB colors."""
+
+    return linearize(rgb).reshape(-1, 3) @ LUMINANCE_WEIGHTS
+
+
+def luminances(colors: Color | ColorArray | Iterable[Color]) -> np.ndarray:
+    """Returns the relative luminances of a color, an array or a list of colors."""
+
+    if isinstance(colors, Color):
+        colors = [colors]
+    if not isinstance(colors, ColorArray):
+        colors = ColorArray.from_colors(colors, ColorRGB)
+    return relative_luminance(colors.cast(ColorRGB).data)
+
+
+def contrast_ratio(l1: np.ndarray, l2: np.ndarray) -> np.ndarray:
+    """Returns the contrast ratios between two arrays of relative luminances."""
+
+    l1, l2 = np.asarray(l1), np.asarray(l2)
+    return (np.maximum(l1, l2) + 0.05) / (np.minimum(l1, l2) + 0.05)
+
+
+def contrast_matrix(colors: ColorArray | Iterable[Color]) -> np.ndarray:
+    """Returns the N×N matrix of contrast ratios between every pair of colors."""
+
+    lum = luminances(colors)
+    return contrast_ratio(lum[:, np.newaxis], lum[np.newaxis, :])
+
+
+def _luminance_at(hsl: np.ndarray, l: np.ndarray) -> np.ndarray:
+    # Round to 8-bit colors exactly like casting to `ColorHex`, so the contrast
+    # of the final colors is the contrast we solved for.
+    hsl = np.column_stack((hsl[:, 0], hsl[:, 1], l))
+    rgb = np.rint(hsl_to_rgb(hsl) * 255.0).astype(np.int64)
+    return relative_luminance(rgb)
+
+
+def solve_lightness(
+    hsl: np.ndarray,
+    against: np.ndarray,
+    ratios: np.ndarray,
+    steps: int = BISECTION_STEPS,
+) -> np.ndarray:
+    """Finds the smallest lightness change giving each color enough contrast.
+
+    `hsl` holds normalized HSL colors, `against` the relative luminances they
+    are read against, and `ratios` the minimum contrast ratios. The colors are
+    moved away from the luminance they are read against. If the ratio cannot be
+    reached in that direction, the other direction is tried. If it cannot be
+    reached at all, the color becomes black or white, whichever contrasts more.
+    Returns the new lightness of every color.
+    """
+
+    hsl = np.asarray(hsl, dtype=np.float64).reshape(-1, 3)
+    l = hsl[:, 2]
+    ones = np.ones_like(l)
+
+    def satisfied(direction: np.ndarray, t: np.ndarray) -> np.ndarray:
+        lum = _luminance_at(hsl, np.clip(l + direction * t, 0.0, 1.0))
+        return contrast_ratio(lum, against) >= ratios
+
+    # Prefer the direction which already increases the contrast
+    preferred = np.where(_luminance_at(hsl, l) >= against, 1.0, -1.0)
+    preferred_ok = satisfied(preferred, ones)
+    other_ok = satisfied(-preferred, ones)
+    direction = np.where(preferred_ok | ~other_ok, preferred, -preferred)
+
+    feasible = preferred_ok | other_ok
+    if not feasible.all():
+        # Black and white are the extremes, so use whichever contrasts more.
+        # The bisection below then runs all the way to that extreme.
+        black = contrast_ratio(_luminance_at(hsl, np.zeros_like(l)), against)
+        white = contrast_ratio(_luminance_at(hsl, ones), against)
+        direction = np.where(feasible, direction, np.where(white >= black, 1.0, -1.0))
+
+    lo, hi = np.zeros_like(l), ones
+    for _ in range(steps):
+        mid = (lo + hi) / 2
+        ok = satisfied(direction, mid)
+        hi = np.where(ok, mid, hi)
+        lo = np.where(ok, lo, mid)
+
+    return np.clip(l + direction * hi, 0.0, 1.0)
+
+
+def solve_contrast(
+    palette: dict[str, Color],
+    pairs: Iterable[ContrastPair],
+    steps: int = BISECTION_STEPS,
+) -> dict[str, Color]:
+    """Returns a copy of the palette where every pair reaches its contrast ratio.
+
+    Only the first color of a pair is adjusted. If a color is in several pairs
+    which fall short, it gets the largest of the adjustments. Adjusted colors
+    keep their color space, and pairs naming missing colors are ignored.
+    """
+
+    pairs = [pair for pair in pairs if pair[0] in palette and pair[1] in palette]
+    palette = dict(palette)
+    if not pairs:
+        return palette
+
+    names = list(palette.keys())
+    index = {name: i for i, name in enumerate(names)}
+    adjusted = np.array([index[name] for name, _, _ in pairs])
+    against = np.array([index[name] for _, name, _ in pairs])
+    ratios = np.array([ratio for _, _, ratio in pairs], dtype=np.float64)
+
+    for attempt in range(MAX_ROUNDS + 1):
+        hsl = ColorArray.from_colors(palette.values(), ColorHSL).data
+        lum = _luminance_at(hsl, hsl[:, 2])
+        failing = contrast_ratio(lum[adjusted], lum[against]) < ratios
+        if not failing.any():
+            break
+        if attempt == MAX_ROUNDS:
+            logger.warn("Could not satisfy every contrast ratio of the palette")
+            break
+
+        l = solve_lightness(
+            hsl[adjusted[failing]], lum[against[failing]], ratios[failing], steps
+        )
+
+        # Keep the largest change for colors in several failing pairs
+        changes: dict[int, float] = {}
+        for i, new_l in zip(adjusted[failing].tolist(), l.tolist()):
+            if i not in changes or abs(new_l - hsl[i, 2]) > abs(changes[i] - hsl[i, 2]):
+                changes[i] = new_l
+
+        for i, new_l in changes.items():
+            name = names[i]
+            h, s, _ = hsl[i].tolist()
+            space: Type[Color] = type(palette[name])
+            # Go through hex, so the color is the 8-bit color we solved for
+            palette[name] = ColorHSL(h, s, new_l).cast(ColorHex).cast(space)
+            logger.debug(f"Adjusted {name} to {palette[name]} for contrast")
+
+    return palette
@@ -0,0 +1,317 @@
+"""
+Vectorized color space conversion kernels.
+
+Every kernel works on an N×3 array of colors instead of a single color, so a
+whole palette or histogram can be converted in one call. The float kernels
+mirror `colorsys` operation-for-operation, which means that they produce the
+exact same values as the scalar `Color.cast()` implementations.
+
+Unlike `colorsys`, the components are always ordered as (h, s, l), matching
+`ColorHSL`.
+"""
+
+import numpy as np
+
+
+def rgb_to_hsl(rgb: np.ndarray) -> np.ndarray:
+    """Converts normalized RGB colors to normalized HSL colors."""
+
+    rgb = np.asarray(rgb, dtype=np.float64).reshape(-1, 3)
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    sumc = maxc + minc
+    rangec = maxc - minc
+    l = sumc / 2.0
+
+    # Greyscale colors have no hue or saturation. The divisions below would
+    # otherwise divide by zero for them, so we divide by one instead and mask
+    # the results out at the end.
+    grey = minc == maxc
+    safe_range = np.where(grey, 1.0, rangec)
+    low = l <= 0.5
+    s = np.where(
+        low,
+        rangec / np.where(grey, 1.0, sumc),
+        rangec / np.where(grey, 1.0, 2.0 - maxc - minc),
+    )
+
+    rc = (maxc - r) / safe_range
+    gc = (maxc - g) / safe_range
+    bc = (maxc - b) / safe_range
+    h = np.where(
+        r == maxc,
+        bc - gc,
+        np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc),
+    )
+    h = np.mod(h / 6.0, 1.0)
+
+    h = np.where(grey, 0.0, h)
+    s = np.where(grey, 0.0, s)
+    return np.stack((h, s, l), axis=1)
+
+
+def hsl_to_rgb(hsl: np.ndarray) -> np.ndarray:
+    """Converts normalized HSL colors to normalized RGB colors."""
+
+    hsl = np.asarray(hsl, dtype=np.float64).reshape(-1, 3)
+    h, s, l = hsl[:, 0], hsl[:, 1], hsl[:, 2]
+
+    m2 = np.where(l <= 0.5, l * (1.0 + s), l + s - (l * s))
+    m1 = 2.0 * l - m2
+
+    def channel(hue: np.ndarray) -> np.ndarray:
+        hue = np.mod(hue, 1.0)
+        return np.select(
+            [hue < 1.0 / 6.0, hue < 0.5, hue < 2.0 / 3.0],
+            [
+                m1 + (m2 - m1) * hue * 6.0,
+                m2,
+                m1 + (m2 - m1) * (2.0 / 3.0 - hue) * 6.0,
+            ],
+            default=m1,
+        )
+
+    rgb = np.stack(
+        (channel(h + 1.0 / 3.0), channel(h), channel(h - 1.0 / 3.0)),
+        axis=1,
+    )
+
+    # Colors without saturation are plain greys
+    grey = s == 0.0
+    rgb[grey] = l[grey, np.newaxis]
+    return rgb
+
+
+# Maps an ASCII code point to the value of the hex digit, or 0xFF if the code
+# point isn't a hex digit. The last entry catches every non-ASCII code point.
+_HEX_DIGIT_VALUES = np.full(129, 0xFF, dtype=np.uint8)
+_HEX_DIGIT_VALUES[[ord(c) for c in "0123456789abcdef"]] = np.arange(16)
+_HEX_DIGIT_VALUES[[ord(c) for c in "ABCDEF"]] = np.arange(10, 16)
+
+# Maps the value of a hex digit to its lowercase ASCII code point
+_HEX_DIGIT_CHARS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+_HEX_SHIFTS = np.array([20, 16, 12, 8, 4, 0], dtype=np.uint32)
+
+
+def parse_hex(values) -> np.ndarray:
+    """Parses hex colors into an array of packed 0xRRGGBB integers.
+
+    The values can either be a sequence of strings, or a single `str` or
+    `bytes` buffer with whitespace-separated colors, like the contents of a
+    palette file. Each color must be six hex digits, optionally prefixed by a
+    `#`. The whole batch is validated at once, and a `TypeError` naming the
+    index of the first invalid color is raised if any color is malformed.
+    """
+
+    if isinstance(values, (str, bytes)):
+        values = values.split()
+
+    # Widen every string to exactly seven UCS-4 code points. Shorter strings
+    # are padded with zeros, which never count as hex digits, so invalid
+    # lengths are caught by the digit check below.
+    strings = np.asarray(values, dtype=np.str_).reshape(-1)
+    if strings.size == 0:
+        return np.zeros(0, dtype=np.uint32)
+    lengths = np.char.str_len(strings)
+    codes = strings.astype("<U7").view(np.uint32).reshape(-1, 7)
+
+    prefixed = codes[:, 0] == ord("#")
+    digits = np.where(prefixed[:, np.newaxis], codes[:, 1:7], codes[:, 0:6])
+    nibbles = _HEX_DIGIT_VALUES[np.minimum(digits, 128)]
+
+    invalid = (nibbles == 0xFF).any(axis=1) | (lengths != np.where(prefixed, 7, 6))
+    if invalid.any():
+        index = int(np.argmax(invalid))
+        raise TypeError(f"Invalid hex color at index {index}: {str(strings[index])!r}")
+
+    return (nibbles.astype(np.uint32) << _HEX_SHIFTS).sum(axis=1, dtype=np.uint32)
+
+
+def format_hex(packed: np.ndarray, prefix: bool = True) -> list[str]:
+    """Formats packed 0xRRGGBB integers as lowercase hex strings.
+
+    If `prefix` is unset, the leading `#` is omitted.
+    """
+
+    packed = np.asarray(packed, dtype=np.uint32).reshape(-1)
+    chars = np.empty((packed.size, 7), dtype=np.uint8)
+    chars[:, 0] = ord("#")
+    chars[:, 1:] = _HEX_DIGIT_CHARS[(packed[:, np.newaxis] >> _HEX_SHIFTS) & 0xF]
+    if not prefix:
+        chars = np.ascontiguousarray(chars[:, 1:])
+    width = chars.shape[1]
+    return chars.view(f"S{width}").reshape(-1).astype(f"U{width}").tolist()
+
+
+def pack_rgb(rgb: np.ndarray) -> np.ndarray:
+    """Packs an N×3 array of 8-bit RGB components into 0xRRGGBB integers."""
+
+    rgb = np.asarray(rgb, dtype=np.uint32).reshape(-1, 3)
+    return (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+
+def unpack_rgb(packed: np.ndarray) -> np.ndarray:
+    """Unpacks 0xRRGGBB integers into an N×3 array of 8-bit RGB components."""
+
+    packed = np.asarray(packed, dtype=np.uint32).reshape(-1, 1)
+    return ((packed >> np.array([16, 8, 0], dtype=np.uint32)) & 0xFF).astype(np.uint8)
+
+
+# Fixed-point HSL colors store each component in 1/HSL_PRECISION steps of its
+# denormalized unit. The hue ranges over [0, 360 * HSL_PRECISION), and the
+# saturation and luminance over [0, 100 * HSL_PRECISION]. This is fine enough
+# for every 8-bit RGB color to survive a round trip through HSL unchanged.
+HSL_PRECISION = 256
+HUE_SCALE = 360 * HSL_PRECISION
+PERCENT_SCALE = 100 * HSL_PRECISION
+
+# The hue spans six sectors of this many fixed-point steps each
+_SECTOR = HUE_SCALE // 6
+
+# `hsl_to_rgb_fixed()` scales the chroma, the intermediate component and the
+# offset by this, so that all of them are integers.
+_RGB_SCALE = 2 * PERCENT_SCALE * PERCENT_SCALE * _SECTOR
+_RGB_DIVISOR = 2 * _RGB_SCALE
+_LUMINANCE_SCALE = 2 * PERCENT_SCALE * _SECTOR * 510
+
+
+def _round_div(num, den):
+    """Divides integers, rounding half up. Works on ints and integer arrays."""
+
+    return (2 * num + den) // (2 * den)
+
+
+def rgb_to_hsl_fixed(r: int, g: int, b: int) -> tuple[int, int, int]:
+    """Converts an 8-bit RGB color to a fixed-point HSL color.
+
+    Only integer arithmetic is used, and each component is rounded to the
+    nearest fixed-point step, so the result is exact.
+    """
+
+    # Comparing the channels directly is faster than calling max() and min()
+    if r >= g:
+        if g >= b:
+            maxc, minc = r, b
+        elif r >= b:
+            maxc, minc = r, g
+        else:
+            maxc, minc = b, g
+    elif r >= b:
+        maxc, minc = g, b
+    elif g >= b:
+        maxc, minc = g, r
+    else:
+        maxc, minc = b, r
+
+    sumc = maxc + minc
+    l = (sumc * 2 * PERCENT_SCALE + 510) // 1020
+    rangec = maxc - minc
+    if rangec == 0:
+        return 0, 0, l
+
+    den = sumc if sumc <= 255 else 510 - sumc
+    s = (rangec * 2 * PERCENT_SCALE + den) // (2 * den)
+
+    if r == maxc:
+        h = g - b
+        if h < 0:
+            h += 6 * rangec
+    elif g == maxc:
+        h = 2 * rangec + b - r
+    else:
+        h = 4 * rangec + r - g
+    h = (h * 2 * _SECTOR + rangec) // (2 * rangec)
+    return (h if h < HUE_SCALE else h - HUE_SCALE), s, l
+
+
+def hsl_to_rgb_fixed(h: int, s: int, l: int) -> tuple[int, int, int]:
+    """Converts a fixed-point HSL color to an 8-bit RGB color.
+
+    Only integer arithmetic is used. The chroma, the intermediate component
+    and the offset are scaled to a common denominator, so each channel is
+    rounded exactly once.
+    """
+
+    sector, rest = divmod(h % HUE_SCALE, _SECTOR)
+    # Scale by 255 up front, and by 2 to round half up below
+    chroma = (PERCENT_SCALE - abs(2 * l - PERCENT_SCALE)) * s * 510
+    c = 2 * chroma * _SECTOR
+    x = 2 * chroma * (_SECTOR - rest if sector & 1 else rest)
+    m = l * _LUMINANCE_SCALE - chroma * _SECTOR + _RGB_SCALE
+
+    if sector == 0:
+        r, g, b = c + m, x + m, m
+    elif sector == 1:
+        r, g, b = x + m, c + m, m
+    elif sector == 2:
+        r, g, b = m, c + m, x + m
+    elif sector == 3:
+        r, g, b = m, x + m, c + m
+    elif sector == 4:
+        r, g, b = x + m, m, c + m
+    else:
+        r, g, b = c + m, m, x + m
+    return r // _RGB_DIVISOR, g // _RGB_DIVISOR, b // _RGB_DIVISOR
+
+
+def rgb_to_hsl_fixed_array(rgb: np.ndarray) -> np.ndarray:
+    """Vectorized version of `rgb_to_hsl_fixed()` for N×3 arrays."""
+
+    rgb = np.asarray(rgb, dtype=np.int64).reshape(-1, 3)
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    sumc = maxc + minc
+    rangec = maxc - minc
+    l = _round_div(sumc * PERCENT_SCALE, 510)
+
+    # Avoid dividing by zero for greys, which are masked out at the end
+    grey = rangec == 0
+    safe_range = np.where(grey, 1, rangec)
+    s = _round_div(
+        rangec * PERCENT_SCALE,
+        np.where(grey, 1, np.where(sumc <= 255, sumc, 510 - sumc)),
+    )
+    h = np.where(
+        r == maxc,
+        g - b,
+        np.where(g == maxc, 2 * rangec + b - r, 4 * rangec + r - g),
+    )
+    h = _round_div(h * _SECTOR, safe_range) % HUE_SCALE
+
+    return np.stack((np.where(grey, 0, h), np.where(grey, 0, s), l), axis=1)
+
+
+def hsl_to_rgb_fixed_array(hsl: np.ndarray) -> np.ndarray:
+    """Vectorized version of `hsl_to_rgb_fixed()` for N×3 arrays."""
+
+    hsl = np.asarray(hsl, dtype=np.int64).reshape(-1, 3)
+    h = hsl[:, 0] % HUE_SCALE
+    s, l = hsl[:, 1], hsl[:, 2]
+
+    chroma = (PERCENT_SCALE - np.abs(2 * l - PERCENT_SCALE)) * s
+    c = 2 * chroma * _SECTOR
+    x = 2 * chroma * (_SECTOR - np.abs(h % (2 * _SECTOR) - _SECTOR))
+    m = 2 * l * PERCENT_SCALE * _SECTOR - chroma * _SECTOR
+    zero = np.zeros_like(c)
+
+    # Pick the (r, g, b) arrangement of the chroma and intermediate component
+    # based on the sector the hue falls in.
+    sector = (h // _SECTOR)[:, np.newaxis]
+    arrangements = [
+        (c, x, zero),
+        (x, c, zero),
+        (zero, c, x),
+        (zero, x, c),
+        (x, zero, c),
+        (c, zero, x),
+    ]
+    rgb = np.select(
+        [sector == i for i in range(6)],
+        [np.stack(arrangement, axis=1) for arrangement in arrangements],
+    )
+    return _round_div((rgb + m[:, np.newaxis]) * 255, _RGB_SCALE)
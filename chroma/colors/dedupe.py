@@ -0,0 +1,247 @@
+"""
+Collapsing of near-duplicate colors in a histogram, using CIEDE2000 distances.
+
+A downscaled image still holds hundreds of shades which only differ by a unit
+or two in each component. Classifying each of them on its own is wasted work,
+as they all end up with the same name. This module merges every color which
+is closer than a ΔE threshold to a more prominent color into the cluster of
+that color, and sums the pixel counts of the cluster.
+
+```py
+representatives, counts, labels = collapse_duplicates(histogram, counts)
+candidates = histogram[representatives]
+```
+
+Distances are measured with CIEDE2000, which is the CIE recommendation for
+small color differences. It is not a metric over CIELab, so candidate pairs
+are found with a grid over CIELab instead of a tree. The cells are
+wide enough to hold every pair within the threshold, and only colors in
+neighbouring cells are compared.
+
+See https://hajim.rochester.edu/ece/sites/gsharma/ciede2000/ for the formula.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+import numpy as np
+
+from chroma.colors.array import ColorArray
+from chroma.colors.base import Color
+from chroma.colors.impl import ColorRGB
+from chroma.colors.oklab import linearize
+
+# Linear sRGB to CIEXYZ, and the D65 white point in CIEXYZ
+_RGB_TO_XYZ = np.array(
+    [
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041],
+    ]
+)
+_WHITE_D65 = _RGB_TO_XYZ.sum(axis=1)
+
+_LAB_EPSILON = 216 / 24389
+_LAB_KAPPA = 24389 / 27
+
+# The ΔE below which two colors are merged by default. A ΔE of about 2.3 is
+# barely noticeable, so this merges shades which only differ slightly.
+DEDUPE_THRESHOLD = 3.0
+
+# The largest ratios between the differences of two colors along the axes of
+# CIELab and their CIEDE2000 distance. CIEDE2000 shrinks lightness differences
+# by less than 1.75 times, but chroma and hue differences of saturated colors
+# by up to about 7 times. The grid cells are scaled by these to never miss a
+# pair.
+GRID_SCALE = np.array([1.75, 8.0, 8.0])
+
+
+def rgb_to_cielab(rgb: np.ndarray) -> np.ndarray:
+    """Converts N×3 8-bit or normalized RGB colors to CIELab under D65."""
+
+    xyz = linearize(rgb).reshape(-1, 3) @ _RGB_TO_XYZ.T / _WHITE_D65
+    f = np.where(xyz > _LAB_EPSILON, np.cbrt(xyz), (_LAB_KAPPA * xyz + 16) / 116)
+    return np.stack(
+        (
+            116 * f[:, 1] - 16,
+            500 * (f[:, 0] - f[:, 1]),
+            200 * (f[:, 1] - f[:, 2]),
+        ),
+        axis=1,
+    )
+
+
+def as_cielab(colors: Color | ColorArray | Iterable[Color] | np.ndarray) -> np.ndarray:
+    """Returns the CIELab colors of a color, an array or a list of colors.
+
+    Like `as_oklab()`, NumPy arrays are assumed to already hold CIELab colors.
+    """
+
+    if isinstance(colors, np.ndarray):
+        return colors.reshape(-1, 3)
+    if isinstance(colors, Color):
+        colors = [colors]
+    if not isinstance(colors, ColorArray):
+        colors = ColorArray.from_colors(colors, ColorRGB)
+    return rgb_to_cielab(colors.cast(ColorRGB).data)
+
+
+def ciede2000(a, b) -> np.ndarray:
+    """Returns the CIEDE2000 distance between the colors of `a` and `b`.
+
+    The colors are compared pair by pair, and a single color is compared with
+    every color of the other argument. Both arguments are converted with
+    `as_cielab()`.
+    """
+
+    lab1, lab2 = np.broadcast_arrays(as_cielab(a), as_cielab(b))
+    l1, a1, b1 = lab1[:, 0], lab1[:, 1], lab1[:, 2]
+    l2, a2, b2 = lab2[:, 0], lab2[:, 1], lab2[:, 2]
+
+    # Stretch the a* axis of neutral colors, so greys are not over-weighted
+    c_mean = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    c_mean7 = c_mean**7
+    g = 0.5 * (1 - np.sqrt(c_mean7 / (c_mean7 + 25.0**7)))
+    a1, a2 = a1 * (1 + g), a2 * (1 + g)
+
+    c1, c2 = np.hypot(a1, b1), np.hypot(a2, b2)
+    h1 = np.degrees(np.arctan2(b1, a1)) % 360
+    h2 = np.degrees(np.arctan2(b2, a2)) % 360
+
+    # The hue difference takes the short way around the circle, and is zero
+    # when either color has no chroma
+    chromatic = (c1 * c2) != 0
+    dh = h2 - h1
+    dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+    dh = np.where(chromatic, dh, 0)
+
+    dl = l2 - l1
+    dc = c2 - c1
+    dh = 2 * np.sqrt(c1 * c2) * np.sin(np.radians(dh) / 2)
+
+    # The mean hue, with the same wraparound and achromatic handling
+    h_sum = h1 + h2
+    h_mean = np.where(
+        np.abs(h1 - h2) <= 180,
+        h_sum / 2,
+        np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2),
+    )
+    h_mean = np.where(chromatic, h_mean, h_sum)
+
+    l_mean = (l1 + l2) / 2
+    c_mean = (c1 + c2) / 2
+    t = (
+        1
+        - 0.17 * np.cos(np.radians(h_mean - 30))
+        + 0.24 * np.cos(np.radians(2 * h_mean))
+        + 0.32 * np.cos(np.radians(3 * h_mean + 6))
+        - 0.20 * np.cos(np.radians(4 * h_mean - 63))
+    )
+
+    l50 = (l_mean - 50) ** 2
+    s_l = 1 + 0.015 * l50 / np.sqrt(20 + l50)
+    s_c = 1 + 0.045 * c_mean
+    s_h = 1 + 0.015 * c_mean * t
+
+    # Rotate the blue region, where chroma and hue differences interact
+    c_mean7 = c_mean**7
+    r_c = 2 * np.sqrt(c_mean7 / (c_mean7 + 25.0**7))
+    rotation = np.exp(-(((h_mean - 275) / 25) ** 2))
+    r_t = -np.sin(np.radians(60 * rotation)) * r_c
+
+    dl, dc, dh = dl / s_l, dc / s_c, dh / s_h
+    return np.sqrt(np.maximum(dl**2 + dc**2 + dh**2 + r_t * dc * dh, 0))
+
+
+class _Grid:
+    """A grid of cells over CIELab, bucketing colors by the cell they are in.
+
+    The cells are stored as sorted integer keys, so the colors near a color
+    are found by searching the keys of the 27 cells around it.
+    """
+
+    def __init__(self, lab: np.ndarray, cell: np.ndarray):
+        self.__lab = lab
+        self.__cell = cell
+
+        coords = np.floor(lab / cell).astype(np.int64)
+        # Pad the grid by a cell on each side, so neighbouring keys never wrap
+        coords -= coords.min(axis=0) - 1
+        dims = coords.max(axis=0) + 2
+        self.__keys = (coords[:, 0] * dims[1] + coords[:, 1]) * dims[2] + coords[:, 2]
+        self.__order = np.argsort(self.__keys, kind="stable")
+        self.__sorted_keys = self.__keys[self.__order]
+
+        offsets = np.stack(
+            np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1], indexing="ij")
+        ).reshape(3, -1)
+        self.__offsets = (offsets[0] * dims[1] + offsets[1]) * dims[2] + offsets[2]
+
+    def near(self, i: int) -> np.ndarray:
+        """Returns the indices of the colors less than a cell away from `i`."""
+
+        keys = self.__keys[i] + self.__offsets
+        starts = np.searchsorted(self.__sorted_keys, keys, side="left")
+        lengths = np.searchsorted(self.__sorted_keys, keys, side="right") - starts
+
+        # Expand the ranges of the 27 cells without a Python loop
+        steps = np.arange(lengths.sum()) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        near = self.__order[np.repeat(starts, lengths) + steps]
+
+        # Colors in neighbouring cells can still be up to two cells apart
+        diff = np.abs(self.__lab[near] - self.__lab[i])
+        return near[(diff <= self.__cell).all(axis=1)]
+
+
+def collapse_duplicates(
+    colors: ColorArray | Iterable[Color] | np.ndarray,
+    counts: Iterable[int] | np.ndarray | None = None,
+    threshold: float = DEDUPE_THRESHOLD,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Merges colors closer than `threshold` into clusters.
+
+    Colors are visited from the most to the least frequent, and each color not
+    yet in a cluster starts a new one, which takes every remaining color within
+    the threshold. Every color of a cluster is therefore close to the color
+    which represents it, and clusters never chain across a gradient. Without
+    counts, earlier colors are considered more frequent.
+
+    Returns the indices of the representative colors, sorted by the summed
+    pixel count of their clusters, those summed counts, and the position of the
+    cluster of every input color in the representatives.
+    """
+
+    lab = as_cielab(colors)
+    n = len(lab)
+    if counts is None:
+        counts = np.arange(n, 0, -1)
+    counts = np.asarray(counts, dtype=np.int64).reshape(-1)
+    if len(counts) != n:
+        raise ValueError(f"Got {len(counts)} counts for {n} colors")
+    if n == 0 or threshold <= 0:
+        order = np.argsort(-counts, kind="stable")
+        labels = np.empty(n, dtype=np.intp)
+        labels[order] = np.arange(n)
+        return order, counts[order], labels
+
+    # Distances are only computed from the colors which start a cluster, and
+    # only to the colors around them which are not in a cluster yet
+    grid = _Grid(lab, threshold * GRID_SCALE)
+    leaders = np.full(n, -1, dtype=np.intp)
+    for i in np.argsort(-counts, kind="stable"):
+        if leaders[i] != -1:
+            continue
+        leaders[i] = i
+        near = grid.near(i)
+        near = near[leaders[near] == -1]
+        leaders[near[ciede2000(lab[i], lab[near]) <= threshold]] = i
+
+    heads, inverse = np.unique(leaders, return_inverse=True)
+    sums = np.bincount(inverse, weights=counts).astype(np.int64)
+    order = np.argsort(-sums, kind="stable")
+    ranks = np.empty(len(order), dtype=np.intp)
+    ranks[order] = np.arange(len(order))
+    return heads[order], sums[order], ranks[inverse]
@@ -1,24 +1,28 @@
 from __future__ import annotations
 
-import re
-from typing import Type, cast
+from typing import Optional, Type, cast
 
 from chroma.colors.base import Color, T
+from chroma.colors.cache import CONVERSION_CACHE
 
 ColorTypeHex = str
 
-HEX_REGEX = r"^#([A-Fa-f0-9]{6})$"
-HEXVAL_REGEX = r"([A-Fa-f0-9]{6})$"
+HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
 
 
 class ColorHex(Color):
+    __slots__ = ("__color", "__rgb")
+
     def __init__(self, value: str):
-        if re.match(HEXVAL_REGEX, value):
+        # Checking the length and digits directly is a lot cheaper than
+        # matching a regex, and this is called for every color we parse.
+        if len(value) == 6 and HEX_DIGITS.issuperset(value):
             self.__color = f"#{value}"
-        elif re.match(HEX_REGEX, value):
+        elif len(value) == 7 and value[0] == "#" and HEX_DIGITS.issuperset(value[1:]):
             self.__color = value
         else:
             raise TypeError("Invalid hex color.")
+        self.__rgb: Optional[Color] = None
 
     @property
     def color(self) -> ColorTypeHex:
@@ -35,10 +39,12 @@ class ColorHex(Color):
         # We know that the type we are returning is correct, but the linter
         # doesn't. So, we use cast() to tell it that.
         if _type is ColorRGB:
-            r = int(self.value[0:2], 16)
-            g = int(self.value[2:4], 16)
-            b = int(self.value[4:6], 16)
-            return cast(T, ColorRGB(r, g, b))
+            if self.__rgb is None:
+                self.__rgb = CONVERSION_CACHE.get_or_convert(
+                    (ColorHex, self.value.lower(), ColorRGB),
+                    lambda: ColorRGB.from_packed(int(self.value, 16)),
+                )
+            return cast(T, self.__rgb)
         elif _type is ColorHSL:
             color = self.cast(ColorRGB).cast(ColorHSL)
             return cast(T, color)
@@ -123,5 +129,13 @@ class ColorHex(Color):
 
         return self.cast(ColorRGB).blended(color, ratio).cast(ColorHex)
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ColorHex):
+            return NotImplemented
+        return self.__color.lower() == other.__color.lower()
+
+    def __hash__(self) -> int:
+        return hash((ColorHex, self.__color.lower()))
+
     def __str__(self):
         return self.color.lower()
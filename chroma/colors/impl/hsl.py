@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import colorsys
-from typing import Type, cast
+from typing import Optional, Type, cast
 
 from chroma.colors.base import Color, T
-from chroma.colors.utils import check_types
+from chroma.colors.cache import CONVERSION_CACHE
+from chroma.colors.convert import HSL_PRECISION, hsl_to_rgb_fixed
 from chroma.logger import Logger
 from chroma.types import Number
-from chroma.utils.tools import clamp, never
+from chroma.utils.tools import clamp
 
 ColorTypeHSL = tuple[float, float, float] | tuple[int, int, int]
 
@@ -15,33 +16,48 @@ logger = Logger.get_logger()
 
 
 class ColorHSL(Color):
+    """An immutable color in the HSL color space.
+
+    Derived views, like the hex or RGB representation of the color, are
+    computed once and cached on the instance. Denormalized colors are cast to
+    8-bit RGB colors with exact integer arithmetic, while normalized colors
+    use the float conversions from `colorsys`. Either way, casting an 8-bit RGB
+    or hex color to HSL and back returns the original color.
+    """
+
+    __slots__ = ("__value", "__hex", "__rgb")
+
     def __init__(self, h: Number, s: Number, l: Number):
-        if not check_types((h, s, l), int) and not check_types((h, s, l), float):
+        if type(h) is int and type(s) is int and type(l) is int:
+            if not (0 <= h <= 360 and 0 <= s <= 100 and 0 <= l <= 100):
+                raise ValueError("The color components have invalid values.")
+        elif type(h) is float and type(s) is float and type(l) is float:
+            if not (0.0 <= h <= 1.0 and 0.0 <= s <= 1.0 and 0.0 <= l <= 1.0):
+                raise ValueError("The color components have invalid values.")
+        else:
             raise TypeError("The color components have different types.")
-        if (type(h) is float and (max(h, s, l) > 1.0 or min(h, s, l) < 0.0)) or (
-            type(h) is int and (h > 360 or max(s, l) > 100 or min(h, s, l) < 0)
-        ):
-            print(h, s, l)
-            raise ValueError("The color components have invalid values.")
-        self.__h = h
-        self.__s = s
-        self.__l = l
+        self.__value: ColorTypeHSL = (h, s, l)
+        self.__hex: Optional[Color] = None
+        self.__rgb: Optional[Color] = None
 
     @property
     def h(self) -> Number:
-        return self.__h
+        return self.__value[0]
 
     @property
     def s(self) -> Number:
-        return self.__s
+        return self.__value[1]
 
     @property
     def l(self) -> Number:
-        return self.__l
+        return self.__value[2]
 
     @property
     def color(self) -> ColorTypeHSL:
-        return (self.__h, self.__s, self.__l)
+        return self.__value
+
+    def is_normalized(self) -> bool:
+        return type(self.__value[0]) is float
 
     def cast(self, _type: Type[T]) -> T:
         # Delayed imports to avoid circular imports
@@ -50,40 +66,48 @@ class ColorHSL(Color):
         # We know that the type we are returning is correct, but the linter
         # doesn't. So, we use cast() to tell it that.
         if _type is ColorRGB:
-            h, s, l = self.normalized().color
-            color = ColorRGB(*colorsys.hls_to_rgb(h, l, s))
-            return cast(T, color)
+            if self.__rgb is None:
+                # The scale is part of the key, as (1, 1, 1) and (1.0, 1.0, 1.0)
+                # are equal tuples but different colors
+                key = (ColorHSL, self.is_normalized(), self.__value, ColorRGB)
+                self.__rgb = CONVERSION_CACHE.get_or_convert(key, self.__to_rgb)
+            return cast(T, self.__rgb)
         elif _type is ColorHex:
-            return cast(T, self.cast(ColorRGB).cast(ColorHex))
+            if self.__hex is None:
+                self.__hex = self.cast(ColorRGB).cast(ColorHex)
+            return cast(T, self.__hex)
         elif _type is ColorHSL:
-            return cast(T, ColorHSL(*self.color))
+            return cast(T, self)
         else:
             raise TypeError(f"Cannot convert to type {_type}")
 
+    def __to_rgb(self) -> Color:
+        from chroma.colors.impl import ColorRGB
+
+        h, s, l = self.__value
+        if type(h) is int:
+            # The integer scale maps exactly onto fixed-point colors
+            h, s, l = h * HSL_PRECISION, s * HSL_PRECISION, l * HSL_PRECISION
+            return ColorRGB(*hsl_to_rgb_fixed(h, s, l))
+
+        # A bare `colorsys` call beats the integer kernel in pure Python
+        return ColorRGB(*colorsys.hls_to_rgb(h, l, s))
+
     def normalized(self) -> ColorHSL:
-        if check_types(self.color, int):
-            h = self.h / 360.0
-            s = self.s / 100.0
-            l = self.l / 100.0
-            return ColorHSL(h, s, l)
-        elif check_types(self.color, float):
-            return ColorHSL(*self.color)
-        else:
-            raise TypeError("The color components have different types.")
+        # The color is immutable, so an already normalized color can be shared
+        if self.is_normalized():
+            return self
+        h, s, l = self.__value
+        return ColorHSL(h / 360.0, s / 100.0, l / 100.0)
 
     def normalize(self) -> ColorHSL:
         return self.normalized()
 
     def denormalized(self) -> ColorHSL:
-        if check_types(self.color, float):
-            h = int(self.h * 360)
-            s = int(self.s * 100)
-            l = int(self.l * 100)
-            return ColorHSL(h, s, l)
-        elif check_types(self.color, int):
-            return ColorHSL(*self.color)
-        else:
-            raise TypeError("The color components have different types.")
+        if not self.is_normalized():
+            return self
+        h, s, l = self.__value
+        return ColorHSL(round(h * 360), round(s * 100), round(l * 100))
 
     def denormalize(self) -> ColorHSL:
         return self.denormalized()
@@ -128,59 +152,47 @@ class ColorHSL(Color):
     def blend(self, color: Color, ratio: float = 0.5) -> ColorHSL:
         return self.blended(color, ratio)
 
-    def set_h(self, h: Number) -> ColorHSL:
-        is_normal = self.color == self.normalized().color
-
-        if is_normal:
-            if type(h) is float:
-                self.__h = clamp(h, 0.0, 1.0)
-                return self
-            elif type(h) is int:
-                self.__h = clamp(h / 360.0, 0.0, 1.0)
-            never()
+    def __with_component(self, index: int, value: Number, scale: int) -> ColorHSL:
+        # Match the scale of the new component to the scale of the color
+        if self.is_normalized():
+            if type(value) is int:
+                value = value / scale
+            value = clamp(float(value), 0.0, 1.0)
         else:
-            if type(h) is float:
-                self.__h = clamp(h * 360, 0, 360)
-                return self
-            elif type(h) is int:
-                self.__h = clamp(h, 0, 360)
-            never()
+            if type(value) is float:
+                value = round(value * scale)
+            value = clamp(int(value), 0, scale)
+        components = list(self.__value)
+        components[index] = value
+        return ColorHSL(*components)
+
+    def set_h(self, h: Number) -> ColorHSL:
+        """Returns a copy of the color with the hue replaced."""
+
+        return self.__with_component(0, h, 360)
 
     def set_s(self, s: Number) -> ColorHSL:
-        is_normal = self.color == self.normalized().color
-
-        if is_normal:
-            if type(s) is float:
-                self.__s = clamp(s, 0.0, 1.0)
-                return self
-            elif type(s) is int:
-                self.__s = clamp(s / 360.0, 0.0, 1.0)
-            never()
-        else:
-            if type(s) is float:
-                self.__s = clamp(s * 360, 0, 360)
-                return self
-            elif type(s) is int:
-                self.__s = clamp(s, 0, 360)
-            never()
+        """Returns a copy of the color with the saturation replaced."""
+
+        return self.__with_component(1, s, 100)
 
     def set_l(self, l: Number) -> ColorHSL:
-        is_normal = self.color == self.normalized().color
-
-        if is_normal:
-            if type(l) is float:
-                self.__l = clamp(l, 0.0, 1.0)
-                return self
-            elif type(l) is int:
-                self.__l = clamp(l / 360.0, 0.0, 1.0)
-            never()
-        else:
-            if type(l) is float:
-                self.__l = clamp(l * 360, 0, 360)
-                return self
-            elif type(l) is int:
-                self.__l = clamp(l, 0, 360)
-            never()
+        """Returns a copy of the color with the luminance replaced."""
+
+        return self.__with_component(2, l, 100)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ColorHSL):
+            return NotImplemented
+        # The integer and the normalized scales compare equal as tuples, like
+        # (1, 1, 1) and (1.0, 1.0, 1.0), but are different colors
+        return (
+            self.is_normalized() == other.is_normalized()
+            and self.__value == other.__value
+        )
+
+    def __hash__(self) -> int:
+        return hash((ColorHSL, self.is_normalized(), self.__value))
 
     def __str__(self):
         from chroma.colors.impl import ColorHex
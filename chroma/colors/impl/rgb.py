@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import colorsys
-from typing import Type, cast
+from typing import Optional, Type, cast
 
 from chroma.colors.base import Color, T
-from chroma.colors.utils import check_types
+from chroma.colors.cache import CONVERSION_CACHE
+from chroma.colors.convert import HUE_SCALE, PERCENT_SCALE, rgb_to_hsl_fixed
 from chroma.logger import Logger
 from chroma.types import Number
-from chroma.utils.tools import clamp, never
+from chroma.utils.tools import clamp
 
 ColorTypeRGB = tuple[float, float, float] | tuple[int, int, int]
 
@@ -15,32 +16,72 @@ logger = Logger.get_logger()
 
 
 class ColorRGB(Color):
+    """An immutable color in the RGB color space.
+
+    Denormalized (8-bit) colors are packed into a single 24-bit integer, while
+    normalized colors keep their float components. Derived views, like the hex
+    or HSL representation of the color, are computed once and cached on the
+    instance. Denormalized colors are converted to HSL with exact integer
+    arithmetic, while normalized colors use the float conversions from
+    `colorsys`.
+    """
+
+    __slots__ = ("__value", "__hex", "__hsl")
+
     def __init__(self, r: Number, g: Number, b: Number):
-        if not check_types((r, g, b), int) and not check_types((r, g, b), float):
+        if type(r) is int and type(g) is int and type(b) is int:
+            if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+                raise ValueError("The color components have invalid values.")
+            self.__value: int | tuple[float, float, float] = (r << 16) | (g << 8) | b
+        elif type(r) is float and type(g) is float and type(b) is float:
+            if not (0.0 <= r <= 1.0 and 0.0 <= g <= 1.0 and 0.0 <= b <= 1.0):
+                raise ValueError("The color components have invalid values.")
+            self.__value = (r, g, b)
+        else:
             raise TypeError("The color components have different types.")
-        if (type(r) is float and (max(r, g, b) > 1.0 or min(r, g, b) < 0.0)) or (
-            type(r) is int and (max(r, g, b) > 255 or min(r, g, b) < 0)
-        ):
-            raise ValueError("The color components have invalid values.")
-        self.__r = r
-        self.__g = g
-        self.__b = b
+        self.__hex: Optional[Color] = None
+        self.__hsl: Optional[Color] = None
+
+    @classmethod
+    def from_packed(cls, value: int) -> ColorRGB:
+        """Creates a denormalized color from a packed 0xRRGGBB integer."""
+
+        return cls((value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
 
     @property
     def r(self) -> Number:
-        return self.__r
+        if type(self.__value) is int:
+            return (self.__value >> 16) & 0xFF
+        return self.__value[0]
 
     @property
     def g(self) -> Number:
-        return self.__g
+        if type(self.__value) is int:
+            return (self.__value >> 8) & 0xFF
+        return self.__value[1]
 
     @property
     def b(self) -> Number:
-        return self.__b
+        if type(self.__value) is int:
+            return self.__value & 0xFF
+        return self.__value[2]
 
     @property
     def color(self) -> ColorTypeRGB:
-        return (self.__r, self.__g, self.__b)
+        value = self.__value
+        if type(value) is int:
+            return ((value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+        return value
+
+    @property
+    def packed(self) -> int:
+        """The color packed into a 0xRRGGBB integer."""
+
+        value = self.denormalized().__value
+        return cast(int, value)
+
+    def is_normalized(self) -> bool:
+        return type(self.__value) is tuple
 
     def cast(self, _type: Type[T]) -> T:
         # Delayed imports to avoid circular imports
@@ -49,19 +90,42 @@ class ColorRGB(Color):
         # We know that the type we are returning is correct, but the linter
         # doesn't. So, we use cast() to tell it that.
         if _type is ColorHSL:
-            h, l, s = colorsys.rgb_to_hls(*self.normalized().color)
-            return cast(T, ColorHSL(h, s, l))
+            if self.__hsl is None:
+                self.__hsl = CONVERSION_CACHE.get_or_convert(
+                    (ColorRGB, self.__value, ColorHSL), self.__to_hsl
+                )
+            return cast(T, self.__hsl)
         elif _type is ColorHex:
-            r, g, b = self.denormalized().color
-            color = f"{r:02x}{g:02x}{b:02x}"
-            return cast(T, ColorHex(color))
+            if self.__hex is None:
+                self.__hex = CONVERSION_CACHE.get_or_convert(
+                    (ColorRGB, self.__value, ColorHex), self.__to_hex
+                )
+            return cast(T, self.__hex)
         elif _type is ColorRGB:
             return cast(T, self)
         else:
             raise TypeError(f"Cannot convert to type {_type}")
 
+    def __to_hsl(self) -> Color:
+        from chroma.colors.impl import ColorHSL
+
+        value = self.__value
+        if type(value) is int:
+            # 8-bit colors take the exact integer path
+            h, s, l = rgb_to_hsl_fixed(
+                (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
+            )
+            return ColorHSL(h / HUE_SCALE, s / PERCENT_SCALE, l / PERCENT_SCALE)
+
+        h, l, s = colorsys.rgb_to_hls(*value)
+        return ColorHSL(h, s, l)
+
+    def __to_hex(self) -> Color:
+        from chroma.colors.impl import ColorHex
+
+        return ColorHex(f"{self.packed:06x}")
+
     def blended(self, color: Color, ratio: float = 0.5) -> ColorRGB:
-        is_normalized = self.color == self.normalized().color
         r1, g1, b1 = self.normalized().color
         r2, g2, b2 = color.cast(ColorRGB).normalized().color
         a1 = 1 - ratio
@@ -69,95 +133,66 @@ class ColorRGB(Color):
         r3 = clamp(a1 * r1 + a2 * r2, 0.0, 1.0)
         g3 = clamp(a1 * g1 + a2 * g2, 0.0, 1.0)
         b3 = clamp(a1 * b1 + a2 * b2, 0.0, 1.0)
-        color = ColorRGB(r3, g3, b3)
-        if is_normalized:
-            return color.normalized()
-        return color
+        return ColorRGB(r3, g3, b3)
 
     def blend(self, color: Color, ratio: float = 0.5) -> ColorRGB:
         return self.blended(color, ratio)
 
     def normalized(self) -> ColorRGB:
-        if check_types(self.color, int):
-            r = self.r / 255.0
-            g = self.g / 255.0
-            b = self.b / 255.0
-            return ColorRGB(r, g, b)
-        elif check_types(self.color, float):
-            return ColorRGB(*self.color)
-        else:
-            raise TypeError(f"The color components have different types {self.color}")
+        # The color is immutable, so an already normalized color can be shared
+        if type(self.__value) is tuple:
+            return self
+        r, g, b = self.color
+        return ColorRGB(r / 255.0, g / 255.0, b / 255.0)
 
     def normalize(self) -> ColorRGB:
         return self.normalized()
 
     def denormalized(self) -> ColorRGB:
-        if check_types(self.color, float):
-            r = int(self.r * 255.0)
-            g = int(self.g * 255.0)
-            b = int(self.b * 255.0)
-            return ColorRGB(r, g, b)
-        elif check_types(self.color, int):
-            return ColorRGB(*self.color)
-        else:
-            raise TypeError(f"The color components have different types {self.color}")
+        if type(self.__value) is int:
+            return self
+        r, g, b = self.color
+        return ColorRGB(round(r * 255.0), round(g * 255.0), round(b * 255.0))
 
     def denormalize(self) -> ColorRGB:
         return self.denormalized()
 
-    def set_r(self, r: Number) -> ColorRGB:
-        is_normal = self.color == self.normalized().color
-
-        if is_normal:
-            if type(r) is float:
-                self.__r = clamp(r, 0.0, 1.0)
-                return self
-            elif type(r) is int:
-                self.__r = clamp(r / 360.0, 0.0, 1.0)
-            never()
+    def __with_component(self, index: int, value: Number) -> ColorRGB:
+        # Match the scale of the new component to the scale of the color
+        if self.is_normalized():
+            if type(value) is int:
+                value = value / 255.0
+            value = clamp(float(value), 0.0, 1.0)
         else:
-            if type(r) is float:
-                self.__r = clamp(r * 360, 0, 360)
-                return self
-            elif type(r) is int:
-                self.__r = clamp(r, 0, 360)
-            never()
+            if type(value) is float:
+                value = round(value * 255.0)
+            value = clamp(int(value), 0, 255)
+        components = list(self.color)
+        components[index] = value
+        return ColorRGB(*components)
+
+    def set_r(self, r: Number) -> ColorRGB:
+        """Returns a copy of the color with the red component replaced."""
+
+        return self.__with_component(0, r)
 
     def set_g(self, g: Number) -> ColorRGB:
-        ig_normal = self.color == self.normalized().color
-
-        if ig_normal:
-            if type(g) is float:
-                self.__g = clamp(g, 0.0, 1.0)
-                return self
-            elif type(g) is int:
-                self.__g = clamp(g / 360.0, 0.0, 1.0)
-            never()
-        else:
-            if type(g) is float:
-                self.__g = clamp(g * 360, 0, 360)
-                return self
-            elif type(g) is int:
-                self.__g = clamp(g, 0, 360)
-            never()
+        """Returns a copy of the color with the green component replaced."""
+
+        return self.__with_component(1, g)
 
     def set_b(self, b: Number) -> ColorRGB:
-        is_normal = self.color == self.normalized().color
-
-        if is_normal:
-            if type(b) is float:
-                self.__b = clamp(b, 0.0, 1.0)
-                return self
-            elif type(b) is int:
-                self.__b = clamp(b / 360.0, 0.0, 1.0)
-            never()
-        else:
-            if type(b) is float:
-                self.__b = clamp(b * 360, 0, 360)
-                return self
-            elif type(b) is int:
-                self.__b = clamp(b, 0, 360)
-            never()
+        """Returns a copy of the color with the blue component replaced."""
+
+        return self.__with_component(2, b)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ColorRGB):
+            return NotImplemented
+        return self.__value == other.__value
+
+    def __hash__(self) -> int:
+        return hash((ColorRGB, self.__value))
 
     # TEST: Do we really need to do it this way? Why can't the user cast to HSL
     # to access these particular functions? I guess I will keep them here for
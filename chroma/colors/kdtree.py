@@ -0,0 +1,150 @@
+"""
+A static KD-tree answering batches of nearest-neighbour queries in NumPy.
+
+The tree splits the points at the median of their widest axis until every leaf
+holds at most `leaf_size` points. Leaves are stored as padded buckets with
+their bounding boxes, so queries never walk the tree one point at a time:
+
+1. Every query descends to its own leaf, one level at a time for all queries.
+2. The nearest point of that leaf bounds the distance to the true neighbour.
+3. Only the leaves whose box is closer than that bound are searched.
+
+The tree is meant for point sets of up to a few thousand points, like palettes
+and named colors, queried with whole histograms at once.
+
+```py
+tree = KDTree(as_oklab(palette))
+indices, distances = tree.query(as_oklab(histogram))
+```
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+class KDTree:
+    """A KD-tree over N×D points, built once and queried in batches."""
+
+    def __init__(self, points: np.ndarray, leaf_size: int = 8):
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim != 2 or len(points) == 0:
+            raise ValueError("A KD-tree needs a non-empty N×D array of points")
+        if leaf_size < 1:
+            raise ValueError(f"Invalid leaf size {leaf_size}")
+
+        self.__points = points
+        # Inner nodes are stored as parallel arrays. Children refer to other
+        # inner nodes, or to leaves as `-1 - leaf`.
+        self.__axes = []
+        self.__splits = []
+        self.__children = []
+        leaves: list[np.ndarray] = []
+
+        def build(indices: np.ndarray) -> int:
+            if len(indices) <= leaf_size:
+                leaves.append(indices)
+                return -len(leaves)
+
+            subset = points[indices]
+            axis = int(np.argmax(np.ptp(subset, axis=0)))
+            order = np.argsort(subset[:, axis], kind="stable")
+            half = len(indices) // 2
+
+            node = len(self.__axes)
+            self.__axes.append(axis)
+            self.__splits.append(float(subset[order[half], axis]))
+            self.__children.append([0, 0])
+            self.__children[node][0] = build(indices[order[:half]])
+            self.__children[node][1] = build(indices[order[half:]])
+            return node
+
+        self.__root = build(np.arange(len(points)))
+        self.__axes = np.array(self.__axes, dtype=np.intp)
+        self.__splits = np.array(self.__splits)
+        self.__children = np.array(self.__children, dtype=np.intp)
+
+        # Pad the leaves to the same size, so a batch of leaves can be searched
+        # with a single array operation. Padding points are infinitely far.
+        width = max(len(leaf) for leaf in leaves)
+        self.__buckets = np.full((len(leaves), width), -1, dtype=np.intp)
+        for i, leaf in enumerate(leaves):
+            self.__buckets[i, : len(leaf)] = leaf
+        self.__padded = np.vstack((points, np.full(points.shape[1], np.inf)))
+        self.__mins = np.array([points[leaf].min(axis=0) for leaf in leaves])
+        self.__maxs = np.array([points[leaf].max(axis=0) for leaf in leaves])
+
+    def __len__(self) -> int:
+        return len(self.__points)
+
+    @property
+    def points(self) -> np.ndarray:
+        return self.__points
+
+    def __leaf_of(self, queries: np.ndarray) -> np.ndarray:
+        """Descends every query to the leaf containing it."""
+
+        if self.__root < 0:
+            return np.zeros(len(queries), dtype=np.intp)
+
+        axes, splits, children = self.__axes, self.__splits, self.__children
+        rows = np.arange(len(queries))
+
+        nodes = np.full(len(queries), self.__root)
+        inner = np.ones(len(queries), dtype=bool)
+        while inner.any():
+            current = nodes[inner]
+            side = queries[rows[inner], axes[current]] >= splits[current]
+            nodes[inner] = children[current, side.astype(np.intp)]
+            inner = nodes >= 0
+        return -1 - nodes
+
+    def __search(
+        self, queries: np.ndarray, rows: np.ndarray, leaves: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the nearest point of one leaf for each (query, leaf) pair."""
+
+        candidates = self.__buckets[leaves]
+        diff = self.__padded[candidates] - queries[rows, np.newaxis, :]
+        distances = np.einsum("ijk,ijk->ij", diff, diff)
+        best = distances.argmin(axis=1)
+        picks = np.arange(len(rows))
+        return candidates[picks, best], distances[picks, best]
+
+    def query(self, queries: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Finds the nearest point of every query.
+
+        Returns the indices of the nearest points, and the euclidean distances
+        to them, as flat arrays.
+        """
+
+        queries = np.asarray(queries, dtype=np.float64).reshape(
+            -1, self.__points.shape[1]
+        )
+        rows = np.arange(len(queries))
+        home = self.__leaf_of(queries)
+        indices, distances = self.__search(queries, rows, home)
+
+        # (Q, leaves) squared distances between every query and every box
+        below = np.maximum(self.__mins[np.newaxis] - queries[:, np.newaxis], 0)
+        above = np.maximum(queries[:, np.newaxis] - self.__maxs[np.newaxis], 0)
+        gaps = below + above
+        box_distances = np.einsum("ijk,ijk->ij", gaps, gaps)
+        box_distances[rows, home] = np.inf
+
+        # Visit the other leaves from the nearest box to the farthest one, and
+        # stop once no query has a box closer than its best distance left
+        by_distance = np.argsort(box_distances, axis=1)
+        for leaves in by_distance[:, :-1].T:
+            active = box_distances[rows, leaves] < distances
+            if not active.any():
+                break
+            found, found_distances = self.__search(
+                queries, rows[active], leaves[active]
+            )
+            closer = found_distances < distances[active]
+            update = rows[active][closer]
+            indices[update] = found[closer]
+            distances[update] = found_distances[closer]
+
+        return indices, np.sqrt(distances)
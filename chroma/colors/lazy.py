@@ -0,0 +1,233 @@
+"""
+Lazily evaluated chains of color operations.
+
+Chaining methods like `color.darkened(0.4).blended(other, 0.2).lightened(0.4)`
+casts the color to HSL or RGB for every step, allocates a new color, and casts
+the result back to the original color space. A `LazyColor` only records the
+operations instead. When it is evaluated, the chain is compiled into stages
+which each run in a single color space, so the color is converted once per
+HSL/RGB boundary and no intermediate colors are created.
+
+```py
+color = (
+    lazy(prominent)
+    .darkened(0.4)
+    .blended(prominent, 0.2)
+    .lightened(0.4)
+    .evaluate()
+)
+```
+
+The same chain works for a `ColorArray`, in which case each stage runs as one
+vectorized operation over every color in the array.
+
+Note that the result can differ very slightly from the eager chain. Casting an
+HSL color to RGB produces an 8-bit color, and colors like `ColorHex` can only
+store 8-bit components, so the eager chain rounds the color after most steps.
+The lazy chain computes with floats throughout and only rounds the final
+result, which makes it the float path for callers that need the precision.
+"""
+
+from __future__ import annotations
+
+import colorsys
+from typing import Literal, Union
+
+import numpy as np
+
+from chroma.colors.array import ColorArray
+from chroma.colors.base import Color
+from chroma.colors.convert import hsl_to_rgb, rgb_to_hsl
+from chroma.colors.impl import ColorHSL, ColorRGB
+from chroma.utils.tools import clamp
+
+Space = Literal["hsl"] | Literal["rgb"]
+Operand = Union[Color, ColorArray, "LazyColor"]
+
+# An operation either adjusts a single HSL component by an amount, or blends
+# the color with another color in RGB space.
+AdjustOp = tuple[Literal["adjust"], int, float]
+BlendOp = tuple[Literal["blend"], Operand, float]
+Op = AdjustOp | BlendOp
+
+# The index of each adjustable component in a (h, s, l) color
+SATURATION = 1
+LUMINANCE = 2
+
+
+class LazyColor:
+    """A color, or an array of colors, with a recorded chain of operations.
+
+    Every method returns a new `LazyColor` with the operation appended, so a
+    partial chain can be shared and extended. Nothing is computed until
+    `evaluate()` is called.
+    """
+
+    def __init__(self, source: Color | ColorArray, ops: tuple[Op, ...] = ()):
+        self.__source = source
+        self.__ops = ops
+
+    @property
+    def source(self) -> Color | ColorArray:
+        return self.__source
+
+    @property
+    def ops(self) -> tuple[Op, ...]:
+        return self.__ops
+
+    def __append(self, op: Op) -> LazyColor:
+        return LazyColor(self.__source, (*self.__ops, op))
+
+    def darkened(self, amount: float) -> LazyColor:
+        return self.__append(("adjust", LUMINANCE, -amount))
+
+    def darken(self, amount: float) -> LazyColor:
+        return self.darkened(amount)
+
+    def lightened(self, amount: float) -> LazyColor:
+        return self.__append(("adjust", LUMINANCE, amount))
+
+    def lighten(self, amount: float) -> LazyColor:
+        return self.lightened(amount)
+
+    def saturated(self, amount: float) -> LazyColor:
+        return self.__append(("adjust", SATURATION, amount))
+
+    def saturate(self, amount: float) -> LazyColor:
+        return self.saturated(amount)
+
+    def desaturated(self, amount: float) -> LazyColor:
+        return self.__append(("adjust", SATURATION, -amount))
+
+    def desaturate(self, amount: float) -> LazyColor:
+        return self.desaturated(amount)
+
+    def blended(self, color: Operand, ratio: float = 0.5) -> LazyColor:
+        return self.__append(("blend", color, ratio))
+
+    def blend(self, color: Operand, ratio: float = 0.5) -> LazyColor:
+        return self.blended(color, ratio)
+
+    def compile(self) -> list[tuple[Space, list[Op]]]:
+        """Groups consecutive operations into stages sharing a color space."""
+
+        stages: list[tuple[Space, list[Op]]] = []
+        for op in self.__ops:
+            space: Space = "hsl" if op[0] == "adjust" else "rgb"
+            if stages and stages[-1][0] == space:
+                stages[-1][1].append(op)
+            else:
+                stages.append((space, [op]))
+        return stages
+
+    def evaluate(self) -> Color | ColorArray:
+        """Runs the operations and returns the result in the source's space.
+
+        A scalar RGB or HSL result is normalized, as it is never rounded.
+        """
+
+        if not self.__ops:
+            return self.__source
+        stages = self.compile()
+        if isinstance(self.__source, ColorArray):
+            return _evaluate_array(self.__source, stages)
+        return _evaluate_color(self.__source, stages)
+
+
+def lazy(color: Color | ColorArray) -> LazyColor:
+    """Starts recording a chain of operations on a color or array of colors."""
+
+    return LazyColor(color)
+
+
+def _resolve(operand: Operand) -> Color | ColorArray:
+    if isinstance(operand, LazyColor):
+        return operand.evaluate()
+    return operand
+
+
+def _evaluate_color(color: Color, stages: list[tuple[Space, list[Op]]]) -> Color:
+    space = stages[0][0]
+    if space == "hsl":
+        value = color.cast(ColorHSL).normalized().color
+    else:
+        value = color.cast(ColorRGB).normalized().color
+
+    for stage_space, ops in stages:
+        # Only convert the color when moving between color spaces
+        if stage_space != space:
+            if stage_space == "hsl":
+                h, l, s = colorsys.rgb_to_hls(*value)
+                value = (h, s, l)
+            else:
+                h, s, l = value
+                value = colorsys.hls_to_rgb(h, l, s)
+            space = stage_space
+
+        for op in ops:
+            if op[0] == "adjust":
+                _, index, amount = op
+                components = list(value)
+                components[index] = clamp(components[index] + amount, 0.0, 1.0)
+                value = tuple(components)
+            else:
+                _, operand, ratio = op
+                other = _resolve(operand)
+                if isinstance(other, ColorArray):
+                    raise TypeError("Cannot blend a single color with a ColorArray")
+                r2, g2, b2 = other.cast(ColorRGB).normalized().color
+                r1, g1, b1 = value
+                value = (
+                    clamp((1 - ratio) * r1 + ratio * r2, 0.0, 1.0),
+                    clamp((1 - ratio) * g1 + ratio * g2, 0.0, 1.0),
+                    clamp((1 - ratio) * b1 + ratio * b2, 0.0, 1.0),
+                )
+
+    # Casting from HSL rounds to 8-bit RGB, so convert to RGB ourselves
+    if space == "hsl" and type(color) is ColorRGB:
+        h, s, l = value
+        return ColorRGB(*colorsys.hls_to_rgb(h, l, s))
+
+    result = ColorHSL(*value) if space == "hsl" else ColorRGB(*value)
+    return result.cast(type(color))
+
+
+def _evaluate_array(
+    colors: ColorArray,
+    stages: list[tuple[Space, list[Op]]],
+) -> ColorArray:
+    space = stages[0][0]
+    if space == "hsl":
+        value = colors.cast(ColorHSL).normalized().data.copy()
+    else:
+        value = colors.cast(ColorRGB).normalized().data.copy()
+
+    for stage_space, ops in stages:
+        # Only convert the colors when moving between color spaces
+        if stage_space != space:
+            value = rgb_to_hsl(value) if stage_space == "hsl" else hsl_to_rgb(value)
+            space = stage_space
+
+        for op in ops:
+            if op[0] == "adjust":
+                _, index, amount = op
+                value[:, index] = np.clip(value[:, index] + amount, 0.0, 1.0)
+            else:
+                _, operand, ratio = op
+                other = _resolve(operand)
+                if isinstance(other, ColorArray):
+                    if len(other) != len(colors):
+                        raise ValueError(
+                            f"Cannot blend arrays of length {len(colors)} and {len(other)}"
+                        )
+                    rgb = other.cast(ColorRGB).normalized().data
+                else:
+                    rgb = np.array(other.cast(ColorRGB).normalized().color)
+                value = np.clip((1 - ratio) * value + ratio * rgb, 0.0, 1.0)
+
+    # Casting from HSL rounds to 8-bit RGB, so convert to RGB ourselves
+    if space == "hsl" and colors.space is ColorRGB:
+        return ColorArray(hsl_to_rgb(value), ColorRGB)
+
+    result = ColorArray(value, ColorHSL if space == "hsl" else ColorRGB)
+    return result.cast(colors.space)
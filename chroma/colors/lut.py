@@ -0,0 +1,172 @@
+"""
+A precomputed lookup table mapping every 8-bit RGB color to its HSL color.
+
+There are only 2^24 colors with 8-bit components, so instead of converting
+colors, the denormalized (h, s, l) of every packed 0xRRGGBB color can be
+tabulated once and looked up afterwards. The table is built on first use and
+stored in the cache directory. Later runs memory-map it read-only, which makes
+a lookup a plain index operation, and lets every process share the same pages
+without copying them.
+
+The file starts with a 16-byte header holding a magic string and the format
+version, followed by three planes: the hues as little-endian `uint16`, then the
+saturations and luminances as `uint8`. A table with a different version is
+rebuilt instead of being read. Writing a table removes the tables of the
+other versions, so bumping the version doesn't leave the old one behind.
+"""
+
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+from chroma.colors.array import FIXED_HSL_SCALES, SCALES
+from chroma.colors.convert import rgb_to_hsl_fixed_array, unpack_rgb
+from chroma.colors.impl import ColorHSL
+from chroma.logger import Logger
+from chroma.utils.paths import cache_dir
+
+logger = Logger.get_logger()
+
+LUT_MAGIC = b"CHROMLUT"
+LUT_VERSION = 2
+LUT_HEADER = np.dtype([("magic", "S8"), ("version", "<u4"), ("reserved", "<u4")])
+LUT_SIZE = 1 << 24
+
+# Number of colors converted at once while building the table. This bounds the
+# memory used by the temporary arrays.
+BUILD_CHUNK_SIZE = 1 << 20
+
+
+def lut_path() -> Path:
+    path = cache_dir() / "luts"
+    path.mkdir(parents=True, exist_ok=True)
+    return path / f"rgb_hsl.v{LUT_VERSION}.lut"
+
+
+def remove_stale_versions(path: Path) -> None:
+    """Removes the files next to `path` which only differ from it by their
+    format version, like `rgb_hsl.v1.lut` next to `rgb_hsl.v2.lut`."""
+
+    match = re.fullmatch(r"(.+)\.v\d+(\.[^.]+)", path.name)
+    if match is None:
+        return
+
+    prefix, suffix = match.groups()
+    pattern = re.compile(rf"{re.escape(prefix)}\.v\d+{re.escape(suffix)}")
+    for other in path.parent.iterdir():
+        if other.name != path.name and pattern.fullmatch(other.name):
+            logger.debug(f"Removing stale table {other}")
+            other.unlink(missing_ok=True)
+
+
+def build_lut(path: Path) -> Path:
+    """Builds the lookup table and atomically writes it to `path`.
+
+    The table is written to a temporary file first and then moved into place,
+    so concurrent readers never see a partially written table. Building is
+    deterministic, so racing builders produce identical files.
+    """
+
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    header = np.array([(LUT_MAGIC, LUT_VERSION, 0)], dtype=LUT_HEADER)
+    offset = header.nbytes
+
+    logger.debug(f"Building RGB to HSL lookup table at {path}")
+    header.tofile(tmp_path)
+    h = np.memmap(tmp_path, dtype="<u2", mode="r+", offset=offset, shape=LUT_SIZE)
+    offset += h.nbytes
+    s = np.memmap(tmp_path, dtype=np.uint8, mode="r+", offset=offset, shape=LUT_SIZE)
+    offset += s.nbytes
+    l = np.memmap(tmp_path, dtype=np.uint8, mode="r+", offset=offset, shape=LUT_SIZE)
+
+    for start in range(0, LUT_SIZE, BUILD_CHUNK_SIZE):
+        stop = min(start + BUILD_CHUNK_SIZE, LUT_SIZE)
+        rgb = unpack_rgb(np.arange(start, stop, dtype=np.uint32))
+        hsl = rgb_to_hsl_fixed_array(rgb) / FIXED_HSL_SCALES
+
+        # Round the same way as `ColorArray.denormalized()`
+        hsl = np.rint(hsl * SCALES[ColorHSL])
+        h[start:stop] = hsl[:, 0]
+        s[start:stop] = hsl[:, 1]
+        l[start:stop] = hsl[:, 2]
+
+    for plane in (h, s, l):
+        plane.flush()
+    del h, s, l
+
+    os.replace(tmp_path, path)
+    remove_stale_versions(path)
+    return path
+
+
+class HSLLookupTable:
+    """A read-only, memory-mapped view of an RGB to HSL lookup table."""
+
+    def __init__(self, path: Path):
+        self.__path = Path(path)
+        header = np.fromfile(self.__path, dtype=LUT_HEADER, count=1)
+        if (
+            header.size != 1
+            or header[0]["magic"] != LUT_MAGIC
+            or header[0]["version"] != LUT_VERSION
+        ):
+            raise ValueError(f"{path} is not a version {LUT_VERSION} lookup table")
+
+        offset = LUT_HEADER.itemsize
+        self.__h = np.memmap(path, dtype="<u2", mode="r", offset=offset, shape=LUT_SIZE)
+        offset += self.__h.nbytes
+        self.__s = np.memmap(
+            path, dtype=np.uint8, mode="r", offset=offset, shape=LUT_SIZE
+        )
+        offset += self.__s.nbytes
+        self.__l = np.memmap(
+            path, dtype=np.uint8, mode="r", offset=offset, shape=LUT_SIZE
+        )
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
+    def lookup(self, packed: np.ndarray) -> np.ndarray:
+        """Returns the denormalized HSL colors of packed 0xRRGGBB colors.
+
+        The result is an N×3 integer array, which can be passed straight to
+        `ColorArray(..., ColorHSL)`.
+        """
+
+        packed = np.asarray(packed, dtype=np.intp).reshape(-1)
+        hsl = np.empty((packed.size, 3), dtype=np.int64)
+        hsl[:, 0] = self.__h[packed]
+        hsl[:, 1] = self.__s[packed]
+        hsl[:, 2] = self.__l[packed]
+        return hsl
+
+
+_TABLE: HSLLookupTable | None = None
+
+
+def load_lut(path: Path | None = None) -> HSLLookupTable:
+    """Memory-maps the lookup table, building it first if it is missing.
+
+    A table which is malformed, or was built for another format version, is
+    rebuilt. Without a path, the table in the cache directory is used and
+    shared by every later call.
+    """
+
+    global _TABLE
+    if path is None and _TABLE is not None:
+        return _TABLE
+
+    table_path = lut_path() if path is None else Path(path)
+    try:
+        table = HSLLookupTable(table_path)
+    except (OSError, ValueError):
+        build_lut(table_path)
+        table = HSLLookupTable(table_path)
+
+    if path is None:
+        _TABLE = table
+    return table
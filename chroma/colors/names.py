@@ -0,0 +1,195 @@
+"""
+Named colors, and a perceptual index to find the name nearest to any color.
+
+The index holds the CSS named colors and an extended set of common color names.
+Names are matched without case, spaces, dashes or underscores, so "Slate Gray",
+"slate-gray" and "slategray" are the same color.
+
+```py
+lookup("rebeccapurple")  # ColorHex("#663399")
+names, distances = nearest_names(histogram)
+describe(ColorHex("#3b4261"))  # "#3b4261 ≈ charcoal"
+```
+
+The names are indexed by a KD-tree over their OKLab colors, which is built on
+first use and shared afterwards. A whole histogram is named in one batched
+query. Some CSS colors share a value, like "gray" and "grey", and only the
+first of those names is ever returned by a query.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+
+import numpy as np
+
+from chroma.colors.array import ColorArray
+from chroma.colors.base import Color
+from chroma.colors.convert import parse_hex, unpack_rgb
+from chroma.colors.impl import ColorHex, ColorRGB
+from chroma.colors.kdtree import KDTree
+from chroma.colors.oklab import as_oklab, rgb_to_oklab
+
+# The named colors of CSS Color Module Level 4
+CSS_COLORS = {
+    "aliceblue": "#f0f8ff", "antiquewhite": "#faebd7", "aqua": "#00ffff",
+    "aquamarine": "#7fffd4", "azure": "#f0ffff", "beige": "#f5f5dc",
+    "bisque": "#ffe4c4", "black": "#000000", "blanchedalmond": "#ffebcd",
+    "blue": "#0000ff", "blueviolet": "#8a2be2", "brown": "#a52a2a",
+    "burlywood": "#deb887", "cadetblue": "#5f9ea0", "chartreuse": "#7fff00",
+    "chocolate": "#d2691e", "coral": "#ff7f50", "cornflowerblue": "#6495ed",
+    "cornsilk": "#fff8dc", "crimson": "#dc143c", "cyan": "#00ffff",
+    "darkblue": "#00008b", "darkcyan": "#008b8b", "darkgoldenrod": "#b8860b",
+    "darkgray": "#a9a9a9", "darkgreen": "#006400", "darkgrey": "#a9a9a9",
+    "darkkhaki": "#bdb76b", "darkmagenta": "#8b008b", "darkolivegreen": "#556b2f",
+    "darkorange": "#ff8c00", "darkorchid": "#9932cc", "darkred": "#8b0000",
+    "darksalmon": "#e9967a", "darkseagreen": "#8fbc8f", "darkslateblue": "#483d8b",
+    "darkslategray": "#2f4f4f", "darkslategrey": "#2f4f4f",
+    "darkturquoise": "#00ced1", "darkviolet": "#9400d3", "deeppink": "#ff1493",
+    "deepskyblue": "#00bfff", "dimgray": "#696969", "dimgrey": "#696969",
+    "dodgerblue": "#1e90ff", "firebrick": "#b22222", "floralwhite": "#fffaf0",
+    "forestgreen": "#228b22", "fuchsia": "#ff00ff", "gainsboro": "#dcdcdc",
+    "ghostwhite": "#f8f8ff", "gold": "#ffd700", "goldenrod": "#daa520",
+    "gray": "#808080", "green": "#008000", "greenyellow": "#adff2f",
+    "grey": "#808080", "honeydew": "#f0fff0", "hotpink": "#ff69b4",
+    "indianred": "#cd5c5c", "indigo": "#4b0082", "ivory": "#fffff0",
+    "khaki": "#f0e68c", "lavender": "#e6e6fa", "lavenderblush": "#fff0f5",
+    "lawngreen": "#7cfc00", "lemonchiffon": "#fffacd", "lightblue": "#add8e6",
+    "lightcoral": "#f08080", "lightcyan": "#e0ffff",
+    "lightgoldenrodyellow": "#fafad2", "lightgray": "#d3d3d3",
+    "lightgreen": "#90ee90", "lightgrey": "#d3d3d3", "lightpink": "#ffb6c1",
+    "lightsalmon": "#ffa07a", "lightseagreen": "#20b2aa", "lightskyblue": "#87cefa",
+    "lightslategray": "#778899", "lightslategrey": "#778899",
+    "lightsteelblue": "#b0c4de", "lightyellow": "#ffffe0", "lime": "#00ff00",
+    "limegreen": "#32cd32", "linen": "#faf0e6", "magenta": "#ff00ff",
+    "maroon": "#800000", "mediumaquamarine": "#66cdaa", "mediumblue": "#0000cd",
+    "mediumorchid": "#ba55d3", "mediumpurple": "#9370db",
+    "mediumseagreen": "#3cb371", "mediumslateblue": "#7b68ee",
+    "mediumspringgreen": "#00fa9a", "mediumturquoise": "#48d1cc",
+    "mediumvioletred": "#c71585", "midnightblue": "#191970", "mintcream": "#f5fffa",
+    "mistyrose": "#ffe4e1", "moccasin": "#ffe4b5", "navajowhite": "#ffdead",
+    "navy": "#000080", "oldlace": "#fdf5e6", "olive": "#808000",
+    "olivedrab": "#6b8e23", "orange": "#ffa500", "orangered": "#ff4500",
+    "orchid": "#da70d6", "palegoldenrod": "#eee8aa", "palegreen": "#98fb98",
+    "paleturquoise": "#afeeee", "palevioletred": "#db7093", "papayawhip": "#ffefd5",
+    "peachpuff": "#ffdab9", "peru": "#cd853f", "pink": "#ffc0cb", "plum": "#dda0dd",
+    "powderblue": "#b0e0e6", "purple": "#800080", "rebeccapurple": "#663399",
+    "red": "#ff0000", "rosybrown": "#bc8f8f", "royalblue": "#4169e1",
+    "saddlebrown": "#8b4513", "salmon": "#fa8072", "sandybrown": "#f4a460",
+    "seagreen": "#2e8b57", "seashell": "#fff5ee", "sienna": "#a0522d",
+    "silver": "#c0c0c0", "skyblue": "#87ceeb", "slateblue": "#6a5acd",
+    "slategray": "#708090", "slategrey": "#708090", "snow": "#fffafa",
+    "springgreen": "#00ff7f", "steelblue": "#4682b4", "tan": "#d2b48c",
+    "teal": "#008080", "thistle": "#d8bfd8", "tomato": "#ff6347",
+    "turquoise": "#40e0d0", "violet": "#ee82ee", "wheat": "#f5deb3",
+    "white": "#ffffff", "whitesmoke": "#f5f5f5", "yellow": "#ffff00",
+    "yellowgreen": "#9acd32",
+}  # fmt: skip
+
+# Common color names which CSS leaves out, mostly dark and muted shades which
+# show up in wallpapers and themes
+EXTENDED_COLORS = {
+    "amber": "#ffbf00", "amethyst": "#9966cc", "apricot": "#fbceb1",
+    "ash": "#b2beb5", "blush": "#de5d83", "bronze": "#cd7f32",
+    "burgundy": "#800020", "byzantium": "#702963", "carmine": "#960018",
+    "cerulean": "#007ba7", "champagne": "#f7e7ce", "charcoal": "#36454f",
+    "cherry": "#de3163", "cobalt": "#0047ab", "copper": "#b87333",
+    "cream": "#fffdd0", "denim": "#1560bd", "eggplant": "#614051",
+    "emerald": "#50c878", "gunmetal": "#2a3439", "jade": "#00a86b",
+    "jet": "#343434", "lilac": "#c8a2c8", "mahogany": "#c04000",
+    "mauve": "#e0b0ff", "mint": "#3eb489", "moss": "#8a9a5b",
+    "mustard": "#ffdb58", "ochre": "#cc7722", "onyx": "#353839",
+    "peach": "#ffe5b4", "periwinkle": "#ccccff", "pine": "#01796f",
+    "platinum": "#e5e4e2", "raspberry": "#e30b5c", "rose": "#ff007f",
+    "ruby": "#e0115f", "rust": "#b7410e", "saffron": "#f4c430",
+    "sage": "#bcb88a", "sand": "#c2b280", "sapphire": "#0f52ba",
+    "scarlet": "#ff2400", "sepia": "#704214", "slate": "#5a6478",
+    "taupe": "#483c32", "terracotta": "#e2725b", "ultramarine": "#3f00ff",
+    "vermilion": "#e34234", "wine": "#722f37",
+}  # fmt: skip
+
+NAMED_COLORS = {**CSS_COLORS, **EXTENDED_COLORS}
+
+
+def normalize_name(name: str) -> str:
+    """Returns the key of a color name, without case, spaces or separators."""
+
+    return re.sub(r"[\s_-]+", "", name).lower()
+
+
+def lookup(name: str) -> ColorHex:
+    """Returns the color with the given name.
+
+    Raises a `KeyError` if no color has that name.
+    """
+
+    key = normalize_name(name)
+    if key not in NAMED_COLORS:
+        raise KeyError(f"No color is named '{name}'")
+    return ColorHex(NAMED_COLORS[key])
+
+
+class NameIndex:
+    """A KD-tree over a set of named colors, answering nearest-name queries.
+
+    When several names share a color, only the first one is indexed.
+    """
+
+    def __init__(self, colors: dict[str, str]):
+        packed = parse_hex(list(colors.values()))
+        _, first = np.unique(packed, return_index=True)
+        first.sort()
+
+        names = list(colors.keys())
+        self.__names = np.array([names[i] for i in first])
+        self.__tree = KDTree(rgb_to_oklab(unpack_rgb(packed[first])))
+
+    @property
+    def names(self) -> list[str]:
+        return self.__names.tolist()
+
+    def nearest(self, colors) -> tuple[list[str], np.ndarray]:
+        """Returns the nearest name of every color, and its OKLab distance.
+
+        The colors are converted with `as_oklab()`.
+        """
+
+        indices, distances = self.__tree.query(as_oklab(colors))
+        return self.__names[indices].tolist(), distances
+
+
+_INDEX: NameIndex | None = None
+
+
+def load_index() -> NameIndex:
+    """Returns the index of every named color, building it on first use."""
+
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = NameIndex(NAMED_COLORS)
+    return _INDEX
+
+
+def nearest_names(
+    colors: Color | ColorArray | Iterable[Color],
+) -> tuple[list[str], np.ndarray]:
+    """Returns the nearest name of every color, and the distances to them."""
+
+    if isinstance(colors, Color):
+        colors = [colors]
+    if not isinstance(colors, ColorArray):
+        colors = ColorArray.from_colors(colors, ColorRGB)
+    return load_index().nearest(colors)
+
+
+def nearest_name(color: Color) -> str:
+    """Returns the name of the named color nearest to a color."""
+
+    return nearest_names(color)[0][0]
+
+
+def describe(color: Color) -> str:
+    """Returns the hex code of a color followed by its nearest name."""
+
+    return f"{color.cast(ColorHex)} ≈ {nearest_name(color)}"
@@ -0,0 +1,203 @@
+"""
+Vectorized conversions to the OKLab and OKLCH color spaces, and perceptual
+distance queries built on top of them.
+
+OKLab is a perceptually uniform color space, so the euclidean distance between
+two OKLab colors (ΔE) approximates how different the colors look, unlike the
+distance between their HSL or RGB components. OKLCH is the same space in polar
+coordinates, with the lightness, the chroma and the hue in degrees.
+
+Every function works on N×3 arrays, so a whole histogram can be converted, or
+matched against thousands of candidates, in a single call:
+
+```py
+candidates = as_oklab(palette)
+indices, distances = nearest(as_oklab(histogram), candidates)
+```
+
+See https://bottosson.github.io/posts/oklab/ for the definition of the space.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+import numpy as np
+
+from chroma.colors.array import ColorArray
+from chroma.colors.base import Color
+from chroma.colors.impl import ColorRGB
+
+# Linear sRGB to LMS cone responses
+_RGB_TO_LMS = np.array(
+    [
+        [0.4122214708, 0.5363325363, 0.0514459929],
+        [0.2119034982, 0.6806995451, 0.1073969566],
+        [0.0883024619, 0.2817188376, 0.6299787005],
+    ]
+)
+
+# Non-linear LMS responses to OKLab
+_LMS_TO_LAB = np.array(
+    [
+        [0.2104542553, 0.7936177850, -0.0040720468],
+        [1.9779984951, -2.4285922050, 0.4505937099],
+        [0.0259040371, 0.7827717662, -0.8086757660],
+    ]
+)
+
+_LAB_TO_LMS = np.linalg.inv(_LMS_TO_LAB)
+_LMS_TO_RGB = np.linalg.inv(_RGB_TO_LMS)
+
+# The linear value of every 8-bit sRGB component. Looking these up is a lot
+# cheaper than evaluating the transfer function for a whole histogram.
+_LINEAR_8BIT = np.arange(256) / 255.0
+_LINEAR_8BIT = np.where(
+    _LINEAR_8BIT <= 0.04045,
+    _LINEAR_8BIT / 12.92,
+    ((_LINEAR_8BIT + 0.055) / 1.055) ** 2.4,
+)
+
+# The number of distances computed at once by `nearest()`. This bounds the
+# memory used by the temporary distance matrix.
+NEAREST_CHUNK_SIZE = 1 << 20
+
+
+def srgb_to_linear(rgb: np.ndarray) -> np.ndarray:
+    """Applies the inverse sRGB transfer function to normalized components."""
+
+    rgb = np.asarray(rgb, dtype=np.float64)
+    return np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(rgb: np.ndarray) -> np.ndarray:
+    """Applies the sRGB transfer function to linear components."""
+
+    rgb = np.asarray(rgb, dtype=np.float64)
+    curve = 1.055 * np.abs(rgb) ** (1 / 2.4) - 0.055
+    return np.where(rgb <= 0.0031308, rgb * 12.92, curve)
+
+
+def linearize(rgb: np.ndarray) -> np.ndarray:
+    """Returns the linear components of 8-bit or normalized sRGB colors.
+
+    Integer arrays are treated as 8-bit colors, and float arrays as normalized
+    colors, just like the buffer of a `ColorArray`.
+    """
+
+    rgb = np.asarray(rgb)
+    if rgb.dtype.kind in "iu":
+        return _LINEAR_8BIT[rgb]
+    return srgb_to_linear(rgb)
+
+
+def rgb_to_oklab(rgb: np.ndarray) -> np.ndarray:
+    """Converts N×3 8-bit or normalized RGB colors to OKLab."""
+
+    lms = np.cbrt(linearize(rgb).reshape(-1, 3) @ _RGB_TO_LMS.T)
+    return lms @ _LMS_TO_LAB.T
+
+
+def oklab_to_rgb(lab: np.ndarray) -> np.ndarray:
+    """Converts N×3 OKLab colors to normalized RGB colors.
+
+    Colors outside of the sRGB gamut are clipped to it.
+    """
+
+    lab = np.asarray(lab, dtype=np.float64).reshape(-1, 3)
+    lms = (lab @ _LAB_TO_LMS.T) ** 3
+    return np.clip(linear_to_srgb(lms @ _LMS_TO_RGB.T), 0.0, 1.0)
+
+
+def oklab_to_oklch(lab: np.ndarray) -> np.ndarray:
+    """Converts N×3 OKLab colors to OKLCH, with the hue in degrees."""
+
+    lab = np.asarray(lab, dtype=np.float64).reshape(-1, 3)
+    chroma = np.hypot(lab[:, 1], lab[:, 2])
+    hue = np.degrees(np.arctan2(lab[:, 2], lab[:, 1])) % 360.0
+    return np.stack((lab[:, 0], chroma, hue), axis=1)
+
+
+def oklch_to_oklab(lch: np.ndarray) -> np.ndarray:
+    """Converts N×3 OKLCH colors, with the hue in degrees, to OKLab."""
+
+    lch = np.asarray(lch, dtype=np.float64).reshape(-1, 3)
+    hue = np.radians(lch[:, 2])
+    return np.stack(
+        (lch[:, 0], lch[:, 1] * np.cos(hue), lch[:, 1] * np.sin(hue)), axis=1
+    )
+
+
+def as_oklab(colors: Color | ColorArray | Iterable[Color] | np.ndarray) -> np.ndarray:
+    """Returns the OKLab colors of a color, an array or a list of colors.
+
+    NumPy arrays are assumed to already hold OKLab colors, so colors can be
+    converted once and queried many times.
+    """
+
+    if isinstance(colors, np.ndarray):
+        return colors.reshape(-1, 3)
+    if isinstance(colors, Color):
+        colors = [colors]
+    if not isinstance(colors, ColorArray):
+        colors = ColorArray.from_colors(colors, ColorRGB)
+    return rgb_to_oklab(colors.cast(ColorRGB).data)
+
+
+def delta_e(a, b) -> np.ndarray:
+    """Returns the distance between the colors of `a` and `b`, pair by pair.
+
+    Both arguments are converted with `as_oklab()`. A single color is compared
+    with every color of the other argument.
+    """
+
+    return np.linalg.norm(as_oklab(a) - as_oklab(b), axis=1)
+
+
+def delta_e_matrix(a, b) -> np.ndarray:
+    """Returns the N×M matrix of distances between every color of `a` and `b`."""
+
+    lab1, lab2 = as_oklab(a), as_oklab(b)
+    return np.linalg.norm(lab1[:, np.newaxis, :] - lab2[np.newaxis, :, :], axis=2)
+
+
+def nearest(queries, candidates, k: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """Finds the `k` nearest candidates of every query color.
+
+    Returns the indices of the candidates and their distances, as N×k arrays
+    sorted from the nearest to the farthest candidate, or as flat arrays of
+    length N if `k` is 1. The queries are processed in chunks, so the memory
+    used stays bounded even for large histograms.
+    """
+
+    queries, candidates = as_oklab(queries), as_oklab(candidates)
+    if not 1 <= k <= len(candidates):
+        raise ValueError(f"Cannot find {k} of {len(candidates)} candidates")
+
+    indices = np.empty((len(queries), k), dtype=np.intp)
+    distances = np.empty((len(queries), k), dtype=np.float64)
+    norms = np.einsum("ij,ij->i", candidates, candidates)
+    chunk = max(1, NEAREST_CHUNK_SIZE // len(candidates))
+
+    for start in range(0, len(queries), chunk):
+        stop = min(start + chunk, len(queries))
+        block = queries[start:stop]
+        # |q - c|^2 = |q|^2 - 2 q·c + |c|^2, without the N×M×3 difference array.
+        # Only the order matters here, so |q|^2 can be left out.
+        scores = norms - 2 * (block @ candidates.T)
+
+        if k == 1:
+            best = np.argmin(scores, axis=1)[:, np.newaxis]
+        else:
+            best = np.argpartition(scores, k - 1, axis=1)[:, :k]
+            order = np.take_along_axis(scores, best, axis=1).argsort(axis=1)
+            best = np.take_along_axis(best, order, axis=1)
+
+        # Compute the distances of the winners exactly, without cancellation
+        diff = block[:, np.newaxis, :] - candidates[best]
+        indices[start:stop] = best
+        distances[start:stop] = np.linalg.norm(diff, axis=2)
+
+    if k == 1:
+        return indices[:, 0], distances[:, 0]
+    return indices, distances
@@ -0,0 +1,94 @@
+"""
+Tonal ramps of a whole palette, computed in one vectorized pass.
+
+A ramp keeps the hue of a base color and walks its lightness towards white on
+one side and towards black on the other. The lightness is stepped in OKLCH,
+so the steps look evenly spaced, and the chroma is tapered towards the ends
+of the ramp, so the lightest and darkest shades stay inside the sRGB gamut
+instead of being clipped into a different hue.
+
+```py
+# Five shades of every color, with the original colors in the middle
+shades = shade_ramps(ColorArray.from_hex(["#3584e4", "#33d17a"]), steps=5)
+lightest, darkest = shades[0], shades[-1]
+```
+"""
+
+from collections.abc import Iterable
+
+import numpy as np
+
+from chroma.colors.array import ColorArray
+from chroma.colors.base import Color
+from chroma.colors.impl import ColorHex, ColorRGB
+from chroma.colors.oklab import (
+    oklab_to_oklch,
+    oklab_to_rgb,
+    oklch_to_oklab,
+    rgb_to_oklab,
+)
+
+# How far the ends of a ramp move towards white and black, as a fraction of
+# the distance between the base lightness and white or black
+DEFAULT_SPREAD = 0.5
+
+
+def ramp_offsets(
+    steps: int, base_step: int, spread: float = DEFAULT_SPREAD
+) -> np.ndarray:
+    """Returns the lightness offset of every step of a ramp, from light to dark.
+
+    Positive offsets move towards white and negative ones towards black. The
+    step `base_step` has an offset of 0, and the ramp is scaled so the farther
+    end reaches `spread`.
+    """
+
+    if not 0 <= base_step < steps:
+        raise ValueError(f"The base step {base_step} is outside of {steps} steps")
+    offsets = (base_step - np.arange(steps)).astype(np.float64)
+    reach = max(base_step, steps - 1 - base_step, 1)
+    return offsets / reach * spread
+
+
+def shade_ramps(
+    colors: ColorArray | Iterable[Color],
+    steps: int = 5,
+    base_step: int | None = None,
+    spread: float = DEFAULT_SPREAD,
+) -> list[ColorArray]:
+    """Builds a ramp of `steps` shades for every color, from light to dark.
+
+    Returns one `ColorArray` of hex colors per step, each holding the shade of
+    every base color at that step, so `shades[k][i]` is the k-th shade of the
+    i-th color. The base colors are at `base_step`, which defaults to the
+    middle of the ramp. All the shades are computed at once.
+    """
+
+    if not isinstance(colors, ColorArray):
+        colors = ColorArray.from_colors(colors, ColorRGB)
+    if base_step is None:
+        base_step = steps // 2
+    offsets = ramp_offsets(steps, base_step, spread)
+
+    lch = oklab_to_oklch(rgb_to_oklab(colors.cast(ColorRGB).data))
+    l, c, h = lch[:, 0], lch[:, 1], lch[:, 2]
+
+    # (steps, N) arrays of the lightness and chroma of every shade
+    l = np.clip(l, 0.0, 1.0)
+    lightness = np.where(
+        offsets[:, np.newaxis] >= 0,
+        l + offsets[:, np.newaxis] * (1.0 - l),
+        l + offsets[:, np.newaxis] * l,
+    )
+    # Taper the chroma with the room left between the lightness and the ends
+    room = lightness * (1.0 - lightness)
+    base_room = np.maximum(l * (1.0 - l), 1e-9)
+    chroma = c * np.minimum(1.0, room / base_room)
+
+    shades = np.stack((lightness, chroma, np.broadcast_to(h, lightness.shape)), axis=2)
+    rgb = oklab_to_rgb(oklch_to_oklab(shades.reshape(-1, 3)))
+    rgb = np.rint(rgb * 255).astype(np.int64).reshape(steps, -1, 3)
+
+    # Keep the base colors exactly as they were, without conversion error
+    rgb[base_step] = colors.cast(ColorRGB).denormalized().data
+    return [ColorArray(shade, ColorHex) for shade in rgb]
@@ -3,4 +3,4 @@ from typing import Type
 
 
 def check_types(iterable: Iterable, _type: Type) -> bool:
-    return all([type(val) is _type for val in iterable])
+    return all(type(val) is _type for val in iterable)
@@ -0,0 +1,250 @@
+"""
+Quantization of colors to the xterm-256 and base-16 terminal palettes.
+
+Some targets, like tmux, older terminals or the Linux console, only accept
+indexed colors. The nearest palette index of every packed 0xRRGGBB color is
+precomputed into a table with one byte per color, so quantizing a color is a
+single index operation. Like the HSL lookup table, the tables are built on
+first use, stored in the cache directory, and memory-mapped afterwards.
+
+```py
+indices = quantize(ColorArray.from_hex(["#1a1b26", "#ee9a68"]))
+```
+
+The xterm-256 palette only maps to indices 16 to 255. The first 16 colors are
+configured by the user's terminal theme, so they can't be relied upon. The
+base-16 palette maps to the default xterm values of those 16 colors instead.
+
+Distances are measured in RGB by default, which is what most terminal tools
+do. Passing `metric="oklab"` measures perceptual distances instead.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+
+from chroma.colors.array import ColorArray
+from chroma.colors.base import Color
+from chroma.colors.convert import pack_rgb, unpack_rgb
+from chroma.colors.impl import ColorRGB
+from chroma.colors.lut import LUT_HEADER, LUT_SIZE, remove_stale_versions
+from chroma.colors.oklab import rgb_to_oklab
+from chroma.logger import Logger
+from chroma.utils.paths import cache_dir
+
+logger = Logger.get_logger()
+
+Metric = Literal["rgb"] | Literal["oklab"]
+PaletteSize = Literal[256] | Literal[16]
+
+TABLE_MAGIC = b"CHROMXTM"
+TABLE_VERSION = 1
+
+# Number of colors quantized at once while building a table
+BUILD_CHUNK_SIZE = 1 << 18
+
+# The default xterm values of the 16 system colors
+SYSTEM_COLORS = [
+    0x000000, 0xCD0000, 0x00CD00, 0xCDCD00, 0x0000EE, 0xCD00CD, 0x00CDCD, 0xE5E5E5,
+    0x7F7F7F, 0xFF0000, 0x00FF00, 0xFFFF00, 0x5C5CFF, 0xFF00FF, 0x00FFFF, 0xFFFFFF,
+]  # fmt: skip
+
+# The levels of each component of the 6×6×6 color cube (indices 16 to 231),
+# and of the grey ramp (indices 232 to 255)
+CUBE_LEVELS = np.array([0, 95, 135, 175, 215, 255])
+GREY_LEVELS = np.arange(8, 248, 10)
+
+# Every color of the xterm-256 palette, as an 8-bit 256×3 array
+XTERM_COLORS = np.concatenate(
+    [
+        unpack_rgb(np.array(SYSTEM_COLORS)),
+        np.stack(np.meshgrid(CUBE_LEVELS, CUBE_LEVELS, CUBE_LEVELS, indexing="ij"))
+        .reshape(3, -1)
+        .T,
+        np.repeat(GREY_LEVELS[:, np.newaxis], 3, axis=1),
+    ]
+).astype(np.uint8)
+
+# The indices each palette may map to
+PALETTE_INDICES: dict[int, np.ndarray] = {
+    256: np.arange(16, 256),
+    16: np.arange(16),
+}
+
+# The nearest cube level of every 8-bit component
+_NEAREST_LEVEL = np.abs(np.arange(256)[:, np.newaxis] - CUBE_LEVELS).argmin(axis=1)
+
+
+def _nearest_cube_or_grey(rgb: np.ndarray) -> np.ndarray:
+    """Finds the nearest xterm-256 index in RGB without a brute-force search.
+
+    Euclidean distances are separable, so the nearest cube color is made of
+    the nearest level of every component. The nearest grey is the grey level
+    nearest to the mean of the components. The closer of the two wins.
+    """
+
+    rgb = rgb.astype(np.int64)
+    levels = _NEAREST_LEVEL[rgb]
+    cube = 16 + levels[:, 0] * 36 + levels[:, 1] * 6 + levels[:, 2]
+
+    mean = rgb.mean(axis=1)
+    grey = np.clip(np.rint((mean - 8) / 10), 0, 23).astype(np.int64) + 232
+
+    cube_dist = ((rgb - XTERM_COLORS[cube]) ** 2).sum(axis=1)
+    grey_dist = ((rgb - XTERM_COLORS[grey]) ** 2).sum(axis=1)
+    return np.where(grey_dist < cube_dist, grey, cube)
+
+
+def _to_metric(rgb: np.ndarray, metric: Metric) -> np.ndarray:
+    if metric == "oklab":
+        return rgb_to_oklab(rgb).astype(np.float32)
+    if metric == "rgb":
+        return rgb.astype(np.float32)
+    raise ValueError(f"Unknown distance metric '{metric}'")
+
+
+def nearest_index(
+    rgb: np.ndarray,
+    size: PaletteSize = 256,
+    metric: Metric = "rgb",
+) -> np.ndarray:
+    """Computes the nearest palette index of N×3 8-bit colors without a table."""
+
+    rgb = np.asarray(rgb).reshape(-1, 3)
+    if size not in PALETTE_INDICES:
+        raise ValueError(f"Unsupported palette size {size}")
+    if size == 256 and metric == "rgb":
+        return _nearest_cube_or_grey(rgb)
+
+    indices = PALETTE_INDICES[size]
+    candidates = _to_metric(XTERM_COLORS[indices], metric)
+    # Only the order matters, so |q|^2 can be left out of |q - c|^2
+    scores = _to_metric(rgb, metric) @ (-2 * candidates.T)
+    scores += np.einsum("ij,ij->i", candidates, candidates)
+    return indices[scores.argmin(axis=1)]
+
+
+def table_path(size: PaletteSize = 256, metric: Metric = "rgb") -> Path:
+    path = cache_dir() / "luts"
+    path.mkdir(parents=True, exist_ok=True)
+    return path / f"xterm{size}_{metric}.v{TABLE_VERSION}.lut"
+
+
+def build_table(path: Path, size: PaletteSize = 256, metric: Metric = "rgb") -> Path:
+    """Builds the nearest-index table of a palette and writes it to `path`.
+
+    Like `build_lut()`, the table is written to a temporary file first and
+    then moved into place.
+    """
+
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    # The header is shared with the HSL lookup table, and the reserved field
+    # holds the size of the palette
+    header = np.array([(TABLE_MAGIC, TABLE_VERSION, size)], dtype=LUT_HEADER)
+
+    logger.debug(f"Building xterm-{size} {metric} index table at {path}")
+    header.tofile(tmp_path)
+    table = np.memmap(
+        tmp_path, dtype=np.uint8, mode="r+", offset=header.nbytes, shape=LUT_SIZE
+    )
+    for start in range(0, LUT_SIZE, BUILD_CHUNK_SIZE):
+        stop = min(start + BUILD_CHUNK_SIZE, LUT_SIZE)
+        rgb = unpack_rgb(np.arange(start, stop, dtype=np.uint32))
+        table[start:stop] = nearest_index(rgb, size, metric)
+    table.flush()
+    del table
+
+    os.replace(tmp_path, path)
+    remove_stale_versions(path)
+    return path
+
+
+class XtermTable:
+    """A read-only, memory-mapped nearest-index table of a palette."""
+
+    def __init__(self, path: Path, size: PaletteSize = 256):
+        self.__path = Path(path)
+        header = np.fromfile(self.__path, dtype=LUT_HEADER, count=1)
+        if (
+            header.size != 1
+            or header[0]["magic"] != TABLE_MAGIC
+            or header[0]["version"] != TABLE_VERSION
+            or header[0]["reserved"] != size
+        ):
+            raise ValueError(f"{path} is not a version {TABLE_VERSION} index table")
+
+        self.__size = size
+        self.__table = np.memmap(
+            path, dtype=np.uint8, mode="r", offset=LUT_HEADER.itemsize, shape=LUT_SIZE
+        )
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def lookup(self, packed: np.ndarray) -> np.ndarray:
+        """Returns the palette indices of packed 0xRRGGBB colors."""
+
+        packed = np.asarray(packed, dtype=np.intp).reshape(-1)
+        return self.__table[packed]
+
+
+_TABLES: dict[tuple[int, str], XtermTable] = {}
+
+
+def load_table(
+    size: PaletteSize = 256,
+    metric: Metric = "rgb",
+    path: Path | None = None,
+) -> XtermTable:
+    """Memory-maps the index table of a palette, building it if it is missing.
+
+    Without a path, the table in the cache directory is used and shared by
+    every later call.
+    """
+
+    key = (size, metric)
+    if path is None and key in _TABLES:
+        return _TABLES[key]
+
+    table_file = table_path(size, metric) if path is None else Path(path)
+    try:
+        table = XtermTable(table_file, size)
+    except (OSError, ValueError):
+        build_table(table_file, size, metric)
+        table = XtermTable(table_file, size)
+
+    if path is None:
+        _TABLES[key] = table
+    return table
+
+
+def quantize(
+    colors: Color | ColorArray | Iterable[Color],
+    size: PaletteSize = 256,
+    metric: Metric = "rgb",
+) -> np.ndarray:
+    """Returns the nearest palette index of every color."""
+
+    if isinstance(colors, Color):
+        colors = [colors]
+    if not isinstance(colors, ColorArray):
+        colors = ColorArray.from_colors(colors, ColorRGB)
+    packed = pack_rgb(colors.cast(ColorRGB).denormalized().data)
+    return load_table(size, metric).lookup(packed)
+
+
+def to_xterm(color: Color, size: PaletteSize = 256, metric: Metric = "rgb") -> int:
+    """Returns the nearest palette index of a single color."""
+
+    return int(quantize(color, size, metric)[0])
@@ -1,17 +1,41 @@
+import glob
+import inspect
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Callable
+from typing import Callable, NamedTuple
 
 from chroma.colors import Color
+from chroma.colors.oklab import delta_e
 from chroma.logger import Logger
 from chroma.utils.dynamic import discover_modules
 from chroma.utils.generator import write_lua_colors
+from chroma.utils.palette_cache import PaletteCache, palette_key
 from chroma.utils.paths import chroma_dir
 
 logger = Logger.get_logger()
 
+# The file types picked up when generating the palettes of a directory
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+
+# The most images handed to a backend which generates many images at once
+BATCH_CHUNK_SIZE = 32
+
+# The image size of the first palette of a progressive generation, which
+# doubles for every refinement
+PROGRESSIVE_START_SIZE = 32
+
+# A refinement is final once no color moved further than this OKLab distance,
+# which is about the smallest difference the eye notices
+PROGRESSIVE_TOLERANCE = 0.02
+
 # TODO: Make the generators into a class, just like integrations
 GENERATORS_REGISTRY: dict[str, Callable] = {}
 
+# Backends which can also generate the palettes of a list of images at once
+BATCH_REGISTRY: dict[str, Callable] = {}
+
 
 def prepare():
     generators = discover_modules(chroma_dir() / "generators")
@@ -22,18 +46,40 @@ def prepare():
             GENERATORS_REGISTRY.update(entry)
             for name in entry:
                 logger.debug(f"Registered generator '{name}'")
+        if hasattr(generator, "register_batch") and callable(
+            getattr(generator, "register_batch")
+        ):
+            BATCH_REGISTRY.update(getattr(generator, "register_batch")())
+
+
+def resolve_options(generator: Callable, kwargs: dict) -> dict:
+    """Returns every option a backend runs with, including its defaults."""
+
+    bound = inspect.signature(generator).bind_partial(**kwargs)
+    bound.apply_defaults()
+    return dict(bound.arguments)
+
+
+def _cache_key(name: str, image_path: Path, kwargs: dict) -> str:
+    options = resolve_options(GENERATORS_REGISTRY[name], kwargs)
+    return palette_key(image_path, name, options)
 
 
 def generate(
     name: str,
     image_path: Path | str,
     output_path: Path | str | None = None,
+    use_cache: bool = False,
     **kwargs,
 ) -> dict[str, Color] | None:
     """
     If `output_path` is None, then the colors are returned as a dict of color
     name and the resultant color object. Otherwise, the color is converted to
     a lua theme and written to the output path provided it is valid.
+
+    If `use_cache` is set, the palette is looked up in the palette cache first,
+    keyed by the contents of the image, the backend and the options. A palette
+    which has to be generated is stored in the cache afterwards.
     """
     prepare()
     generator = GENERATORS_REGISTRY.get(name)
@@ -41,10 +87,285 @@ def generate(
         raise ValueError(f"Backend '{name}': no such backend")
 
     image_path = Path(image_path)
-    theme = generator(image_path, **kwargs)
+    if use_cache:
+        cache = PaletteCache()
+        key = _cache_key(name, image_path, kwargs)
+        theme = cache.get(key)
+        if theme is None:
+            theme = generator(image_path, **kwargs)
+            cache.put(key, theme)
+        else:
+            logger.debug(f"Using the cached palette of {image_path}")
+    else:
+        theme = generator(image_path, **kwargs)
 
     if output_path is None:
         return theme
     else:
         output_path = Path(output_path)
         write_lua_colors(output_path, theme)
+
+
+def progressive_sizes(
+    image_size: int, start: int = PROGRESSIVE_START_SIZE
+) -> list[int]:
+    """Returns the image sizes a progressive generation goes through, from
+    `start` doubling up to `image_size`."""
+
+    sizes = []
+    size = start
+    while size < image_size:
+        sizes.append(size)
+        size *= 2
+    return sizes + [image_size]
+
+
+def palette_distance(a: dict[str, Color], b: dict[str, Color]) -> float:
+    """Returns the largest OKLab distance between the colors of the same slot
+    of two palettes, or infinity if they don't have the same slots."""
+
+    if a.keys() != b.keys():
+        return float("inf")
+    if not a:
+        return 0.0
+    names = list(a)
+    return float(delta_e([a[n] for n in names], [b[n] for n in names]).max())
+
+
+def generate_progressive(
+    name: str,
+    image_path: Path | str,
+    image_size: int = 256,
+    tolerance: float = PROGRESSIVE_TOLERANCE,
+    **kwargs,
+) -> Iterator[tuple[int, dict[str, Color]]]:
+    """
+    Generates the palette of an image at increasing image sizes, and yields
+    the size and the palette of every step as soon as it is ready.
+
+    The first palette comes from a tiny sample of the image, which is fast
+    enough for interactive use. Every next step doubles the size, up to
+    `image_size`, and the generation stops early once a step changes no
+    color of the palette by more than `tolerance`. The last palette yielded
+    is the final one. The keyword arguments are passed on to the backend,
+    like for `generate()`.
+
+    ```py
+    for size, palette in generate_progressive("pillow", "wallpaper.jpg"):
+        preview(palette)
+    ```
+    """
+
+    prepare()
+    generator = GENERATORS_REGISTRY.get(name)
+    if generator is None:
+        raise ValueError(f"Backend '{name}': no such backend")
+    if image_size < 1:
+        raise ValueError(f"Cannot generate a palette at {image_size} pixels")
+
+    # Validating happens above, before the first palette is asked for
+    return _refine(generator, Path(image_path), image_size, tolerance, kwargs)
+
+
+def _refine(
+    generator: Callable,
+    image_path: Path,
+    image_size: int,
+    tolerance: float,
+    kwargs: dict,
+) -> Iterator[tuple[int, dict[str, Color]]]:
+    previous = None
+    for size in progressive_sizes(image_size):
+        theme = generator(image_path, image_size=size, **kwargs)
+        yield size, theme
+
+        if previous is not None and palette_distance(previous, theme) <= tolerance:
+            logger.debug(f"The palette of {image_path} settled at {size}px")
+            return
+        previous = theme
+
+
+class BatchResult(NamedTuple):
+    """The outcome of generating the palette of one image of a batch."""
+
+    image_path: Path
+    output_path: Path
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def find_images(source: Path | str | Iterable[Path | str]) -> list[Path]:
+    """
+    Returns the images to generate palettes for, sorted by path. The source is
+    either a directory, whose images are used, a glob pattern like
+    `~/wallpapers/**/*.png`, or a list of image paths.
+    """
+
+    if not isinstance(source, (str, Path)):
+        return sorted(Path(path) for path in source)
+
+    path = Path(source).expanduser()
+    if path.is_dir():
+        return sorted(
+            image
+            for image in path.iterdir()
+            if image.is_file() and image.suffix.lower() in IMAGE_EXTENSIONS
+        )
+    if path.is_file():
+        return [path]
+    return sorted(Path(match) for match in glob.glob(str(path), recursive=True))
+
+
+def output_paths(images: list[Path], output_dir: Path) -> list[Path]:
+    """
+    Returns the palette file of every image, named after the image. Images
+    sharing a name, like from different directories, get a numbered suffix.
+    """
+
+    seen: dict[str, int] = {}
+    paths = []
+    for image in images:
+        count = seen.get(image.stem, 0)
+        seen[image.stem] = count + 1
+        name = image.stem if count == 0 else f"{image.stem}-{count}"
+        paths.append(output_dir / f"{name}.lua")
+    return paths
+
+
+def _failure(image_path: Path, output_path: Path, e: BaseException) -> BatchResult:
+    return BatchResult(image_path, output_path, f"{type(e).__name__}: {e}")
+
+
+def _generate_one(
+    name: str, image_path: Path, output_path: Path, use_cache: bool, kwargs: dict
+) -> BatchResult:
+    # Runs in a worker process, so every failure is returned instead of raised
+    # to keep the rest of the batch going
+    try:
+        generate(name, image_path, output_path, use_cache=use_cache, **kwargs)
+    except Exception as e:
+        return _failure(image_path, output_path, e)
+    return BatchResult(image_path, output_path)
+
+
+def _generate_chunk(
+    name: str, jobs: list[tuple[Path, Path]], use_cache: bool, kwargs: dict
+) -> list[BatchResult]:
+    """Generates the palettes of a chunk of images in a worker process. If the
+    backend can generate many images at once, the images which aren't cached
+    are handed to it together."""
+
+    prepare()
+    batch = BATCH_REGISTRY.get(name)
+    if batch is None:
+        return [
+            _generate_one(name, image_path, output_path, use_cache, kwargs)
+            for image_path, output_path in jobs
+        ]
+
+    cache = PaletteCache() if use_cache else None
+    results = []
+    pending = []
+    for image_path, output_path in jobs:
+        try:
+            key = _cache_key(name, image_path, kwargs) if cache else None
+            theme = cache.get(key) if cache else None
+            if theme is None:
+                pending.append((image_path, output_path, key))
+                continue
+            write_lua_colors(output_path, theme)
+        except Exception as e:
+            results.append(_failure(image_path, output_path, e))
+            continue
+        logger.debug(f"Using the cached palette of {image_path}")
+        results.append(BatchResult(image_path, output_path))
+
+    try:
+        themes = batch([image_path for image_path, _, _ in pending], **kwargs)
+    except Exception as e:
+        return results + [_failure(image, output, e) for image, output, _ in pending]
+
+    for (image_path, output_path, key), theme in zip(pending, themes):
+        try:
+            if isinstance(theme, Exception):
+                raise theme
+            if cache:
+                cache.put(key, theme)
+            write_lua_colors(output_path, theme)
+        except Exception as e:
+            results.append(_failure(image_path, output_path, e))
+            continue
+        results.append(BatchResult(image_path, output_path))
+    return results
+
+
+def generate_many(
+    name: str,
+    source: Path | str | Iterable[Path | str],
+    output_dir: Path | str,
+    workers: int | None = None,
+    use_cache: bool = False,
+    **kwargs,
+) -> Iterator[BatchResult]:
+    """
+    Generates the palette of every image of a source, as found by
+    `find_images()`, and writes each one as a lua theme into `output_dir`.
+
+    The images are spread over a pool of `workers` processes, one per core by
+    default, and the results are yielded as they complete rather than in
+    order. An image which fails to generate yields a result with its error,
+    without stopping the others. The keyword arguments are passed on to the
+    backend, like for `generate()`.
+    """
+
+    prepare()
+    if name not in GENERATORS_REGISTRY:
+        raise ValueError(f"Backend '{name}': no such backend")
+
+    images = find_images(source)
+    output_dir = Path(output_dir).expanduser()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    jobs = list(zip(images, output_paths(images, output_dir)))
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    logger.debug(f"Generating {len(jobs)} palettes with {workers} workers")
+
+    # Validating happens above, before the first result is asked for
+    return _run_batch(name, jobs, workers, use_cache, kwargs)
+
+
+def _run_batch(
+    name: str,
+    jobs: list[tuple[Path, Path]],
+    workers: int,
+    use_cache: bool,
+    kwargs: dict,
+) -> Iterator[BatchResult]:
+    # Backends which generate many images at once get a chunk of images per
+    # task, to share their startup cost, and the others one image per task.
+    # The chunks stay small enough that every worker gets some of them.
+    size = 1
+    if name in BATCH_REGISTRY:
+        size = max(1, min(BATCH_CHUNK_SIZE, -(-len(jobs) // workers)))
+    chunks = [jobs[start : start + size] for start in range(0, len(jobs), size)]
+
+    # A single worker runs in this process, which spares starting the pool
+    if workers == 1:
+        for chunk in chunks:
+            yield from _generate_chunk(name, chunk, use_cache, kwargs)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_generate_chunk, name, chunk, use_cache, kwargs): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            try:
+                yield from future.result()
+            except Exception as e:
+                # The worker itself died, like when it ran out of memory
+                for image_path, output_path in futures[future]:
+                    yield _failure(image_path, output_path, e)
@@ -1,165 +1,153 @@
-import re
+import heapq
+import itertools
 import subprocess
+import tempfile
+from collections.abc import Iterable
 from pathlib import Path
-from typing import Callable
 
-from chroma.colors import Color, ColorHex, ColorHSL
+import numpy as np
+
+from chroma.colors import Color
+from chroma.colors.convert import parse_hex
+from chroma.colors.dedupe import DEDUPE_THRESHOLD
+from chroma.generators.quantizers import QUANTIZE_COLORS, quantize
 from chroma.logger import Logger
-from chroma.types import HSLMap, HSLMapValue
-from chroma.utils.generator import clamp_color_to_hslrules, match_color_from_hslmap
-from chroma.utils.tools import check_program, clamp
+from chroma.types import ContrastPair
+from chroma.utils.palette import (  # noqa: F401
+    CONTRAST_PAIRS,
+    GENERATORS,
+    HSL_MAP,
+    NORMAL_COLORS,
+    build_palette,
+    generator_accent,
+    generator_bg,
+    generator_black,
+    generator_bright,
+    generator_fg,
+    generator_norm,
+    generator_white,
+    pixel_histogram,
+    top_colors,
+)
+from chroma.utils.tools import check_program
 
 logger = Logger.get_logger()
 
-HSL_MAP: HSLMap = {
-    "accent": (None, (60, 100), (50, 90)),
-    "black": (None, None, (5, 20)),
-    "white": (None, None, (80, 95)),
-    "background": (None, (0, 20), (5, 10)),
-    "foreground": (None, (0, 20), (90, 95)),
-    "red": ([(0, 35), (325, 360)], (40, 90), (30, 90)),
-    "orange": ((35, 75), (30, 90), (40, 80)),
-    "brown": ((35, 75), (30, 70), (20, 70)),
-    "yellow": ((65, 105), (40, 90), (30, 90)),
-    "green": ((100, 160), (40, 90), (30, 90)),
-    "blue": ((200, 230), (40, 50), (40, 60)),
-    "cyan": ((170, 200), (40, 90), (40, 90)),
-    "magenta": ((280, 310), (30, 50), (30, 50)),
-}
-
-
-# NOTE: These generators are used when the corresponding color cannot be inferred
-# from the image.
-# NOTE: Each generator must return a ColorHex object.
-
-
-def generator_fg(
-    white: Color,
-    accent: Color,
-    blend_ratio: float,
-    light_ratio: float,
-    condition: HSLMapValue,
-) -> ColorHex:
-    white = white.cast(ColorHSL).normalize()
-    accent = accent.cast(ColorHSL).normalize()
-    l1 = white.color[0]
-    l2 = accent.color[0]
-    hue = l1 * blend_ratio + l2 * blend_ratio
-    white.set_l(clamp(hue, 0.0, 1.0))
-    white = white.lighten(light_ratio)
-    color = clamp_color_to_hslrules(white, condition)
-    return color.cast(ColorHex)
-
-
-def generator_bg(
-    black: Color,
-    accent: Color,
-    blend_ratio: float,
-    dark_ratio: float,
-    condition: HSLMapValue,
-) -> ColorHex:
-    black = black.cast(ColorHSL).normalize()
-    accent = accent.cast(ColorHSL).normalize()
-    l1 = black.color[0]
-    l2 = accent.color[0]
-    hue = l1 * blend_ratio + l2 * blend_ratio
-    black.set_l(clamp(hue, 0.0, 1.0))
-    black = black.darken(dark_ratio)
-    color = clamp_color_to_hslrules(black, condition)
-    return color.cast(ColorHex)
-
-
-def generator_norm(
-    white: Color,
-    accent: Color,
-    mix_hex: str,
-    condition: HSLMapValue,
-) -> ColorHex:
-    mix = ColorHex(mix_hex)
-    if mix.cast(ColorHSL).l < 0.3:
-        mix = mix.cast(ColorHSL).set_l(0.45)
-    else:
-        mix = mix.darkened(0.25)
-    color = white.blended(mix, 0.75)
-    color = color.blended(accent, 0.15)
-    color = color.saturated(0.2)
-    color = color.darkened(0.2)
-    color = color.blend(mix, 0.15)
-    color = color.lighten(0.25)
-    color = clamp_color_to_hslrules(color, condition)
-    return color.cast(ColorHex)
-
-
-def generator_bright(
-    white: Color,
-    accent: Color,
-    mix_hex: str,
-    condition: HSLMapValue,
-) -> ColorHex:
-    return generator_norm(white, accent, mix_hex, condition).lightened(0.15)
-
-
-def generator_black(prominent: Color, condition: HSLMapValue) -> ColorHex:
-    color = (
-        prominent.darkened(0.4)
-        .blended(prominent, 0.2)
-        .lightened(0.4)
-        .blended(prominent, 0.1)
-    )
-    color = clamp_color_to_hslrules(color, condition)
-    return color.cast(ColorHex)
-
+# NOTE: The color map, the generators and the contrast pairs live in
+# `chroma.utils.palette`, as they are shared with the other backends. They are
+# imported here so existing references to them keep working.
+
+# The line which precedes the histogram of every image in a batch. It holds no
+# index, as the `%p` escape of the histogram writer can't be relied upon, so
+# the histograms are numbered in the order they are written instead.
+BATCH_DELIMITER = b"chroma-image"
+
+
+def read_histogram(
+    lines: Iterable[bytes], max_colors: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Reads the `max_colors` most frequent colors out of a text histogram.
+
+    Each line looks like `count: (r,g,b) #RRGGBB srgb(r,g,b)`. The lines are
+    consumed one at a time, and only the best `max_colors` of them are kept in
+    a min-heap, so the memory used does not grow with the histogram. A line
+    whose count can't beat the smallest kept count is skipped without parsing
+    its color. Colors with the same count keep the order of the histogram.
+
+    Returns the packed colors and their counts, most frequent first.
+    """
+
+    if max_colors < 1:
+        raise ValueError(f"Cannot keep {max_colors} colors of a histogram")
+
+    heap: list[tuple[int, int, bytes]] = []
+    for index, line in enumerate(lines):
+        count_end = line.find(b":")
+        if count_end == -1:
+            if line.strip():
+                logger.error(f"Color extraction failed for line {line!r}")
+            continue
+
+        try:
+            count = int(line[:count_end])
+        except ValueError:
+            logger.error(f"Color extraction failed for line {line!r}")
+            continue
+
+        # Later lines lose ties, so they only replace the smallest entry if
+        # they have strictly more pixels
+        if len(heap) == max_colors and count <= heap[0][0]:
+            continue
+
+        start = line.find(b"#", count_end)
+        if start == -1:
+            logger.error(f"Color extraction failed for line {line!r}")
+            continue
+
+        entry = (count, -index, line[start : start + 7])
+        if len(heap) < max_colors:
+            heapq.heappush(heap, entry)
+        else:
+            heapq.heapreplace(heap, entry)
+
+    heap.sort(reverse=True)
+    counts = np.array([count for count, _, _ in heap], dtype=np.int64)
+    packed = parse_hex(b" ".join(color for _, _, color in heap))
+    return packed, counts
+
+
+def read_histograms(
+    lines: Iterable[bytes], max_colors: int
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Splits the histograms of a batch at their delimiters, and reads each
+    one like `read_histogram()`.
+
+    Every histogram is preceded by a line holding only `BATCH_DELIMITER`.
+    Returns the packed colors and counts of every histogram, in the order
+    they were written. Lines before the first delimiter are ignored.
+    """
+
+    index = -1
+
+    def section(line: bytes) -> int:
+        nonlocal index
+        if line.strip() == BATCH_DELIMITER:
+            index += 1
+        return index
+
+    histograms = []
+    for image, group in itertools.groupby(lines, section):
+        if image < 0:
+            continue
+        # Skip the delimiter line itself
+        next(group)
+        histograms.append(read_histogram(group, max_colors))
+    return histograms
+
+
+def magick_command(
+    image_paths: list[str], image_size: int, depth: int, raw: bool, batch: bool
+) -> list[str]:
+    """Returns the command which renders the histograms of the images, or
+    their raw pixels. In a batch, only the first frame of each image is read,
+    and each histogram is preceded by a delimiter line."""
+
+    command = ["magick", *image_paths]
+    command += [
+        "-resize",
+        f"{image_size}x{image_size}^",
+        "-gravity",
+        "center",
+        "-extent",
+        f"{image_size}x{image_size}",
+    ]
+    if raw:
+        return command + ["-depth", "8", "rgb:-"]
 
-def generator_white(prominent: Color, condition: HSLMapValue) -> ColorHex:
-    color = (
-        prominent.lightened(0.4)
-        .blended(prominent, 0.2)
-        .darkened(0.4)
-        .blended(prominent, 0.1)
-    )
-    color = clamp_color_to_hslrules(color, condition)
-    return color.cast(ColorHex)
-
-
-def generator_accent(prominent: Color, condition: HSLMapValue) -> ColorHex:
-    color = clamp_color_to_hslrules(prominent.saturated(0.1), condition)
-    return color.cast(ColorHex)
-
-
-# fmt: off
-# TODO: enable customisation of the generators
-GENERATORS: dict[str, Callable[[dict], ColorHex]] = {
-    "accent": lambda x: generator_accent(x["prominent"], HSL_MAP["accent"]),
-    "black": lambda x: generator_black(x["prominent"], HSL_MAP["black"]),
-    "white": lambda x: generator_white(x["prominent"], HSL_MAP["white"]),
-    "bright_black": lambda x: x["black"].lightened(0.1),
-    "bright_white": lambda x: x["white"].lightened(0.1),
-    "accent_bg": lambda x: x["accent"].desaturated(0.2).darkened(0.1),
-    "accent_fg": lambda x: x["white"].lightened(0.15),
-    "foreground": lambda x: generator_fg(x["white"], x["accent"], 0.5, 0.08, HSL_MAP["foreground"]),
-    "foreground_alt": lambda x: generator_fg(x["white"], x["accent"], 0.5, 0.1, HSL_MAP["foreground"]),
-    "foreground_unfocus": lambda x: generator_fg(x["white"], x["accent"], 0.5, 0.12, HSL_MAP["foreground"]),
-    "background": lambda x: generator_bg(x["black"], x["accent"], 0.5, 0.08, HSL_MAP["background"]),
-    "background_alt": lambda x: generator_bg(x["black"], x["accent"], 0.5, 0.1, HSL_MAP["background"]),
-    "background_unfocus": lambda x: generator_bg(x["black"], x["accent"], 0.5, 0.12, HSL_MAP["background"]),
-    "red": lambda x: generator_norm(x["white"], x["accent"], "#ff0000", HSL_MAP["red"]),
-    "orange": lambda x: generator_norm(x["white"], x["accent"], "#ff8800", HSL_MAP["orange"]),
-    "brown": lambda x: generator_norm(x["white"], x["accent"], "#884400", HSL_MAP["brown"]),
-    "yellow": lambda x: generator_norm(x["white"], x["accent"], "#ffff00", HSL_MAP["yellow"]),
-    "green": lambda x: generator_norm(x["white"], x["accent"], "#00ff00", HSL_MAP["green"]),
-    "blue": lambda x: generator_norm(x["white"], x["accent"], "#0000ff", HSL_MAP["blue"]),
-    "cyan": lambda x: generator_norm(x["white"], x["accent"], "#00ffff", HSL_MAP["cyan"]),
-    "magenta": lambda x: generator_norm(x["white"], x["accent"], "#ff00ff", HSL_MAP["magenta"]),
-    "bright_red": lambda x: generator_bright(x["white"], x["accent"], "#ff0000", HSL_MAP["red"]),
-    "bright_orange": lambda x: generator_bright(x["white"], x["accent"], "#ff8800", HSL_MAP["orange"]),
-    "bright_brown": lambda x: generator_bright(x["white"], x["accent"], "#884400", HSL_MAP["brown"]),
-    "bright_yellow": lambda x: generator_bright(x["white"], x["accent"], "#ffff00", HSL_MAP["yellow"]),
-    "bright_green": lambda x: generator_bright(x["white"], x["accent"], "#00ff00", HSL_MAP["green"]),
-    "bright_blue": lambda x: generator_bright(x["white"], x["accent"], "#0000ff", HSL_MAP["blue"]),
-    "bright_cyan": lambda x: generator_bright(x["white"], x["accent"], "#00ffff", HSL_MAP["cyan"]),
-    "bright_magenta": lambda x: generator_bright(x["white"], x["accent"], "#ff00ff", HSL_MAP["magenta"]),
-}
-# fmt: on
+    pattern = "%c"
+    if batch:
+        pattern = f"\\n{BATCH_DELIMITER.decode()}\\n%c"
+    return command + ["-format", pattern, "-depth", str(depth), "histogram:info:-"]
 
 
 def generate(
@@ -169,79 +157,206 @@ def generate(
     hsl_map: dict = HSL_MAP,
     max_colors: int = 1024,
     required_colors: dict = GENERATORS,
+    use_lut: bool = False,
+    contrast_pairs: list[ContrastPair] = CONTRAST_PAIRS,
+    dedupe_threshold: float = DEDUPE_THRESHOLD,
+    assignment: str = "first",
+    raw: bool = False,
+    quantizer: str | None = None,
+    quantize_colors: int = QUANTIZE_COLORS,
 ):
+    """Generates a palette from the colors ImageMagick reads from an image.
+
+    By default, ImageMagick renders the histogram of the image as text, which
+    is parsed back here. If `raw` is set, it pipes the raw 8-bit pixels of the
+    resized image instead, and the histogram is counted in-process. This skips
+    rendering and parsing the text, but keeps ImageMagick as the decoder.
+
+    If a `quantizer` is given, the histogram is clustered into at most
+    `quantize_colors` colors by that engine. In raw mode, every color of the
+    image is clustered, otherwise only the `max_colors` most frequent ones.
+    """
+
     check_program("magick", "EXIT")
-    command = [
-        "magick",
-        str(image_path),
-        "-resize",
-        f"{image_size}x{image_size}^",
-        "-gravity",
-        "center",
-        "-extent",
-        f"{image_size}x{image_size}",
-        "-format",
-        "%c",
-        "-depth",
-        str(depth),
-        "histogram:info:-",
-    ]
-    proc_io = subprocess.run(command, capture_output=True, check=True)
+    command = magick_command([str(image_path)], image_size, depth, raw, batch=False)
+    options = {
+        "hsl_map": hsl_map,
+        "required_colors": required_colors,
+        "use_lut": use_lut,
+        "contrast_pairs": contrast_pairs,
+        "dedupe_threshold": dedupe_threshold,
+        "assignment": assignment,
+    }
 
-    # If anything went wrong, inform the user.
-    if proc_io.stderr:
-        logger.error(proc_io.stderr)
-
-    stdout = proc_io.stdout.decode("utf-8").splitlines()
-    stdout = [line.strip() for line in stdout]
-    stdout.sort(key=lambda x: x.split(":", 1)[0], reverse=True)
-
-    raw_colors = []
-    for line in stdout[:max_colors]:
-        match = re.search("#.{6}", str(line).strip())
-        if match:
-            raw_colors.append(match.group(0))
+    if raw:
+        proc_io = subprocess.run(command, capture_output=True, check=True)
+
+        # If anything went wrong, inform the user.
+        if proc_io.stderr:
+            logger.error(proc_io.stderr)
+
+        # The pixels are read straight out of the output buffer, without a copy
+        pixels = np.frombuffer(proc_io.stdout, dtype=np.uint8)
+        if pixels.size == 0 or pixels.size % 3 != 0:
+            raise ValueError(f"magick returned {pixels.size} bytes of RGB pixels")
+        packed, counts = pixel_histogram(pixels)
+        if quantizer is None:
+            packed, counts = top_colors(packed, counts, max_colors)
         else:
-            logger.error(f"Color extraction with regex failed for line {line}")
-
-    prominent_color = None
-    for color in raw_colors:
-        color = ColorHex(color).cast(ColorHSL).denormalize()
-        is_promiment = match_color_from_hslmap(
-            color=color,
-            condition_map={"prominent": (None, (40, 100), (25, 100))},
-        )
-        if is_promiment:
-            prominent_color = color.cast(ColorHex)
-            logger.debug(f"Detected prominent color {prominent_color}")
-            break
-
-    if prominent_color is None:
-        prominent_color = ColorHex(raw_colors[0])
-        logger.debug(
-            f"Could not detect a suitable prominent color. "
-            f"Using {prominent_color.cast(ColorHex)}"
-        )
+            packed, counts = quantize(packed, counts, quantizer, quantize_colors)
+        return build_palette(packed, counts, **options)
+
+    # Parse the histogram while magick is still writing it, instead of holding
+    # all of it in memory. The errors go to a file, so a full error pipe can
+    # never block magick while the histogram is being read.
+    with tempfile.TemporaryFile() as stderr:
+        with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr) as proc:
+            packed, counts = read_histogram(proc.stdout, max_colors)
+        stderr.seek(0)
+        errors = stderr.read()
 
-    colors = {}
-    for color in raw_colors:
-        color = ColorHex(color)
-        name = match_color_from_hslmap(color, hsl_map, list(colors.keys()))
+    # If anything went wrong, inform the user.
+    if errors:
+        logger.error(errors)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, command, stderr=errors)
 
-        if name is not None:
-            color = color.cast(ColorHex)
-            colors[name] = color
-            logger.debug(f"Found color {name} to be {color}")
+    if quantizer is not None:
+        packed, counts = quantize(packed, counts, quantizer, quantize_colors)
+    return build_palette(packed, counts, **options)
 
-    for name, generator in required_colors.items():
-        if colors.get(name) is None:
-            colors[name] = generator({"prominent": prominent_color, **colors})
-            logger.debug(f"Color {name} doesn't exist. Generated to {colors[name]}")
 
-    return colors
+def generate_batch(
+    image_paths: list[Path],
+    depth: int = 8,
+    image_size: int = 256,
+    hsl_map: dict = HSL_MAP,
+    max_colors: int = 1024,
+    required_colors: dict = GENERATORS,
+    use_lut: bool = False,
+    contrast_pairs: list[ContrastPair] = CONTRAST_PAIRS,
+    dedupe_threshold: float = DEDUPE_THRESHOLD,
+    assignment: str = "first",
+    raw: bool = False,
+    quantizer: str | None = None,
+    quantize_colors: int = QUANTIZE_COLORS,
+) -> list[dict[str, Color] | Exception]:
+    """Generates the palettes of many images with a single magick process.
+
+    This takes the same options as `generate()`, and returns the palette of
+    every image in order, or the exception which stopped it. The histograms
+    are rendered by one magick invocation and split back apart, in order, at
+    the delimiter lines preceding them. In raw mode, every image is resized to
+    exactly `image_size` squared pixels, so the pixels are split into frames
+    of equal size instead.
+
+    If magick fails, like when one of the images can't be read, or an image
+    is missing from its output, then that image is generated on its own, so
+    its error is reported against it alone.
+    """
+
+    if not image_paths:
+        return []
+
+    check_program("magick", "EXIT")
+    command = magick_command(
+        [f"{path}[0]" for path in image_paths], image_size, depth, raw, batch=True
+    )
+    options = {
+        "hsl_map": hsl_map,
+        "required_colors": required_colors,
+        "use_lut": use_lut,
+        "contrast_pairs": contrast_pairs,
+        "dedupe_threshold": dedupe_threshold,
+        "assignment": assignment,
+    }
+
+    histograms = {}
+    if raw:
+        proc_io = subprocess.run(command, capture_output=True)
+        returncode, errors = proc_io.returncode, proc_io.stderr
+        frame = image_size * image_size * 3
+        if returncode == 0 and len(proc_io.stdout) == frame * len(image_paths):
+            pixels = np.frombuffer(proc_io.stdout, dtype=np.uint8)
+            for index in range(len(image_paths)):
+                packed, counts = pixel_histogram(
+                    pixels[index * frame : (index + 1) * frame]
+                )
+                if quantizer is None:
+                    histograms[index] = top_colors(packed, counts, max_colors)
+                else:
+                    histograms[index] = (packed, counts)
+    else:
+        with tempfile.TemporaryFile() as stderr:
+            with subprocess.Popen(
+                command, stdout=subprocess.PIPE, stderr=stderr
+            ) as proc:
+                rendered = read_histograms(proc.stdout, max_colors)
+            stderr.seek(0)
+            errors = stderr.read()
+        returncode = proc.returncode
+
+        # The histograms are numbered in the order they were written, so they
+        # only line up with the images if every image has one
+        if len(rendered) == len(image_paths):
+            histograms = dict(enumerate(rendered))
+        elif returncode == 0:
+            logger.error(
+                f"magick rendered {len(rendered)} histograms for a batch of "
+                f"{len(image_paths)} images"
+            )
+
+    # If anything went wrong, inform the user.
+    if errors:
+        logger.error(errors)
+    if returncode != 0:
+        logger.error(
+            f"magick exited with status {returncode} on a batch of "
+            f"{len(image_paths)} images"
+        )
+        histograms = {}
+
+    missing = [str(path) for i, path in enumerate(image_paths) if i not in histograms]
+    if missing:
+        logger.warn(
+            f"magick rendered no histogram for {', '.join(missing)}. "
+            "Generating them one at a time."
+        )
+
+    palettes = []
+    for index, image_path in enumerate(image_paths):
+        try:
+            if index not in histograms:
+                palettes.append(
+                    generate(
+                        image_path,
+                        depth=depth,
+                        image_size=image_size,
+                        max_colors=max_colors,
+                        raw=raw,
+                        quantizer=quantizer,
+                        quantize_colors=quantize_colors,
+                        **options,
+                    )
+                )
+                continue
+
+            packed, counts = histograms[index]
+            if quantizer is not None:
+                packed, counts = quantize(packed, counts, quantizer, quantize_colors)
+            palettes.append(build_palette(packed, counts, **options))
+        except Exception as e:
+            palettes.append(e)
+    return palettes
 
 
 def register():
     return {
         "magick": generate,
     }
+
+
+def register_batch():
+    return {
+        "magick": generate_batch,
+    }
@@ -0,0 +1,113 @@
+"""
+A generator backend which decodes and histograms the image in-process.
+
+The magick backend forks ImageMagick, has it render the histogram as text and
+parses the text back. This backend decodes the image with Pillow instead,
+crops and resizes it the same way as `-resize NxN^ -gravity center -extent
+NxN`, and counts the colors with NumPy, so no process is spawned and nothing is
+formatted or parsed. The histogram then goes through the same pipeline as the
+magick backend.
+
+Pillow is only imported when the backend is used, so it stays an optional
+dependency.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from chroma.colors.dedupe import DEDUPE_THRESHOLD
+from chroma.exceptions import ProgramNotFoundException
+from chroma.generators.quantizers import QUANTIZE_COLORS, quantize
+from chroma.logger import Logger
+from chroma.types import ContrastPair
+from chroma.utils.palette import (
+    CONTRAST_PAIRS,
+    GENERATORS,
+    HSL_MAP,
+    build_palette,
+    pixel_histogram,
+    top_colors,
+)
+
+logger = Logger.get_logger()
+
+
+def load_pixels(image_path: Path, image_size: int = 256) -> np.ndarray:
+    """Decodes an image into an N×N×3 array of 8-bit RGB pixels.
+
+    The image is scaled to cover an N×N square and cropped around its center.
+    JPEG images are decoded straight at a reduced scale when they are much
+    larger than the target size, which skips most of the decoding work.
+    """
+
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ProgramNotFoundException(
+            "Pillow was not found on your system. Install it, or use the magick "
+            "backend instead."
+        )
+
+    with Image.open(image_path) as image:
+        image.draft("RGB", (image_size, image_size))
+        image = image.convert("RGB")
+
+        # Crop the largest centered square, and resize it in the same step
+        width, height = image.size
+        side = min(width, height)
+        left, top = (width - side) / 2, (height - side) / 2
+        image = image.resize(
+            (image_size, image_size),
+            Image.Resampling.LANCZOS,
+            box=(left, top, left + side, top + side),
+            reducing_gap=3.0,
+        )
+        return np.asarray(image)
+
+
+def generate(
+    image_path: Path,
+    image_size: int = 256,
+    hsl_map: dict = HSL_MAP,
+    max_colors: int = 1024,
+    required_colors: dict = GENERATORS,
+    use_lut: bool = False,
+    contrast_pairs: list[ContrastPair] = CONTRAST_PAIRS,
+    dedupe_threshold: float = DEDUPE_THRESHOLD,
+    assignment: str = "first",
+    quantizer: str | None = None,
+    quantize_colors: int = QUANTIZE_COLORS,
+):
+    """Generates a palette from the pixels Pillow decodes from an image.
+
+    By default, the `max_colors` most frequent colors of the image are kept.
+    If a `quantizer` is given, every color is clustered into at most
+    `quantize_colors` colors by that engine instead.
+    """
+
+    pixels = load_pixels(image_path, image_size)
+    packed, counts = pixel_histogram(pixels)
+    logger.debug(f"Counted {len(packed)} colors in {image_path}")
+    if quantizer is None:
+        packed, counts = top_colors(packed, counts, max_colors)
+    else:
+        packed, counts = quantize(packed, counts, quantizer, quantize_colors)
+        logger.debug(f"Quantized the colors to {len(packed)} with {quantizer}")
+
+    return build_palette(
+        packed,
+        counts,
+        hsl_map=hsl_map,
+        required_colors=required_colors,
+        use_lut=use_lut,
+        contrast_pairs=contrast_pairs,
+        dedupe_threshold=dedupe_threshold,
+        assignment=assignment,
+    )
+
+
+def register():
+    return {
+        "pillow": generate,
+    }
@@ -0,0 +1,68 @@
+"""
+In-process color quantizers, which reduce a histogram to a small palette.
+
+The backends normally keep the `max_colors` most frequent colors of the image,
+so an image with smooth gradients gives hundreds of nearly identical colors.
+A quantizer clusters every color of the histogram instead, weighted by its
+pixel count, and returns the mean color and the pixel count of each cluster.
+
+```py
+packed, counts = pixel_histogram(pixels)
+packed, counts = quantize(packed, counts, "median-cut", n_colors=64)
+palette = build_palette(packed, counts)
+```
+
+The engines are:
+
+- `median-cut`: splits the box with the largest error at its weighted median.
+- `octree`: cuts the RGB cube into cells along the bits of each component.
+- `kmeans`: mini-batch k-means, seeded with k-means++.
+
+`python -m benchmarks.quantizers` compares the runtime, the memory and the
+quality of the engines on the fixture images.
+"""
+
+import numpy as np
+
+from chroma.colors.convert import unpack_rgb
+from chroma.generators.quantizers.base import Quantizer, summarize
+from chroma.generators.quantizers.kmeans import quantize_kmeans
+from chroma.generators.quantizers.median_cut import quantize_median_cut
+from chroma.generators.quantizers.octree import quantize_octree
+
+QUANTIZERS: dict[str, Quantizer] = {
+    "median-cut": quantize_median_cut,
+    "octree": quantize_octree,
+    "kmeans": quantize_kmeans,
+}
+
+# The number of colors a histogram is quantized to by default
+QUANTIZE_COLORS = 64
+
+
+def quantize(
+    packed: np.ndarray,
+    counts: np.ndarray,
+    engine: str,
+    n_colors: int = QUANTIZE_COLORS,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Quantizes a histogram of packed 0xRRGGBB colors and their pixel counts.
+
+    Returns at most `n_colors` packed colors and their pixel counts, sorted
+    from the most to the least frequent color, like `top_colors()`.
+    """
+
+    quantizer = QUANTIZERS.get(engine)
+    if quantizer is None:
+        raise ValueError(f"Quantizer '{engine}': no such quantizer")
+    if n_colors < 1:
+        raise ValueError(f"Cannot quantize to {n_colors} colors")
+
+    packed = np.asarray(packed, dtype=np.uint32).reshape(-1)
+    counts = np.asarray(counts, dtype=np.int64).reshape(-1)
+    if packed.size == 0:
+        return packed, counts
+
+    rgb = unpack_rgb(packed)
+    labels = quantizer(rgb, counts, n_colors)
+    return summarize(rgb, counts, labels)
@@ -0,0 +1,47 @@
+"""
+The pieces shared by every quantizer engine.
+
+An engine groups the colors of a histogram into at most `n_colors` clusters,
+and returns the cluster of every color. The clusters are then turned back into
+a histogram of their pixel-weighted mean colors, so a quantized palette goes
+through the palette pipeline like any other histogram.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+
+from chroma.colors.convert import pack_rgb
+
+# An engine takes N×3 8-bit RGB colors, their pixel counts and the number of
+# clusters, and returns the cluster of every color
+Quantizer = Callable[[np.ndarray, np.ndarray, int], np.ndarray]
+
+
+def summarize(
+    rgb: np.ndarray, weights: np.ndarray, labels: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the weighted mean color of every cluster, as packed 0xRRGGBB
+    colors, and the summed weights of the clusters.
+
+    The clusters are sorted from the most to the least frequent. Clusters whose
+    mean colors round to the same 8-bit color are merged.
+    """
+
+    rgb = np.asarray(rgb, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    size = int(labels.max()) + 1 if len(labels) else 0
+
+    totals = np.bincount(labels, weights, size)
+    sums = np.stack(
+        [np.bincount(labels, weights * rgb[:, c], size) for c in range(3)], axis=1
+    )
+    used = totals > 0
+    means = np.clip(np.rint(sums[used] / totals[used, np.newaxis]), 0, 255)
+
+    packed, inverse = np.unique(pack_rgb(means), return_inverse=True)
+    counts = np.bincount(inverse, totals[used], len(packed))
+    order = np.argsort(-counts, kind="stable")
+    return packed[order], np.rint(counts[order]).astype(np.int64)
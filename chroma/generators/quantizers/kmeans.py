@@ -0,0 +1,89 @@
+"""
+Mini-batch k-means quantization, seeded with k-means++.
+
+The seeds are picked with k-means++, where every next seed is drawn with a
+probability proportional to the pixel count of a color times its squared
+distance to the nearest seed so far. The centers are then refined on random
+batches of colors, drawn by pixel count, instead of on the whole histogram. A
+center moves towards the mean of its batch colors with a step which shrinks
+with the number of colors it has seen, so it settles after a few batches.
+
+The random generator is seeded, so the same histogram always gives the same
+palette.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+SEED = 0x5EED
+BATCH_SIZE = 1024
+MAX_ITERATIONS = 100
+
+# Stop once no center moved further than this in a batch, in 8-bit units
+TOLERANCE = 0.5
+
+# Number of colors whose distances to every center are computed at once
+CHUNK_SIZE = 1 << 14
+
+
+def _nearest(rgb: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Returns the index of the center nearest to every color."""
+
+    # |x - c|^2 = |x|^2 - 2 x.c + |c|^2, where |x|^2 is the same for every
+    # center and can be left out
+    norms = np.square(centers).sum(axis=1)
+    labels = np.empty(len(rgb), dtype=np.intp)
+    for start in range(0, len(rgb), CHUNK_SIZE):
+        chunk = rgb[start : start + CHUNK_SIZE]
+        distances = norms - 2 * chunk @ centers.T
+        labels[start : start + CHUNK_SIZE] = distances.argmin(axis=1)
+    return labels
+
+
+def kmeans_plusplus(
+    rgb: np.ndarray, weights: np.ndarray, k: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Picks `k` seeds out of the colors with weighted k-means++."""
+
+    seeds = [rng.choice(len(rgb), p=weights / weights.sum())]
+    nearest = np.square(rgb - rgb[seeds[0]]).sum(axis=1)
+    for _ in range(1, k):
+        scores = weights * nearest
+        if scores.sum() == 0:
+            break
+        seed = rng.choice(len(rgb), p=scores / scores.sum())
+        seeds.append(seed)
+        nearest = np.minimum(nearest, np.square(rgb - rgb[seed]).sum(axis=1))
+    return rgb[seeds].copy()
+
+
+def quantize_kmeans(rgb: np.ndarray, weights: np.ndarray, n_colors: int) -> np.ndarray:
+    rgb = np.asarray(rgb, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    rng = np.random.default_rng(SEED)
+
+    centers = kmeans_plusplus(rgb, weights, min(n_colors, len(rgb)), rng)
+    seen = np.zeros(len(centers))
+    probabilities = weights / weights.sum()
+    for _ in range(MAX_ITERATIONS):
+        batch = rgb[rng.choice(len(rgb), BATCH_SIZE, p=probabilities)]
+        labels = _nearest(batch, centers)
+
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.stack(
+            [np.bincount(labels, batch[:, c], len(centers)) for c in range(3)],
+            axis=1,
+        )
+        seen += counts
+        hit = counts > 0
+        step = counts[hit] / seen[hit]
+        target = sums[hit] / counts[hit, np.newaxis]
+        moved = centers[hit] + step[:, np.newaxis] * (target - centers[hit])
+
+        shift = np.abs(moved - centers[hit]).max(initial=0)
+        centers[hit] = moved
+        if shift < TOLERANCE:
+            break
+
+    return _nearest(rgb, centers)
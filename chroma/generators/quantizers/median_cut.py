@@ -0,0 +1,62 @@
+"""
+Median-cut quantization.
+
+The colors start out in a single box. The box with the largest weighted
+squared error is split in two along its widest axis, at the weighted median,
+until there are `n_colors` boxes or no box can be split anymore. Every split
+only sorts the colors of the box being split.
+"""
+
+from __future__ import annotations
+
+import heapq
+
+import numpy as np
+
+
+def _error(rgb: np.ndarray, weights: np.ndarray) -> float:
+    """Returns the weighted squared error of a box around its mean."""
+
+    mean = weights @ rgb / weights.sum()
+    return float(weights @ np.square(rgb - mean).sum(axis=1))
+
+
+def quantize_median_cut(
+    rgb: np.ndarray, weights: np.ndarray, n_colors: int
+) -> np.ndarray:
+    rgb = np.asarray(rgb, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    boxes = [np.arange(len(rgb))]
+
+    # A max-heap of the boxes which hold more than one color
+    heap = []
+    if len(rgb) > 1:
+        heap.append((-_error(rgb, weights), 0))
+
+    while heap and len(boxes) < n_colors:
+        error, box = heapq.heappop(heap)
+        if error == 0:
+            break
+
+        members = boxes[box]
+        colors = rgb[members]
+        axis = int(np.ptp(colors, axis=0).argmax())
+        order = np.argsort(colors[:, axis], kind="stable")
+        members = members[order]
+
+        # Cut at the weighted median, keeping both halves non-empty
+        cumulative = np.cumsum(weights[members])
+        cut = int(np.searchsorted(cumulative, cumulative[-1] / 2)) + 1
+        cut = min(max(cut, 1), len(members) - 1)
+
+        boxes[box] = members[:cut]
+        boxes.append(members[cut:])
+        for index in (box, len(boxes) - 1):
+            if len(boxes[index]) > 1:
+                part = boxes[index]
+                heapq.heappush(heap, (-_error(rgb[part], weights[part]), index))
+
+    labels = np.empty(len(rgb), dtype=np.intp)
+    for label, members in enumerate(boxes):
+        labels[members] = label
+    return labels
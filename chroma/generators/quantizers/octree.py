@@ -0,0 +1,59 @@
+"""
+Octree quantization.
+
+Each level of an octree over RGB halves the cells along every axis, so the
+node of a color at a depth `d` is given by the top `d` bits of each of its
+components. Instead of inserting colors one by one and merging leaves, the
+nodes of every color are computed for a whole level at once:
+
+1. The deepest level with at most `n_colors` nodes is the starting palette.
+2. Its most populated nodes are split into their children, as long as the
+   palette stays within `n_colors` nodes.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+MAX_DEPTH = 8
+
+
+def node_keys(rgb: np.ndarray, depth: int) -> np.ndarray:
+    """Returns the key of the node every color falls in at a depth."""
+
+    top = np.asarray(rgb, dtype=np.int64) >> (MAX_DEPTH - depth)
+    return (top[:, 0] << (2 * depth)) | (top[:, 1] << depth) | top[:, 2]
+
+
+def quantize_octree(rgb: np.ndarray, weights: np.ndarray, n_colors: int) -> np.ndarray:
+    weights = np.asarray(weights, dtype=np.float64)
+
+    depth, labels = 0, np.zeros(len(rgb), dtype=np.intp)
+    for level in range(1, MAX_DEPTH + 1):
+        _, inverse = np.unique(node_keys(rgb, level), return_inverse=True)
+        if inverse.max(initial=-1) + 1 > n_colors:
+            break
+        depth, labels = level, inverse.reshape(-1)
+    if depth == MAX_DEPTH:
+        return labels
+
+    # The children of every node at the next level down
+    _, children = np.unique(node_keys(rgb, depth + 1), return_inverse=True)
+    children = children.reshape(-1)
+    nodes = labels.max(initial=-1) + 1
+    populations = np.bincount(labels, weights, nodes)
+    pairs = np.unique(np.stack((labels, children), axis=1), axis=0)
+    fanout = np.bincount(pairs[:, 0], minlength=nodes)
+
+    # Split the most populated nodes first, while their children still fit
+    split = np.zeros(nodes, dtype=bool)
+    total = nodes
+    for node in np.argsort(-populations, kind="stable"):
+        if fanout[node] > 1 and total + fanout[node] - 1 <= n_colors:
+            split[node] = True
+            total += fanout[node] - 1
+
+    # Children are labeled after every node, so the two never collide
+    labels = np.where(split[labels], nodes + children, labels)
+    _, labels = np.unique(labels, return_inverse=True)
+    return labels.reshape(-1)
@@ -17,7 +17,7 @@ they might interfere with the themes generated by Chroma.
 from pathlib import Path
 
 import chroma
-from chroma.colors import ColorHex
+from chroma.colors.convert import parse_hex
 from chroma.exceptions import ParentDirectoryException
 from chroma.integration import Integration
 from chroma.logger import Logger
@@ -68,11 +68,14 @@ class FootIntegration(Integration):
         generated_theme.append(FOOT_HEADER)
         generated_theme.append("[colors]")
 
+        # Validate all the colors in one pass instead of color-by-color
+        parse_hex([v for v in theme.values() if v is not None])
+
         for k, v in theme.items():
             if v is None:
                 logger.info(f"Key {k} is unset")
                 continue
-            col = ColorHex(v).value
+            col = v[1:] if v.startswith("#") else v
             generated_theme.append(f"{k}={col}")
 
         # Manually insert newlines to make it play well with file.writelines()
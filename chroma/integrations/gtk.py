@@ -9,6 +9,9 @@ both GTK 3 and 4.
 from pathlib import Path
 
 import chroma
+from chroma.colors import ColorArray
+from chroma.colors.convert import parse_hex
+from chroma.colors.ramp import shade_ramps
 from chroma.exceptions import ParentDirectoryException
 from chroma.integration import Integration
 from chroma.logger import Logger
@@ -29,37 +32,61 @@ GTK_PALETTE_VALID_COLORS = [
     "dark",
 ]
 
+# The base of the synthesized palettes when a theme sets none. These are the
+# colors of the middle palette of Adwaita.
+GTK_DEFAULT_PALETTE = {
+    "blue": "#3584e4",
+    "green": "#33d17a",
+    "yellow": "#f6d32d",
+    "orange": "#ff7800",
+    "red": "#e01b24",
+    "purple": "#9141ac",
+    "brown": "#986a44",
+    "light": "#deddda",
+    "dark": "#3d3846",
+}
+
+
+def validate_palette(palette: dict, index: int) -> bool:
+    """Returns whether a GTK color palette has exactly the valid color keys.
+
+    Every color in `GTK_PALETTE_VALID_COLORS` must be set, and nothing else.
+    """
+
+    # GTK only supports 5 separate palettes
+    assert index in [1, 2, 3, 4, 5]
+    return sorted(palette) == sorted(GTK_PALETTE_VALID_COLORS)
+
 
-def validate_palette(palette: dict, index: int) -> dict | None:
-    """Validates the entries in a GTK color palette.
+def synthesize_palettes(palette: dict, index: int) -> list[dict]:
+    """Synthesizes all five GTK palettes as tonal ramps of a single palette.
 
-    If the entries are invalid, `None` is returned.
+    The palettes go from light to dark, and `palette` is kept as the palette
+    at `index`. Every color of every palette is computed in a single pass.
 
-    If all entries are valid, then a palette is constructed in a way where the
-    key is the palette index and color, and the value is the provided color.
-    This constructed palette is returned as a `dict`. For example:
-    ```
-    { "blue_1": "#00ff00" }
-    ```
+    GTK colors don't have to be hex colors, like `@accent_color` or
+    `shade(...)`. Those can't be shaded, so they are left out of the
+    synthesized palettes.
     """
 
-    # GTK only supports 5 separate palettes
     assert index in [1, 2, 3, 4, 5]
+    names = []
+    for name in GTK_PALETTE_VALID_COLORS:
+        try:
+            parse_hex([palette[name]])
+        except TypeError:
+            logger.warn(
+                f"Color {name} = {palette[name]!r} of palette {index} is not a hex "
+                "color. Skipping its shades."
+            )
+            continue
+        names.append(name)
 
-    # The palette would be a Lua object. We need to convert it to a python one.
-    palette_keys = [k for k in palette]
-    if sorted(palette_keys) == sorted(GTK_PALETTE_VALID_COLORS):
-        return {
-            f"blue_{index}": palette["blue"],
-            f"green_{index}": palette["green"],
-            f"yellow_{index}": palette["yellow"],
-            f"orange_{index}": palette["orange"],
-            f"red_{index}": palette["red"],
-            f"purple_{index}": palette["purple"],
-            f"brown_{index}": palette["brown"],
-            f"light_{index}": palette["light"],
-            f"dark_{index}": palette["dark"],
-        }
+    if not names:
+        return [{} for _ in range(5)]
+    base = ColorArray.from_hex([palette[name] for name in names])
+    shades = shade_ramps(base, steps=5, base_step=index - 1)
+    return [dict(zip(names, shade.color)) for shade in shades]
 
 
 class GTKIntegration(Integration):
@@ -67,7 +94,7 @@ class GTKIntegration(Integration):
         if self.group.get("colors") is None:
             logger.info("Colors for GTK group is unset. Skipping integration.")
             return
-        palettes = []
+        palettes: dict[int, dict] = {}
 
         theme_palettes = self.group.get("palettes")
         if theme_palettes is not None:
@@ -75,23 +102,30 @@ class GTKIntegration(Integration):
             for i in range(1, 6):
                 palette = theme_palettes.get(f"palette{i}")
                 if palette is None:
-                    logger.warn(f"Palette {i} is unset. Skipping.")
+                    logger.debug(f"Palette {i} is unset. Synthesizing it.")
                     continue
 
                 if not isinstance(palette, dict):
                     palette = dict(palette)
 
-                validated_palette = validate_palette(palette, i)
-                if validated_palette is None:
-                    logger.warn(f"Palette {i} contains invalid keys. Skipping.")
-                    logger.debug(f"Got: {validated_palette}")
+                if not validate_palette(palette, i):
+                    logger.warn(f"Palette {i} contains invalid keys. Synthesizing it.")
+                    logger.debug(f"Got: {palette}")
                     continue
 
-                palettes.append(validated_palette)
-        else:
-            logger.warn(
-                "No palettes present. Please have at least one palette for the theme."
-            )
+                palettes[i] = palette
+
+        # Fill in the missing palettes with shades of the first valid palette,
+        # or of the default palette if the theme has none.
+        if len(palettes) < 5:
+            if palettes:
+                base_index = min(palettes)
+                base = palettes[base_index]
+            else:
+                logger.info("No palettes present. Synthesizing them from defaults.")
+                base_index, base = 3, GTK_DEFAULT_PALETTE
+            for i, palette in enumerate(synthesize_palettes(base, base_index), 1):
+                palettes.setdefault(i, palette)
 
         gtk3_valid = validate_header(Path(self.group["out"]["gtk3"]), GTK_HEADER)
         gtk4_valid = validate_header(Path(self.group["out"]["gtk4"]), GTK_HEADER)
@@ -104,9 +138,11 @@ class GTKIntegration(Integration):
 
         for name, color in self.group["colors"].items():
             generated_file.append(f"@define-color {name} {color};")
-        for palette in palettes:
-            for name, color in palette.items():
-                generated_file.append(f"@define-color {name} {color};")
+        # Synthesized palettes lack the colors which couldn't be shaded
+        for i, palette in sorted(palettes.items()):
+            for name in GTK_PALETTE_VALID_COLORS:
+                if name in palette:
+                    generated_file.append(f"@define-color {name}_{i} {palette[name]};")
 
         generated_file.append(self.group["sidebar_patch"])
 
@@ -2,11 +2,13 @@
 Creates a dynamically generated color palette.
 """
 
+import string
 from pathlib import Path
 
 import chroma
 from chroma.utils.theme import validate_header
-from chroma.colors import ColorHex
+from chroma.colors.convert import parse_hex
+from chroma.colors.xterm import load_table
 from chroma.integration import Integration
 from chroma.logger import Logger
 
@@ -22,6 +24,12 @@ def generate_colors(template, variables) -> str:
     return template.format(**variables)
 
 
+def template_fields(template) -> set[str]:
+    """Returns the names of the fields a format template uses."""
+
+    return {field for _, field, _, _ in string.Formatter().parse(template) if field}
+
+
 class RawIntegration(Integration):
     def apply(self):
         applied_count = 0
@@ -31,9 +39,7 @@ class RawIntegration(Integration):
             if header_template is not None:
                 header = generate_header(header_template)
 
-            if not validate_header(
-                Path(attr["out"]), header, attr.get("force", False)
-            ):
+            if not validate_header(Path(attr["out"]), header, attr.get("force", False)):
                 logger.error(f"Cannot write configuration for {name}. Skipping group.")
                 continue
 
@@ -41,12 +47,23 @@ class RawIntegration(Integration):
             if header is not None:
                 generated_file.append(header)
 
-            for col_name, col_value in attr["colors"].items():
-                col = ColorHex(col_value)
+            # Validate and quantize all the colors in one pass instead of
+            # color-by-color
+            colors = attr["colors"]
+            packed = parse_hex(list(colors.values()))
+
+            # The table is only loaded, or built on first use, if it is needed
+            xterm256 = [None] * len(colors)
+            if "xterm256" in template_fields(attr["format"]):
+                xterm256 = load_table(256).lookup(packed).tolist()
+
+            for (col_name, col_value), index in zip(colors.items(), xterm256):
+                hexval = col_value[1:] if col_value.startswith("#") else col_value
                 variables = {
                     "name": col_name,
-                    "hex": col.color,
-                    "hexval": col.value,
+                    "hex": f"#{hexval}",
+                    "hexval": hexval,
+                    "xterm256": index,
                 }
                 color = generate_colors(attr["format"], variables)
                 generated_file.append(color)
@@ -5,13 +5,97 @@ from pathlib import Path
 
 import chroma
 from chroma import generator, theme
+from chroma.colors.dedupe import DEDUPE_THRESHOLD
+from chroma.generators.quantizers import QUANTIZE_COLORS, QUANTIZERS
 from chroma.logger import Logger
+from chroma.utils.assignment import ASSIGNMENT_MODES
+from chroma.utils.generator import write_lua_colors
 from chroma.utils.paths import cache_dir, find_theme_from_name, themes_dir
 from chroma.utils.tools import set_exception_hook
 
 logger = Logger.get_logger()
 
 
+def add_generation_args(parser: argparse.ArgumentParser) -> None:
+    """Adds the options of the palette generation, shared by every command
+    which generates palettes."""
+
+    parser.add_argument(
+        "--backend",
+        type=str,
+        help="Generator backend to use, like magick or pillow",
+        default="magick",
+    )
+    parser.add_argument(
+        "--max-colors",
+        type=int,
+        help="Get top n colors by prominency for generation",
+        default=1024,
+    )
+    parser.add_argument(
+        "--image-size",
+        type=int,
+        help="Image size in NxN pixels to downscale to",
+        default=256,
+    )
+    parser.add_argument(
+        "--dedupe-threshold",
+        type=float,
+        help="Merge histogram colors closer than this CIEDE2000 distance (0 disables)",
+        default=DEDUPE_THRESHOLD,
+    )
+    parser.add_argument(
+        "--assignment",
+        choices=ASSIGNMENT_MODES,
+        help="Fill each slot with the first matching color, or solve a global assignment",
+        default="first",
+    )
+    parser.add_argument(
+        "--quantizer",
+        choices=list(QUANTIZERS),
+        help="Cluster the image colors with a quantizer instead of keeping the top colors",
+    )
+    parser.add_argument(
+        "--quantize-colors",
+        type=int,
+        help="Number of colors the quantizer reduces the image to",
+        default=QUANTIZE_COLORS,
+    )
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="Have magick pipe raw pixels and count colors in-process (magick only)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always generate the palette, instead of reusing a cached one",
+    )
+    parser.add_argument(
+        "--use-lut",
+        action="store_true",
+        help="Convert colors with a precomputed lookup table (built on first use)",
+    )
+
+
+def generation_options(args: argparse.Namespace) -> dict:
+    """Returns the keyword arguments of the backend from the parsed options."""
+
+    # Only pass backend-specific options when they are set, so the other
+    # backends don't receive arguments they don't know about
+    options = {"raw": True} if args.raw else {}
+    return {
+        "image_size": args.image_size,
+        "max_colors": args.max_colors,
+        "use_lut": args.use_lut,
+        "dedupe_threshold": args.dedupe_threshold,
+        "assignment": args.assignment,
+        "quantizer": args.quantizer,
+        "quantize_colors": args.quantize_colors,
+        **options,
+    }
+
+
 def setup_args():
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -56,23 +140,48 @@ def setup_args():
         help="Output path of generated color scheme",
     )
     gen_parser.add_argument(
-        "--max-colors",
-        type=int,
-        help="Get top n colors by prominency for generation",
-        default=1024,
+        "--progressive",
+        action="store_true",
+        help="Write a quick palette from a tiny sample first, then refine it",
     )
-    gen_parser.add_argument(
-        "--image-size",
+    add_generation_args(gen_parser)
+
+    # Parse commands for keyword batch
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Generates the palettes of a directory or glob of images",
+    )
+    batch_parser.add_argument(
+        "source",
+        help="Directory of images, or a glob like '~/wallpapers/**/*.png'",
+    )
+    batch_parser.add_argument(
+        "-o",
+        "--output-dir",
+        type=str,
+        help="Directory to write a palette per image to",
+        default=str(cache_dir() / "palettes/batch"),
+    )
+    batch_parser.add_argument(
+        "-j",
+        "--jobs",
         type=int,
-        help="Image size in NxN pixels to downscale to",
-        default=256,
+        help="Number of images generated in parallel (defaults to the number of cores)",
     )
+    add_generation_args(batch_parser)
 
     subparsers.add_parser("remove", help="Removes the generated palette")
 
     known_args, unknown = parser.parse_known_args()
     args = parser.parse_args(unknown, namespace=known_args)
 
+    # Only magick can pipe raw pixels, and the other backends don't take the
+    # option at all
+    if getattr(args, "raw", False) and args.backend != "magick":
+        parser.error(
+            f"--raw is only supported by the magick backend, not {args.backend}"
+        )
+
     # Map particular commands to other commands. Useful to map aliases to
     # original parser name.
     command_map = {"gen": "generate"}
@@ -139,19 +248,55 @@ def main():
 
     if args.command == "generate":
         out_path = cache_dir() / "palettes/generated.lua"
-        generator.generate(
-            name="magick",
-            image_path=args.image_path,
-            output_path=out_path,
-            image_size=args.image_size,
-            max_colors=args.max_colors,
+        if args.progressive:
+            # Every refinement overwrites the palette, so anything watching it
+            # picks up the quick palette first and the final one shortly after
+            options = generation_options(args)
+            steps = generator.generate_progressive(
+                name=args.backend,
+                image_path=args.image_path,
+                image_size=options.pop("image_size"),
+                **options,
+            )
+            for size, palette in steps:
+                write_lua_colors(out_path, palette)
+                if args.output:
+                    shutil.copy(src=out_path, dst=Path(args.output).expanduser())
+                logger.info(f"Wrote the palette of the {size}px sample")
+        else:
+            generator.generate(
+                name=args.backend,
+                image_path=args.image_path,
+                output_path=out_path,
+                use_cache=not args.no_cache,
+                **generation_options(args),
+            )
+            if args.output:
+                shutil.copy(
+                    src=cache_dir() / "palettes/generated.lua",
+                    dst=Path(args.output).expanduser(),
+                )
+
+    if args.command == "batch":
+        failed = 0
+        results = generator.generate_many(
+            name=args.backend,
+            source=args.source,
+            output_dir=args.output_dir,
+            workers=args.jobs,
+            use_cache=not args.no_cache,
+            **generation_options(args),
         )
+        for result in results:
+            if result.ok:
+                logger.info(f"Generated {result.output_path} from {result.image_path}")
+            else:
+                failed += 1
+                logger.error(f"Failed to generate {result.image_path}: {result.error}")
 
-        if args.output:
-            shutil.copy(
-                src=cache_dir() / "palettes/generated.lua",
-                dst=Path(args.output).expanduser(),
-            )
+        if failed:
+            logger.error(f"Failed to generate {failed} palettes")
+            exit(1)
 
     if args.command == "remove":
         path = Path("~/.cache/chroma/palettes/generated.lua").expanduser()
@@ -14,3 +14,7 @@ FilePath = str | Path
 HSLMapField = Optional[tuple[int, int] | list[tuple[int, int]]]
 HSLMapValue = tuple[HSLMapField, HSLMapField, HSLMapField]
 HSLMap = dict[str, HSLMapValue]
+
+# The name of the color to adjust, the name of the color it is read against,
+# and the minimum WCAG contrast ratio between them
+ContrastPair = tuple[str, str, float]
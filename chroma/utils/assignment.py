@@ -0,0 +1,204 @@
+"""
+Global assignment of histogram colors to the slots of an `HSLMap`.
+
+Classifying the histogram color by color is first-match-wins: every color takes
+the first slot it satisfies, so a permissive slot early in the map can take a
+color which another slot needed more. The global mode scores every (slot,
+color) pair at once instead, and picks the assignment with the lowest total
+cost.
+
+```py
+found = assign_globally(histogram, counts, HSL_MAP)  # {name: index of the color}
+rows, cols = linear_sum_assignment(cost)
+```
+
+The cost of a pair is the distance from the color to the box of the slot's
+rule, relative to `tolerance`, plus a prominence weight which favors the more
+frequent colors. Colors further than `tolerance` from a box can never fill its
+slot. Every slot can also be left empty at a cost higher than any color it
+accepts, so slots without a good color are left to the generators, just like
+slots which no color matches in the first-match mode.
+
+The assignment is solved with the Hungarian method, in its shortest augmenting
+path form, with every step vectorized over the colors.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from chroma.types import HSLMap, HSLMapField
+from chroma.utils.hslmap import as_hsl
+
+ASSIGNMENT_MODES = ("first", "global")
+
+# The distance from a rule box, summed over hue degrees and saturation and
+# luminance percents, within which a color can still fill a slot
+ASSIGNMENT_TOLERANCE = 10.0
+
+# The cost of the least prominent color relative to the most prominent one, on
+# the same scale as a color which is `tolerance` away from a box
+PROMINENCE_WEIGHT = 0.5
+
+
+def linear_sum_assignment(cost) -> tuple[np.ndarray, np.ndarray]:
+    """Solves the linear sum assignment problem for a 2D cost matrix.
+
+    Every row is assigned to a different column when there are at least as
+    many columns as rows, and the other way around otherwise, such that the
+    summed cost of the chosen cells is as low as possible. Returns the row
+    indices, in ascending order, and the column indices of the chosen cells.
+
+    Raises a `ValueError` if the matrix holds a value which is not finite.
+    """
+
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.ndim != 2:
+        raise ValueError("The cost matrix must be a 2D array")
+    if not np.isfinite(cost).all():
+        raise ValueError("The cost matrix must only hold finite values")
+
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+
+    # Row and column potentials, with the column 0 standing in for the row
+    # being added. `owner[j]` is the 1-based row assigned to the column `j`.
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=np.intp)
+    way = np.zeros(m + 1, dtype=np.intp)
+    reduced = np.empty(m + 1)
+
+    for row in range(1, n + 1):
+        owner[0] = row
+        column = 0
+        slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+
+        # Grow a tree of tight edges until it reaches a free column
+        while True:
+            used[column] = True
+            current = owner[column]
+            free = ~used
+
+            reduced[1:] = cost[current - 1] - u[current] - v[1:]
+            better = free & (reduced < slack)
+            slack[better] = reduced[better]
+            way[better] = column
+
+            candidates = np.where(free, slack, np.inf)
+            column = int(candidates.argmin())
+            delta = candidates[column]
+
+            u[owner[used]] += delta
+            v[used] -= delta
+            slack[free] -= delta
+            if owner[column] == 0:
+                break
+
+        # Flip the assignments along the path back to the new row
+        while column != 0:
+            previous = way[column]
+            owner[column] = owner[previous]
+            column = previous
+
+    columns = np.flatnonzero(owner[1:])
+    rows = owner[1:][columns] - 1
+    if transposed:
+        rows, columns = columns, rows
+    order = np.argsort(rows, kind="stable")
+    return rows[order], columns[order]
+
+
+def field_distance(values: np.ndarray, field: HSLMapField, circular: bool = False):
+    """Returns the distance from every value to the nearest range of a field.
+
+    Values inside a range are at a distance of 0. With `circular`, values are
+    hues and the distance wraps around at 360 degrees.
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    if field is None:
+        return np.zeros_like(values)
+
+    ranges = [field] if type(field) is tuple else field
+    shifts = (-360, 0, 360) if circular else (0,)
+    distance = np.full_like(values, np.inf)
+    for lower, upper in ranges:
+        for shift in shifts:
+            shifted = values + shift
+            gap = np.maximum(np.maximum(lower - shifted, shifted - upper), 0)
+            distance = np.minimum(distance, gap)
+    return distance
+
+
+def rule_distances(colors, hsl_map: HSLMap) -> np.ndarray:
+    """Returns a (colors, rules) matrix of the distances from every color to
+    the box of every rule.
+
+    The colors are converted with `as_hsl()`. The distance is the sum of the
+    distances of each component to its field.
+    """
+
+    hsl = as_hsl(colors)
+    distances = np.zeros((len(hsl), len(hsl_map)))
+    for j, rule in enumerate(hsl_map.values()):
+        for component, field in enumerate(rule):
+            distances[:, j] += field_distance(hsl[:, component], field, component == 0)
+    return distances
+
+
+def prominence(counts) -> np.ndarray:
+    """Returns how much less frequent every color is than the most frequent
+    one, on a logarithmic scale from 0 to 1."""
+
+    counts = np.maximum(np.asarray(counts, dtype=np.float64).reshape(-1), 1)
+    if len(counts) == 0:
+        return counts
+    most, least = counts.max(), counts.min()
+    if most == least:
+        return np.zeros_like(counts)
+    return np.log(most / counts) / np.log(most / least)
+
+
+def assign_globally(
+    colors,
+    counts,
+    hsl_map: HSLMap,
+    tolerance: float = ASSIGNMENT_TOLERANCE,
+    weight: float = PROMINENCE_WEIGHT,
+) -> dict[str, int]:
+    """Assigns each slot of a map to at most one color, minimizing the summed
+    cost of every assignment.
+
+    Returns the index of the color of every assigned slot, in the order of the
+    colors, like `CompiledHSLMap.assign()`.
+    """
+
+    distances = rule_distances(colors, hsl_map)
+    n, slots = distances.shape
+    if n == 0 or slots == 0:
+        return {}
+
+    if tolerance > 0:
+        fit = distances / tolerance
+    else:
+        fit = np.where(distances > 0, np.inf, 0.0)
+    cost = fit + weight * prominence(counts)[:, np.newaxis]
+
+    # Leaving a slot empty costs as much as the worst color within the tolerance,
+    # and any pair past it costs more than leaving every slot empty
+    empty = 1 + weight
+    forbidden = 2 * empty * (slots + 1)
+    cost = np.where(fit <= 1, cost, forbidden)
+
+    matrix = np.full((slots, n + slots), forbidden)
+    matrix[:, :n] = cost.T
+    matrix[np.arange(slots), n + np.arange(slots)] = empty
+
+    names = list(hsl_map.keys())
+    rows, columns = linear_sum_assignment(matrix)
+    found = sorted((int(c), names[r]) for r, c in zip(rows, columns) if c < n)
+    return {name: index for index, name in found}
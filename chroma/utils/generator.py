@@ -4,7 +4,7 @@ from typing import Optional, cast
 from chroma.colors import Color, ColorHSL
 from chroma.logger import Logger
 from chroma.types import HSLMap, HSLMapField, HSLMapValue
-from chroma.utils.tools import closest, flatten
+from chroma.utils.hslmap import compile_hslmap, field_table
 
 logger = Logger.get_logger()
 
@@ -75,14 +75,10 @@ def match_color_from_hslmap(
     # manually cast it and appease the linter.
     hsl = color.cast(ColorHSL).denormalize().color
     h, s, l = cast(tuple[int, int, int], hsl)
-    for name, condition in condition_map.items():
-        if (
-            name not in ignore
-            and check_value(h, condition[0])
-            and check_value(s, condition[1])
-            and check_value(l, condition[2])
-        ):
-            return name
+
+    # The map is compiled into a lookup cube on first use, which turns the
+    # checks of every condition into a single index operation
+    return compile_hslmap(condition_map).match(h, s, l, ignore)
 
 
 def clamp_color_to_hslrules(
@@ -123,15 +119,6 @@ def clamp_color_to_hslrules(
     ```
     """
 
-    def get_closest_value(element: int, limits: HSLMapField):
-        if limits is None:
-            logger.warn(f"get_closest_value: cannot get closest for {limits}")
-            return element
-
-        valid_values = []
-        flatten(limits, valid_values)
-        return closest(valid_values, element)
-
     # Get the separated HSL values for the color. Note that by default, the
     # return type of `Color.color` is all its possible values. For `ColorHSL`,
     # it is `int | float`. We know `denormalize()` will return `int`s, so we can
@@ -139,47 +126,23 @@ def clamp_color_to_hslrules(
     hsl = color.cast(ColorHSL).denormalize().color
     h, s, l = cast(tuple[int, int, int], hsl)
 
-    if not check_value(h, condition[0]):
-        h = get_closest_value(h, condition[0])
+    # Each field holds the closest valid value of every value it fails
+    h = field_table(condition[0]).clamp(h)
+    s = field_table(condition[1]).clamp(s)
+    l = field_table(condition[2]).clamp(l)
 
-    if not check_value(s, condition[1]):
-        s = get_closest_value(s, condition[1])
+    return ColorHSL(h, s, l)
 
-    if not check_value(l, condition[2]):
-        l = get_closest_value(l, condition[2])
 
-    return ColorHSL(h, s, l)
+def check_value(value: int, condition: HSLMapField) -> bool:
+    """Returns whether a value meets a condition.
 
+    `None` means no restriction, and any value passes. A tuple passes if the
+    value is between its lower and upper limit, and a list of tuples passes if
+    the value is between the limits of any of them.
+    """
 
-def check_value(value: int, condition: HSLMapField):
-    # Get a list of checks to perform on the color
-    checks = []
-    if type(condition) is tuple:
-        checks = [condition]
-    elif type(condition) is list:
-        checks = condition
-    else:
-        checks = [None]
-
-    results = []
-    for check in checks:
-        # None means no restriction. Any value goes. Check passes.
-        if check is None:
-            results.append(True)
-            continue
-
-        # If the value we need is in between the lower and upper limit, then
-        # it is a valid value. Check passes.
-        if check[0] <= value <= check[1]:
-            results.append(True)
-            continue
-
-        # Otherwise, check fails.
-        results.append(False)
-
-    # If even a single check failed, then the value does not meet the
-    # conditions.
-    return all(results)
+    return field_table(condition).check(value)
 
 
 def write_lua_colors(path: Path, colors: dict, indent: int = 2):
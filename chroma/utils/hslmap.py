@@ -0,0 +1,404 @@
+"""
+A compiled form of an `HSLMap`, classifying colors with plain index operations.
+
+Denormalized HSL colors only take 361×101×101 values, and the rules of a map
+are few and rarely change. A map is compiled into a dense lookup cube instead
+of checking every rule of it for every color. Each cell of the cube holds a
+bitmask of the rules its (h, s, l) satisfies, with the first rule of the map in
+the lowest bit.
+
+```py
+classifier = compile_hslmap(HSL_MAP)
+classifier.match(h, s, l)  # Same as match_color_from_hslmap()
+matches = classifier.matches(histogram)  # (colors, rules) booleans
+found = classifier.assign(histogram)  # {name: index of the color}
+```
+
+A rule is satisfied when each of its fields is, so the cube is the AND of one
+bitmask table per component and only takes a few milliseconds to build. It is
+still stored in the cache directory, keyed by a digest of the map, and later
+runs memory-map it read-only like the RGB to HSL lookup table. Custom maps are
+compiled the same way on their first use, and only the `MAX_CUBES` most
+recently used cubes are kept.
+
+The fields of a rule are compiled on their own too, into a table of whether
+each value satisfies the field and the value it is clamped to otherwise. This
+is what `check_value()` and `clamp_color_to_hslrules()` index into.
+
+The file starts with a 16-byte header holding a magic string, the format
+version and the number of rules, followed by the cube in C order. The cells
+are unsigned integers with the fewest bytes which hold a bit for every rule,
+so a map has at most 64 rules.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+from chroma.colors import Color, ColorArray, ColorHSL
+from chroma.logger import Logger
+from chroma.types import HSLMap, HSLMapField
+from chroma.utils.paths import cache_dir
+from chroma.utils.tools import closest, flatten
+
+logger = Logger.get_logger()
+
+CUBE_MAGIC = b"CHROMHSL"
+CUBE_VERSION = 1
+CUBE_HEADER = np.dtype([("magic", "S8"), ("version", "<u4"), ("rules", "<u4")])
+CUBE_SHAPE = (361, 101, 101)
+
+# Every field is tabulated over the hue domain, which holds the others
+FIELD_SIZE = CUBE_SHAPE[0]
+
+MAX_RULES = 64
+
+# Cubes take a few megabytes each, and a cube is written for every map, so
+# only the most recently used ones are kept in the cache directory
+MAX_CUBES = 8
+
+
+def _ranges(field: HSLMapField) -> list[tuple[float, float]]:
+    """Returns the ranges of a field of a condition."""
+
+    if field is None:
+        return [(-np.inf, np.inf)]
+    if type(field) is tuple:
+        return [field]
+    return list(field)
+
+
+def _cell_dtype(rules: int) -> np.dtype:
+    for dtype in ("<u1", "<u2", "<u4", "<u8"):
+        if rules <= np.dtype(dtype).itemsize * 8:
+            return np.dtype(dtype)
+    raise ValueError(f"An HSL map can have at most {MAX_RULES} rules, got {rules}")
+
+
+def as_hsl(colors: Color | ColorArray | Iterable[Color] | np.ndarray) -> np.ndarray:
+    """Returns the denormalized HSL colors of a color, an array or a list.
+
+    Like `as_oklab()`, NumPy arrays are assumed to already hold denormalized
+    HSL colors.
+    """
+
+    if isinstance(colors, np.ndarray):
+        return colors.reshape(-1, 3)
+    if isinstance(colors, Color):
+        colors = [colors]
+    if not isinstance(colors, ColorArray):
+        colors = ColorArray.from_colors(colors, ColorHSL)
+    return colors.cast(ColorHSL).denormalized().data.reshape(-1, 3)
+
+
+class FieldTable:
+    """A field of a condition, tabulated over every value of a component."""
+
+    def __init__(self, field: HSLMapField):
+        values = np.arange(FIELD_SIZE)
+        self.__ranges = _ranges(field)
+        self.__allowed = np.zeros(FIELD_SIZE, dtype=bool)
+        for lower, upper in self.__ranges:
+            self.__allowed |= (lower <= values) & (values <= upper)
+
+        # Values outside of the field move to the nearest bound of any range,
+        # like `clamp_color_to_hslrules()` always did
+        self.__bounds = [] if field is None else flatten(field, [])
+        self.__clamped = values.copy()
+        rejected = values[~self.__allowed]
+        if rejected.size:
+            # `argmin()` keeps the first of equally close bounds, like `closest()`
+            bounds = np.array(self.__bounds)
+            distances = np.abs(bounds[np.newaxis, :] - rejected[:, np.newaxis])
+            self.__clamped[rejected] = bounds[distances.argmin(axis=1)]
+
+    @property
+    def allowed(self) -> np.ndarray:
+        return self.__allowed
+
+    def check(self, value: int) -> bool:
+        """Returns whether a value falls in any range of the field."""
+
+        if 0 <= value < FIELD_SIZE:
+            return bool(self.__allowed[value])
+        return any(lower <= value <= upper for lower, upper in self.__ranges)
+
+    def clamp(self, value: int) -> int:
+        """Returns the value, or the nearest bound if it is outside the field."""
+
+        if 0 <= value < FIELD_SIZE:
+            return int(self.__clamped[value])
+        if self.check(value):
+            return value
+        return closest(self.__bounds, value)
+
+
+_FIELDS: dict = {}
+
+
+def field_table(field: HSLMapField) -> FieldTable:
+    """Returns the table of a field, building it on first use."""
+
+    key = tuple(field) if type(field) is list else field
+    table = _FIELDS.get(key)
+    if table is None:
+        table = _FIELDS[key] = FieldTable(field)
+    return table
+
+
+def hslmap_digest(hsl_map: HSLMap) -> str:
+    """Returns a digest of the rules of a map, and of their order."""
+
+    rules = repr([(name, tuple(rule)) for name, rule in hsl_map.items()])
+    return hashlib.blake2b(rules.encode(), digest_size=16).hexdigest()
+
+
+def cube_path(hsl_map: HSLMap) -> Path:
+    path = cache_dir() / "hslmaps"
+    path.mkdir(parents=True, exist_ok=True)
+    return path / f"{hslmap_digest(hsl_map)}.v{CUBE_VERSION}.cube"
+
+
+def evict_cubes(directory: Path, keep: int = MAX_CUBES) -> None:
+    """Removes all but the `keep` most recently used cubes of a directory.
+    Cubes written for other format versions are always removed."""
+
+    current = []
+    for path in directory.glob("*.cube"):
+        if not path.name.endswith(f".v{CUBE_VERSION}.cube"):
+            path.unlink(missing_ok=True)
+            continue
+        try:
+            current.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            continue
+
+    current.sort(reverse=True)
+    for _, path in current[keep:]:
+        logger.debug(f"Removing unused HSL map cube {path}")
+        path.unlink(missing_ok=True)
+
+
+def build_cube(hsl_map: HSLMap) -> np.ndarray:
+    """Returns the lookup cube of a map, indexed by (h, s, l)."""
+
+    dtype = _cell_dtype(len(hsl_map))
+    axes = [np.zeros(size, dtype=dtype) for size in CUBE_SHAPE]
+    for bit, rule in enumerate(hsl_map.values()):
+        for axis, field in zip(axes, rule):
+            allowed = field_table(field).allowed[: len(axis)]
+            axis[allowed] |= dtype.type(1 << bit)
+
+    h, s, l = axes
+    return h[:, np.newaxis, np.newaxis] & s[np.newaxis, :, np.newaxis] & l
+
+
+def write_cube(path: Path, cube: np.ndarray, rules: int) -> Path:
+    """Atomically writes the cube of a map of `rules` rules to `path`.
+
+    Like the RGB to HSL lookup table, the cube is written to a temporary file
+    first, so concurrent readers never see a partially written cube.
+    """
+
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    header = np.array([(CUBE_MAGIC, CUBE_VERSION, rules)], dtype=CUBE_HEADER)
+    with open(tmp_path, "wb") as f:
+        f.write(header.tobytes())
+        f.write(cube.astype(cube.dtype.newbyteorder("<"), copy=False).tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_cube(path: Path, rules: int) -> np.ndarray:
+    """Memory-maps the cube stored at `path`.
+
+    Raises a `ValueError` if the file is not a cube of this format version
+    for a map of `rules` rules.
+    """
+
+    header = np.fromfile(path, dtype=CUBE_HEADER, count=1)
+    if (
+        header.size != 1
+        or header[0]["magic"] != CUBE_MAGIC
+        or header[0]["version"] != CUBE_VERSION
+        or header[0]["rules"] != rules
+    ):
+        raise ValueError(f"{path} is not a version {CUBE_VERSION} HSL map cube")
+
+    return np.memmap(
+        path,
+        dtype=_cell_dtype(rules),
+        mode="r",
+        offset=CUBE_HEADER.itemsize,
+        shape=CUBE_SHAPE,
+    )
+
+
+class CompiledHSLMap:
+    """An `HSLMap` compiled to a lookup cube.
+
+    The rules keep the order of the map, so the first matching rule of a color
+    is the one `match_color_from_hslmap()` would return.
+    """
+
+    def __init__(self, hsl_map: HSLMap, cube: np.ndarray):
+        self.__names = list(hsl_map.keys())
+        self.__cube = cube
+        self.__bits = np.array(
+            [1 << bit for bit in range(len(self.__names))], dtype=cube.dtype
+        )
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.__names)
+
+    @property
+    def cube(self) -> np.ndarray:
+        return self.__cube
+
+    def __ignored(self, ignore: Iterable[str]) -> int:
+        ignore = set(ignore)
+        return sum(1 << bit for bit, name in enumerate(self.__names) if name in ignore)
+
+    def match(self, h: int, s: int, l: int, ignore: Iterable[str] = ()) -> str | None:
+        """Returns the name of the first rule a denormalized HSL color
+        satisfies, skipping the rules in `ignore`."""
+
+        bits = int(self.__cube[h, s, l])
+        if ignore:
+            bits &= ~self.__ignored(ignore)
+        if bits == 0:
+            return None
+        return self.__names[(bits & -bits).bit_length() - 1]
+
+    def lookup(self, colors) -> np.ndarray:
+        """Returns the bitmask of the rules every color satisfies.
+
+        The colors are converted with `as_hsl()`.
+        """
+
+        hsl = np.asarray(as_hsl(colors), dtype=np.intp)
+        if ((hsl < 0) | (hsl >= CUBE_SHAPE)).any():
+            raise ValueError("HSL colors must be denormalized to be classified")
+        return self.__cube[hsl[:, 0], hsl[:, 1], hsl[:, 2]]
+
+    def matches(self, colors) -> np.ndarray:
+        """Returns a (colors, rules) boolean matrix of the rules each color
+        satisfies."""
+
+        return (self.lookup(colors)[:, np.newaxis] & self.__bits) != 0
+
+    def __mask(self, ignore: Iterable[str]) -> np.ndarray:
+        ignore = set(ignore)
+        return np.array([name not in ignore for name in self.__names], dtype=bool)
+
+    def first_match(self, colors, ignore: Iterable[str] = ()) -> list[str | None]:
+        """Returns the name of the first rule each color satisfies, skipping
+        the rules in `ignore`, or `None` for colors which satisfy none.
+
+        Every color is classified on its own, like `match_color_from_hslmap()`.
+        """
+
+        matches = self.matches(colors) & self.__mask(ignore)
+        found = matches.any(axis=1)
+        first = matches.argmax(axis=1)
+        return [self.__names[j] if ok else None for j, ok in zip(first, found)]
+
+    def assign(self, colors, ignore: Iterable[str] = ()) -> dict[str, int]:
+        """Assigns each rule to at most one color, visiting colors in order.
+
+        Every color takes the first rule it satisfies which no earlier color
+        has taken, like calling `match_color_from_hslmap()` on each color while
+        ignoring the names found so far. Returns the index of the color of
+        every assigned rule, in the order of the colors.
+
+        Each step assigns a rule, so the matrix is only scanned once per rule,
+        and never once per color.
+        """
+
+        matches = self.matches(colors)
+        available = self.__mask(ignore)
+        found = {}
+        start = 0
+        while start < len(matches):
+            candidates = matches[start:] & available
+            hits = candidates.any(axis=1)
+            if not hits.any():
+                break
+
+            # Colors before the hit match no available rule, and never will,
+            # as rules are only ever taken away
+            offset = int(hits.argmax())
+            rule = int(candidates[offset].argmax())
+            found[self.__names[rule]] = start + offset
+            available[rule] = False
+            start += offset + 1
+        return found
+
+
+_MAPS: dict[str, CompiledHSLMap] = {}
+
+# Hashing the rules of a map costs more than matching a color against its
+# cube, so maps are also remembered by identity. Each entry holds the map, which
+# keeps its id from being reused, and a snapshot of its rules, which catches
+# maps that were edited since.
+_MAPS_BY_ID: dict[int, tuple[HSLMap, tuple, CompiledHSLMap]] = {}
+MAX_MAPS_BY_ID = 32
+
+
+def compile_hslmap(hsl_map: HSLMap, path: Path | None = None) -> CompiledHSLMap:
+    """Compiles a map, or loads its cube if it was compiled before.
+
+    A cube which is malformed, or was written for another format version, is
+    rebuilt. Without a path, the cube is kept in the cache directory and shared
+    by every later call with the same rules.
+    """
+
+    if path is None:
+        entry = _MAPS_BY_ID.get(id(hsl_map))
+        if entry is not None and entry[1] == tuple(hsl_map.items()):
+            return entry[2]
+
+    digest = hslmap_digest(hsl_map)
+    if path is None and digest in _MAPS:
+        return _remember(hsl_map, _MAPS[digest])
+
+    cube_file = cube_path(hsl_map) if path is None else Path(path)
+    try:
+        cube = read_cube(cube_file, len(hsl_map))
+    except (OSError, ValueError):
+        logger.debug(f"Compiling HSL map {digest} to {cube_file}")
+        write_cube(cube_file, build_cube(hsl_map), len(hsl_map))
+        cube = read_cube(cube_file, len(hsl_map))
+
+    if path is None:
+        # Mark the cube as recently used, then drop the least recently used
+        try:
+            os.utime(cube_file)
+        except OSError:
+            pass
+        evict_cubes(cube_file.parent)
+
+    compiled = CompiledHSLMap(hsl_map, cube)
+    if path is None:
+        _MAPS[digest] = compiled
+        _remember(hsl_map, compiled)
+    return compiled
+
+
+def _remember(hsl_map: HSLMap, compiled: CompiledHSLMap) -> CompiledHSLMap:
+    # Maps built on the fly would otherwise pile up, so drop the oldest entry
+    key = id(hsl_map)
+    if key not in _MAPS_BY_ID and len(_MAPS_BY_ID) >= MAX_MAPS_BY_ID:
+        del _MAPS_BY_ID[next(iter(_MAPS_BY_ID))]
+    _MAPS_BY_ID[key] = (hsl_map, tuple(hsl_map.items()), compiled)
+    return compiled
@@ -0,0 +1,323 @@
+"""
+The palette pipeline shared by the generator backends.
+
+A backend only has to turn an image into a color histogram, as packed 0xRRGGBB
+colors and their pixel counts. From there, every backend builds the palette
+the same way:
+
+1. Near-duplicate colors are collapsed, keeping the most prominent ones first.
+2. The remaining colors are classified with an `HSLMap`, either color by color
+   or with a global assignment of colors to the slots of the map.
+3. The colors which could not be found are derived from the found ones by the
+   generators below.
+4. Unreadable pairs of colors are fixed with the contrast solver.
+
+```py
+packed, counts = pixel_histogram(pixels)
+packed, counts = top_colors(packed, counts, max_colors=1024)
+palette = build_palette(packed, counts)
+```
+"""
+
+from typing import Callable
+
+import numpy as np
+
+from chroma.colors import Color, ColorArray, ColorHex, ColorHSL, lazy
+from chroma.colors.contrast import solve_contrast
+from chroma.colors.convert import format_hex, pack_rgb, unpack_rgb
+from chroma.colors.dedupe import DEDUPE_THRESHOLD, collapse_duplicates
+from chroma.colors.lut import load_lut
+from chroma.colors.names import nearest_names
+from chroma.logger import Logger
+from chroma.types import ContrastPair, HSLMap, HSLMapValue
+from chroma.utils.assignment import ASSIGNMENT_MODES, assign_globally
+from chroma.utils.generator import clamp_color_to_hslrules
+from chroma.utils.hslmap import compile_hslmap
+from chroma.utils.tools import clamp
+
+logger = Logger.get_logger()
+
+HSL_MAP: HSLMap = {
+    "accent": (None, (60, 100), (50, 90)),
+    "black": (None, None, (5, 20)),
+    "white": (None, None, (80, 95)),
+    "background": (None, (0, 20), (5, 10)),
+    "foreground": (None, (0, 20), (90, 95)),
+    "red": ([(0, 35), (325, 360)], (40, 90), (30, 90)),
+    "orange": ((35, 75), (30, 90), (40, 80)),
+    "brown": ((35, 75), (30, 70), (20, 70)),
+    "yellow": ((65, 105), (40, 90), (30, 90)),
+    "green": ((100, 160), (40, 90), (30, 90)),
+    "blue": ((200, 230), (40, 50), (40, 60)),
+    "cyan": ((170, 200), (40, 90), (40, 90)),
+    "magenta": ((280, 310), (30, 50), (30, 50)),
+}
+
+
+# NOTE: These generators are used when the corresponding color cannot be inferred
+# from the image.
+# NOTE: Each generator must return a ColorHex object.
+
+
+def generator_fg(
+    white: Color,
+    accent: Color,
+    blend_ratio: float,
+    light_ratio: float,
+    condition: HSLMapValue,
+) -> ColorHex:
+    white = white.cast(ColorHSL).normalize()
+    accent = accent.cast(ColorHSL).normalize()
+    l1 = white.color[0]
+    l2 = accent.color[0]
+    hue = l1 * blend_ratio + l2 * blend_ratio
+    white = white.set_l(clamp(hue, 0.0, 1.0))
+    white = white.lighten(light_ratio)
+    color = clamp_color_to_hslrules(white, condition)
+    return color.cast(ColorHex)
+
+
+def generator_bg(
+    black: Color,
+    accent: Color,
+    blend_ratio: float,
+    dark_ratio: float,
+    condition: HSLMapValue,
+) -> ColorHex:
+    black = black.cast(ColorHSL).normalize()
+    accent = accent.cast(ColorHSL).normalize()
+    l1 = black.color[0]
+    l2 = accent.color[0]
+    hue = l1 * blend_ratio + l2 * blend_ratio
+    black = black.set_l(clamp(hue, 0.0, 1.0))
+    black = black.darken(dark_ratio)
+    color = clamp_color_to_hslrules(black, condition)
+    return color.cast(ColorHex)
+
+
+def generator_norm(
+    white: Color,
+    accent: Color,
+    mix_hex: str,
+    condition: HSLMapValue,
+) -> ColorHex:
+    mix = ColorHex(mix_hex)
+    if mix.cast(ColorHSL).l < 0.3:
+        mix = mix.cast(ColorHSL).set_l(0.45)
+    else:
+        mix = mix.darkened(0.25)
+    color = (
+        lazy(white)
+        .blended(mix, 0.75)
+        .blended(accent, 0.15)
+        .saturated(0.2)
+        .darkened(0.2)
+        .blended(mix, 0.15)
+        .lightened(0.25)
+        .evaluate()
+    )
+    color = clamp_color_to_hslrules(color, condition)
+    return color.cast(ColorHex)
+
+
+def generator_bright(
+    white: Color,
+    accent: Color,
+    mix_hex: str,
+    condition: HSLMapValue,
+) -> ColorHex:
+    return generator_norm(white, accent, mix_hex, condition).lightened(0.15)
+
+
+def generator_black(prominent: Color, condition: HSLMapValue) -> ColorHex:
+    color = (
+        lazy(prominent)
+        .darkened(0.4)
+        .blended(prominent, 0.2)
+        .lightened(0.4)
+        .blended(prominent, 0.1)
+        .evaluate()
+    )
+    color = clamp_color_to_hslrules(color, condition)
+    return color.cast(ColorHex)
+
+
+def generator_white(prominent: Color, condition: HSLMapValue) -> ColorHex:
+    color = (
+        lazy(prominent)
+        .lightened(0.4)
+        .blended(prominent, 0.2)
+        .darkened(0.4)
+        .blended(prominent, 0.1)
+        .evaluate()
+    )
+    color = clamp_color_to_hslrules(color, condition)
+    return color.cast(ColorHex)
+
+
+def generator_accent(prominent: Color, condition: HSLMapValue) -> ColorHex:
+    color = clamp_color_to_hslrules(prominent.saturated(0.1), condition)
+    return color.cast(ColorHex)
+
+
+# fmt: off
+# TODO: enable customisation of the generators
+GENERATORS: dict[str, Callable[[dict], ColorHex]] = {
+    "accent": lambda x: generator_accent(x["prominent"], HSL_MAP["accent"]),
+    "black": lambda x: generator_black(x["prominent"], HSL_MAP["black"]),
+    "white": lambda x: generator_white(x["prominent"], HSL_MAP["white"]),
+    "bright_black": lambda x: x["black"].lightened(0.1),
+    "bright_white": lambda x: x["white"].lightened(0.1),
+    "accent_bg": lambda x: lazy(x["accent"]).desaturated(0.2).darkened(0.1).evaluate(),
+    "accent_fg": lambda x: x["white"].lightened(0.15),
+    "foreground": lambda x: generator_fg(x["white"], x["accent"], 0.5, 0.08, HSL_MAP["foreground"]),
+    "foreground_alt": lambda x: generator_fg(x["white"], x["accent"], 0.5, 0.1, HSL_MAP["foreground"]),
+    "foreground_unfocus": lambda x: generator_fg(x["white"], x["accent"], 0.5, 0.12, HSL_MAP["foreground"]),
+    "background": lambda x: generator_bg(x["black"], x["accent"], 0.5, 0.08, HSL_MAP["background"]),
+    "background_alt": lambda x: generator_bg(x["black"], x["accent"], 0.5, 0.1, HSL_MAP["background"]),
+    "background_unfocus": lambda x: generator_bg(x["black"], x["accent"], 0.5, 0.12, HSL_MAP["background"]),
+    "red": lambda x: generator_norm(x["white"], x["accent"], "#ff0000", HSL_MAP["red"]),
+    "orange": lambda x: generator_norm(x["white"], x["accent"], "#ff8800", HSL_MAP["orange"]),
+    "brown": lambda x: generator_norm(x["white"], x["accent"], "#884400", HSL_MAP["brown"]),
+    "yellow": lambda x: generator_norm(x["white"], x["accent"], "#ffff00", HSL_MAP["yellow"]),
+    "green": lambda x: generator_norm(x["white"], x["accent"], "#00ff00", HSL_MAP["green"]),
+    "blue": lambda x: generator_norm(x["white"], x["accent"], "#0000ff", HSL_MAP["blue"]),
+    "cyan": lambda x: generator_norm(x["white"], x["accent"], "#00ffff", HSL_MAP["cyan"]),
+    "magenta": lambda x: generator_norm(x["white"], x["accent"], "#ff00ff", HSL_MAP["magenta"]),
+    "bright_red": lambda x: generator_bright(x["white"], x["accent"], "#ff0000", HSL_MAP["red"]),
+    "bright_orange": lambda x: generator_bright(x["white"], x["accent"], "#ff8800", HSL_MAP["orange"]),
+    "bright_brown": lambda x: generator_bright(x["white"], x["accent"], "#884400", HSL_MAP["brown"]),
+    "bright_yellow": lambda x: generator_bright(x["white"], x["accent"], "#ffff00", HSL_MAP["yellow"]),
+    "bright_green": lambda x: generator_bright(x["white"], x["accent"], "#00ff00", HSL_MAP["green"]),
+    "bright_blue": lambda x: generator_bright(x["white"], x["accent"], "#0000ff", HSL_MAP["blue"]),
+    "bright_cyan": lambda x: generator_bright(x["white"], x["accent"], "#00ffff", HSL_MAP["cyan"]),
+    "bright_magenta": lambda x: generator_bright(x["white"], x["accent"], "#ff00ff", HSL_MAP["magenta"]),
+}
+# fmt: on
+
+# The minimum contrast ratios enforced on the final palette. The first color of
+# each pair is adjusted until it is readable against the second one.
+NORMAL_COLORS = ["red", "orange", "brown", "yellow", "green", "blue", "cyan", "magenta"]
+CONTRAST_PAIRS: list[ContrastPair] = [
+    ("foreground", "background", 7.0),
+    ("foreground_alt", "background_alt", 7.0),
+    ("foreground_unfocus", "background_unfocus", 4.5),
+    ("accent_bg", "accent_fg", 4.5),
+    *[(name, "background", 3.0) for name in NORMAL_COLORS],
+    *[(f"bright_{name}", "background", 4.5) for name in NORMAL_COLORS],
+]
+
+# The rule a color has to match to be considered the prominent color, which the
+# missing colors are derived from
+PROMINENT_MAP: HSLMap = {"prominent": (None, (40, 100), (25, 100))}
+
+
+def pixel_histogram(pixels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Counts the colors of an image, given as an array of 8-bit RGB pixels.
+
+    The pixels can have any shape as long as the last axis holds the three
+    components, like the H×W×3 array of an image or a flat buffer reshaped to
+    N×3. Returns the distinct packed 0xRRGGBB colors and their pixel counts.
+    """
+
+    packed = pack_rgb(np.asarray(pixels).reshape(-1, 3))
+    colors, counts = np.unique(packed, return_counts=True)
+    return colors, counts
+
+
+def top_colors(
+    packed: np.ndarray, counts: np.ndarray, max_colors: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the `max_colors` most frequent colors, most frequent first.
+
+    Colors with the same count keep their order, so the result is
+    deterministic.
+    """
+
+    order = np.argsort(-np.asarray(counts, dtype=np.int64), kind="stable")
+    order = order[:max_colors]
+    return np.asarray(packed)[order], np.asarray(counts)[order]
+
+
+def build_palette(
+    packed: np.ndarray,
+    counts: np.ndarray,
+    hsl_map: HSLMap = HSL_MAP,
+    required_colors: dict = GENERATORS,
+    use_lut: bool = False,
+    contrast_pairs: list[ContrastPair] = CONTRAST_PAIRS,
+    dedupe_threshold: float = DEDUPE_THRESHOLD,
+    assignment: str = "first",
+) -> dict[str, ColorHex]:
+    """Builds a palette out of a color histogram.
+
+    The histogram is given as packed 0xRRGGBB colors and their pixel counts,
+    sorted from the most to the least frequent color.
+
+    With the "first" assignment, every color takes the first slot of the map
+    it satisfies. With the "global" assignment, the slots are filled by the
+    assignment of colors with the lowest summed cost, see `assign_globally()`.
+    """
+
+    if assignment not in ASSIGNMENT_MODES:
+        raise ValueError(f"Unknown assignment mode '{assignment}'")
+
+    packed = np.asarray(packed, dtype=np.uint32)
+    if packed.size == 0:
+        raise ValueError("Cannot build a palette out of an empty histogram")
+
+    # Merge shades which are too close to tell apart, so only one color of each
+    # cluster has to be classified. The clusters are ordered by their summed
+    # pixel counts, which keeps the most prominent colors first.
+    representatives, sums, _ = collapse_duplicates(
+        ColorArray(unpack_rgb(packed), ColorHex), counts, dedupe_threshold
+    )
+    logger.debug(
+        f"Collapsed {len(packed)} histogram colors into "
+        f"{len(representatives)} clusters"
+    )
+    packed = packed[representatives]
+    raw_colors = format_hex(packed)
+
+    # Convert the entire histogram to HSL in one go instead of casting each
+    # color on its own. The lookup table turns this into a single index
+    # operation, but has to be built on its first use.
+    if use_lut:
+        histogram = ColorArray(load_lut().lookup(packed), ColorHSL)
+    else:
+        histogram = (
+            ColorArray(unpack_rgb(packed), ColorHex).cast(ColorHSL).denormalized()
+        )
+
+    # Every color is checked against every rule in a single pass
+    prominent = compile_hslmap(PROMINENT_MAP).matches(histogram).any(axis=1)
+    if prominent.any():
+        prominent_color = histogram[int(prominent.argmax())].cast(ColorHex)
+        logger.debug(f"Detected prominent color {prominent_color}")
+    else:
+        prominent_color = ColorHex(raw_colors[0])
+        logger.debug(
+            f"Could not detect a suitable prominent color. "
+            f"Using {prominent_color.cast(ColorHex)}"
+        )
+
+    if assignment == "global":
+        found = assign_globally(histogram, sums, hsl_map)
+    else:
+        found = compile_hslmap(hsl_map).assign(histogram)
+    colors = {name: ColorHex(raw_colors[index]) for name, index in found.items()}
+
+    # Name the detected colors in one batched query, to make the log readable
+    if colors:
+        nearest, _ = nearest_names(colors.values())
+        for (name, color), nearest_name in zip(colors.items(), nearest):
+            logger.debug(f"Found color {name} to be {color} ≈ {nearest_name}")
+
+    for name, generator in required_colors.items():
+        if colors.get(name) is None:
+            colors[name] = generator({"prominent": prominent_color, **colors})
+            logger.debug(f"Color {name} doesn't exist. Generated to {colors[name]}")
+
+    # Fix unreadable pairs in one vectorized pass over the finished palette
+    return solve_contrast(colors, contrast_pairs)
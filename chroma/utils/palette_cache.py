@@ -0,0 +1,194 @@
+"""
+A content-addressed cache of generated palettes, stored in the cache directory.
+
+Generating a palette decodes and histograms the whole image, even when the
+same wallpaper was already used an hour ago. The cache stores every generated
+palette under a key derived from everything the palette depends on:
+
+- a digest of the bytes of the image, so renaming or touching it doesn't
+  matter, but editing it does,
+- the name of the backend and every option it runs with, including the
+  defaults of the ones it wasn't given, like its color map and generators,
+- a digest of the source of the palette pipeline, and the version of
+  Chroma, so changes to the pipeline never return stale palettes. This covers
+  the helpers the generators call too, and not only the generators.
+
+```py
+cache = PaletteCache()
+key = palette_key(image_path, "magick", {"image_size": 256, "depth": 8, ...})
+palette = cache.get(key)
+if palette is None:
+    palette = generate(...)
+    cache.put(key, palette)
+```
+
+Each palette is a small JSON file. A hit bumps the modification time of its
+file, and once the files take more than `max_bytes`, the least recently used
+ones are removed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import chroma
+from chroma.colors import Color, ColorHex
+from chroma.logger import Logger
+from chroma.utils.paths import cache_dir, chroma_dir
+
+logger = Logger.get_logger()
+
+CACHE_VERSION = 1
+
+# The code a palette depends on, relative to the package. The backends, the
+# generators and every helper they call live in these.
+PIPELINE_SOURCES = ("colors", "generators", "utils", "types.py")
+
+# A palette takes about a kilobyte, so this holds around a thousand palettes
+DEFAULT_MAX_BYTES = 1 << 20
+
+
+def _fingerprint(value) -> object:
+    """Returns a JSON-serializable, stable description of an option.
+
+    Functions are described by their name and their code, so changing a
+    generator changes the key of every palette it was used for.
+    """
+
+    if isinstance(value, dict):
+        return {str(k): _fingerprint(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    code = getattr(value, "__code__", None)
+    if code is not None:
+        body = code.co_code + repr(code.co_consts).encode()
+        name = f"{value.__module__}.{value.__qualname__}"
+        return f"{name}:{hashlib.blake2b(body, digest_size=8).hexdigest()}"
+    return repr(value)
+
+
+_SOURCE_DIGEST: str | None = None
+
+
+def source_digest() -> str:
+    """Returns a digest of the source of the palette pipeline, computed once."""
+
+    global _SOURCE_DIGEST
+    if _SOURCE_DIGEST is not None:
+        return _SOURCE_DIGEST
+
+    root = chroma_dir()
+    files = []
+    for source in PIPELINE_SOURCES:
+        path = root / source
+        files += sorted(path.rglob("*.py")) if path.is_dir() else [path]
+
+    digest = hashlib.blake2b(digest_size=16)
+    for path in files:
+        digest.update(path.relative_to(root).as_posix().encode() + b"\0")
+        digest.update(path.read_bytes())
+    _SOURCE_DIGEST = digest.hexdigest()
+    return _SOURCE_DIGEST
+
+
+def image_digest(image_path: Path | str) -> str:
+    """Returns the digest of the bytes of an image."""
+
+    with open(image_path, "rb") as f:
+        return hashlib.file_digest(f, "blake2b").hexdigest()
+
+
+def palette_key(image_path: Path | str, backend: str, options: dict) -> str:
+    """Returns the cache key of the palette of an image.
+
+    The options should hold every argument of the backend, and not only the
+    ones which were passed to it, so the key changes with their defaults.
+    """
+
+    document = {
+        "version": CACHE_VERSION,
+        "chroma": chroma.__version__,
+        "source": source_digest(),
+        "image": image_digest(image_path),
+        "backend": backend,
+        "options": _fingerprint(options),
+    }
+    encoded = json.dumps(document, sort_keys=True).encode()
+    return hashlib.blake2b(encoded, digest_size=20).hexdigest()
+
+
+class PaletteCache:
+    """A directory of palettes, evicted least recently used first."""
+
+    def __init__(self, path: Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes < 0:
+            raise ValueError("The cache size cannot be negative.")
+        self.__path = Path(path) if path is not None else cache_dir() / "palette-cache"
+        self.__path.mkdir(parents=True, exist_ok=True)
+        self.__max_bytes = max_bytes
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
+    def __entry(self, key: str) -> Path:
+        return self.__path / f"{key}.json"
+
+    def get(self, key: str) -> dict[str, Color] | None:
+        """Returns the palette stored under a key, or `None` on a miss."""
+
+        entry = self.__entry(key)
+        try:
+            palette = json.loads(entry.read_bytes())
+            colors = {name: ColorHex(value) for name, value in palette.items()}
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, AttributeError):
+            logger.warn(f"Removing unreadable cached palette {entry}")
+            entry.unlink(missing_ok=True)
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return colors
+
+    def put(self, key: str, palette: dict[str, Color]) -> None:
+        """Stores a palette under a key, then evicts old palettes if the cache
+        is over its size."""
+
+        entry = self.__entry(key)
+        colors = {name: str(color.cast(ColorHex)) for name, color in palette.items()}
+        tmp_path = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(colors))
+        os.replace(tmp_path, entry)
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes the least recently used palettes until the cache fits."""
+
+        entries = []
+        for entry in self.__path.glob("*.json"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.__max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        for entry in self.__path.glob("*.json"):
+            entry.unlink(missing_ok=True)
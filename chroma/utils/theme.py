@@ -2,6 +2,8 @@ from pathlib import Path
 
 from lupa import LuaRuntime
 
+from chroma.colors import ColorHex
+from chroma.colors.names import lookup, nearest_name
 from chroma.logger import Logger
 
 from .paths import cache_dir, chroma_dir
@@ -12,6 +14,14 @@ logger = Logger.get_logger()
 DEFAULT_STATE: dict = {"use_generated": True}
 
 
+def named_color(name: str) -> str:
+    return str(lookup(name))
+
+
+def color_name(color: str) -> str:
+    return nearest_name(ColorHex(color))
+
+
 def sanitize_python(state: dict = dict(), **kwargs) -> dict:
     state.update(kwargs)
     out = dict()
@@ -30,6 +40,11 @@ def runtime(state: dict | None = DEFAULT_STATE):
     runtime.execute(f"package.path = package.path .. ';{chroma_dir().parent}/?.lua'")
     runtime.execute(f"package.path = package.path .. ';{cache_dir().parent}/?.lua'")
 
+    # Named colors are exposed to themes through `chroma.builtins.lib`
+    runtime.globals()["color_names"] = runtime.table_from(
+        {"hex": named_color, "nearest": color_name}
+    )
+
     if state is not None:
         state = sanitize_python(state)
         for name, value in state.items():
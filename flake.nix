@@ -19,6 +19,7 @@
             black
             isort
             lupa
+            numpy
             luajitPackages.luacheck
             pylint
             mypy
@@ -44,7 +45,7 @@
           pname = "chroma";
           version = "0.8.1";
           src = ./.;
-          propagatedBuildInputs = with pkgs; with python.pkgs; [ lupa imagemagick ];
+          propagatedBuildInputs = with pkgs; with python.pkgs; [ lupa numpy imagemagick ];
           buildInputs = [ python.pkgs.setuptools ]; 
         };
       });
@@ -7,8 +7,8 @@ setup(
     version="0.8.1",
     author="Aryan Jassal",
     description="Theme any and all apps via a universal interface",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks*", "tests*"]),
     include_package_data=True,
     entry_points={"console_scripts": ["chroma=chroma.main:main"]},
-    install_requires=["lupa"],
+    install_requires=["lupa", "numpy"],
 )
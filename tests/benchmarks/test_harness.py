@@ -0,0 +1,30 @@
+import numpy as np
+
+from benchmarks.quantizers import BASELINE, Comparison, compare, fastest_within
+
+
+def test_compare_engines():
+    rng = np.random.default_rng(0)
+    packed = np.unique(rng.integers(0, 1 << 24, 500)).astype(np.uint32)
+    counts = rng.integers(1, 100, len(packed))
+
+    comparisons = compare(
+        {"random": (packed, counts)}, [BASELINE, "octree"], n_colors=8, min_time=0.01
+    )
+    assert [c.engine for c in comparisons] == [BASELINE, "octree"]
+    for comparison in comparisons:
+        assert comparison.ms_per_op > 0
+        assert comparison.colors <= 8
+        assert comparison.error > 0
+
+
+def test_fastest_within():
+    comparisons = [
+        Comparison("a.jpg", "fast", 1.0, 0, 8, 0.05),
+        Comparison("b.jpg", "fast", 1.0, 0, 8, 0.01),
+        Comparison("a.jpg", "slow", 9.0, 0, 8, 0.01),
+        Comparison("b.jpg", "slow", 9.0, 0, 8, 0.01),
+    ]
+    assert fastest_within(comparisons, 0.1) == "fast"
+    assert fastest_within(comparisons, 0.02) == "slow"
+    assert fastest_within(comparisons, 0.001) is None
@@ -0,0 +1,59 @@
+import pytest
+
+from benchmarks.runner import (
+    Benchmark,
+    Result,
+    load_results,
+    machine_info,
+    machine_tag,
+    measure,
+    regressions,
+    save_results,
+)
+from benchmarks.suite import benchmarks
+
+
+def test_measure():
+    bench = Benchmark("list", setup=lambda: (100,), run=lambda n: list(range(n)))
+    result = measure(bench, min_time=0.01)
+    assert result.ops_per_sec > 0
+    assert result.allocations_per_op >= 1
+    assert result.bytes_per_op > 0
+    assert result.tracked
+
+
+def test_suite_runs():
+    suite = benchmarks()
+    assert len({bench.name for bench in suite}) == len(suite)
+    for bench in suite:
+        if bench.name.endswith("[16]"):
+            assert not bench.tracked
+            bench.run(*bench.setup())
+
+
+def test_results_round_trip(global_setup_teardown):
+    info = machine_info()
+    path = global_setup_teardown / f"{machine_tag(info)}.json"
+    results = {"op": Result(1000.0, 2.0, 64.0, True)}
+
+    assert load_results(path) is None
+    save_results(path, info, results)
+    assert load_results(path) == results
+
+
+def test_regressions():
+    baseline = {
+        "fast": Result(1000.0, 0, 0, True),
+        "slow": Result(1000.0, 0, 0, True),
+        "noisy": Result(1000.0, 0, 0, False),
+    }
+    results = {
+        "fast": Result(900.0, 0, 0, True),
+        "slow": Result(500.0, 0, 0, True),
+        "noisy": Result(100.0, 0, 0, False),
+        "new": Result(1.0, 0, 0, True),
+    }
+    assert regressions(baseline, results, threshold=0.25) == [("slow", -0.5)]
+    slower = regressions(baseline, results, threshold=0.05)
+    assert [name for name, _ in slower] == ["fast", "slow"]
+    assert slower[0][1] == pytest.approx(-0.1)
@@ -0,0 +1,75 @@
+import numpy as np
+
+from chroma.colors import ColorArray, ColorHex, ColorHSL, ColorRGB
+
+HEX_COLORS = ["#000000", "#ffffff", "#ff0000", "#3b4261", "#ee9a68", "#1a1b26"]
+
+
+def test_create_array():
+    colors = ColorArray.from_hex(HEX_COLORS)
+    assert len(colors) == len(HEX_COLORS)
+    assert colors.space is ColorHex
+    assert colors.color == HEX_COLORS
+
+    try:
+        ColorArray([[999, 0, 0]], ColorRGB)
+    except ValueError:
+        assert True
+    except:
+        assert False
+
+    try:
+        ColorArray([[0, 0]], ColorRGB)
+    except ValueError:
+        assert True
+    except:
+        assert False
+
+
+def test_check_array_casting():
+    colors = ColorArray.from_hex(HEX_COLORS)
+
+    hsl = colors.cast(ColorHSL)
+    rgb = colors.cast(ColorRGB)
+    assert hsl.space is ColorHSL
+    assert rgb.space is ColorRGB
+    for i, value in enumerate(HEX_COLORS):
+        assert hsl[i].color == ColorHex(value).cast(ColorHSL).color
+        assert rgb[i].color == ColorHex(value).cast(ColorRGB).color
+
+    expected = [
+        str(ColorHex(value).cast(ColorHSL).cast(ColorHex)) for value in HEX_COLORS
+    ]
+    assert hsl.cast(ColorHex).color == expected
+    assert rgb.cast(ColorHex).color == HEX_COLORS
+
+
+def test_check_normalization_denormalization():
+    colors = ColorArray([[0, 50, 100], [360, 100, 0]], ColorHSL)
+
+    normalized = colors.normalized()
+    assert normalized.is_normalized()
+    assert np.all((normalized.data >= 0.0) & (normalized.data <= 1.0))
+
+    denormalized = normalized.denormalized()
+    assert not denormalized.is_normalized()
+    assert np.array_equal(denormalized.data, colors.data)
+
+
+def test_check_operations_match_scalar():
+    colors = ColorArray.from_hex(HEX_COLORS)
+    mix = ColorHex("#884400")
+
+    for i, value in enumerate(HEX_COLORS):
+        color = ColorHex(value)
+        assert colors.darkened(0.2)[i].color == color.darkened(0.2).color
+        assert colors.lightened(0.2)[i].color == color.lightened(0.2).color
+        assert colors.saturated(0.2)[i].color == color.saturated(0.2).color
+        assert colors.desaturated(0.2)[i].color == color.desaturated(0.2).color
+        assert colors.blended(mix, 0.3)[i].color == color.blended(mix, 0.3).color
+
+
+def test_check_pairwise_blend():
+    black = ColorArray([[0.0, 0.0, 0.0]] * 2, ColorRGB)
+    white = ColorArray([[1.0, 1.0, 1.0]] * 2, ColorRGB)
+    assert np.allclose(black.blended(white, 0.25).data, 0.25)
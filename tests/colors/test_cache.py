@@ -0,0 +1,63 @@
+from chroma.colors import ColorHex, ColorHSL, ColorRGB
+from chroma.colors.cache import CONVERSION_CACHE, ConversionCache
+
+
+def test_cache_hits_and_misses():
+    cache = ConversionCache(maxsize=8)
+    assert cache.get_or_convert("a", lambda: 1) == 1
+    assert cache.get_or_convert("a", lambda: 2) == 1
+    info = cache.info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.currsize == 1
+
+
+def test_cache_eviction():
+    cache = ConversionCache(maxsize=2)
+    cache.get_or_convert("a", lambda: 1)
+    cache.get_or_convert("b", lambda: 2)
+
+    # Touch "a" so that "b" becomes the least recently used entry
+    cache.get_or_convert("a", lambda: 1)
+    cache.get_or_convert("c", lambda: 3)
+    assert cache.info().currsize == 2
+    assert cache.get_or_convert("a", lambda: -1) == 1
+    assert cache.get_or_convert("b", lambda: -1) == -1
+
+    cache.maxsize = 1
+    assert cache.info().currsize == 1
+
+
+def test_cache_disabled():
+    cache = ConversionCache(enabled=False)
+    assert cache.get_or_convert("a", lambda: 1) == 1
+    assert cache.get_or_convert("a", lambda: 2) == 2
+    assert cache.info().currsize == 0
+
+
+def test_cast_uses_shared_cache():
+    CONVERSION_CACHE.clear()
+    hsl = ColorHex("#3b4261").cast(ColorHSL)
+    misses = CONVERSION_CACHE.info().misses
+
+    # A fresh instance of the same color should reuse the earlier conversion
+    assert ColorHex("#3B4261").cast(ColorHSL) is hsl
+    assert CONVERSION_CACHE.info().misses == misses
+    assert CONVERSION_CACHE.info().hits > 0
+
+    CONVERSION_CACHE.enabled = False
+    try:
+        assert ColorRGB(59, 66, 97).cast(ColorHSL) == hsl
+        assert CONVERSION_CACHE.info().currsize == 0
+    finally:
+        CONVERSION_CACHE.enabled = True
+
+
+def test_cast_keeps_hsl_scales_apart():
+    CONVERSION_CACHE.clear()
+
+    # Both scales have equal component tuples, so the integer color must not
+    # hand its conversion to the normalized one
+    assert str(ColorHSL(1, 1, 1).cast(ColorHex)) == "#030303"
+    assert str(ColorHSL(1.0, 1.0, 1.0).cast(ColorHex)) == "#ffffff"
+    assert ColorHSL(0, 0, 1).cast(ColorRGB) != ColorHSL(0.0, 0.0, 1.0).cast(ColorRGB)
@@ -0,0 +1,80 @@
+import numpy as np
+
+from chroma.colors import ColorArray, ColorHex, ColorHSL, ColorRGB
+from chroma.colors.contrast import (
+    contrast_matrix,
+    contrast_ratio,
+    luminances,
+    solve_contrast,
+    solve_lightness,
+)
+
+
+def test_contrast_ratio():
+    lum = luminances([ColorHex("#000000"), ColorHex("#ffffff"), ColorHex("#777777")])
+    assert np.allclose(lum[:2], [0.0, 1.0])
+    assert np.isclose(contrast_ratio(lum[0], lum[1]), 21.0)
+    assert np.isclose(contrast_ratio(lum[1], lum[0]), 21.0)
+    # The well-known #777777 on white is just below 4.5
+    assert 4.4 < contrast_ratio(lum[2], lum[1]) < 4.5
+
+    matrix = contrast_matrix(ColorArray.from_hex(["#000000", "#ffffff", "#777777"]))
+    assert matrix.shape == (3, 3)
+    assert np.allclose(np.diag(matrix), 1.0)
+    assert np.allclose(matrix, matrix.T)
+
+
+def test_solve_lightness_finds_smallest_change():
+    hsl = ColorArray.from_hex(["#777777", "#3b4261"]).cast(ColorHSL).data
+    against = np.array([1.0, 0.0])
+    l = solve_lightness(hsl, against, np.array([4.5, 4.5]))
+
+    # The grey gets darker on white, the blue lighter on black
+    assert l[0] < hsl[0, 2] and l[1] > hsl[1, 2]
+    for i in range(2):
+        color = ColorHSL(*hsl[i, :2].tolist(), float(l[i])).cast(ColorHex)
+        assert contrast_ratio(luminances(color), against[i]) >= 4.5
+
+        # A slightly smaller change wouldn't be enough
+        step = 1 / 100
+        closer = float(l[i] + (step if i == 0 else -step))
+        color = ColorHSL(*hsl[i, :2].tolist(), closer).cast(ColorHex)
+        assert contrast_ratio(luminances(color), against[i]) < 4.5
+
+
+def test_solve_lightness_switches_direction():
+    # Mid grey can't reach 7:1 by getting darker on black, only by getting lighter
+    hsl = ColorArray.from_hex(["#303030"]).cast(ColorHSL).data
+    l = solve_lightness(hsl, np.array([0.03]), np.array([7.0]))
+    assert l[0] > hsl[0, 2]
+
+    # Impossible ratios end up at the extreme with the most contrast
+    l = solve_lightness(hsl, np.array([0.3]), np.array([20.0]))
+    assert l[0] == 0.0
+
+
+def test_solve_contrast():
+    palette = {
+        "background": ColorHex("#1a1b26"),
+        "foreground": ColorHex("#3b4261"),
+        "comment": ColorRGB(90, 90, 90),
+        "fine": ColorHex("#ffffff"),
+    }
+    pairs = [
+        ("foreground", "background", 7.0),
+        ("comment", "background", 3.0),
+        ("fine", "background", 4.5),
+        ("missing", "background", 4.5),
+    ]
+    result = solve_contrast(palette, pairs)
+
+    assert result is not palette
+    assert palette["foreground"] == ColorHex("#3b4261")
+    assert type(result["foreground"]) is ColorHex
+    assert type(result["comment"]) is ColorRGB
+    assert result["background"] is palette["background"]
+    assert result["fine"] is palette["fine"]
+
+    lum = luminances([result[name] for name in ["background", "foreground", "comment"]])
+    assert contrast_ratio(lum[1], lum[0]) >= 7.0
+    assert contrast_ratio(lum[2], lum[0]) >= 3.0
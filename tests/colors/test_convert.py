@@ -0,0 +1,121 @@
+import colorsys
+
+import numpy as np
+
+from chroma.colors import ColorArray, ColorHex, ColorHSL, ColorRGB
+from chroma.colors.convert import (
+    HUE_SCALE,
+    PERCENT_SCALE,
+    format_hex,
+    hsl_to_rgb_fixed,
+    hsl_to_rgb_fixed_array,
+    pack_rgb,
+    parse_hex,
+    rgb_to_hsl_fixed,
+    rgb_to_hsl_fixed_array,
+    unpack_rgb,
+)
+
+
+def test_parse_hex():
+    packed = parse_hex(["#000000", "ABCDEF", "#1a1b26"])
+    assert packed.tolist() == [0x000000, 0xABCDEF, 0x1A1B26]
+
+    packed = parse_hex(b"#ffffff\n#000001\n")
+    assert packed.tolist() == [0xFFFFFF, 0x000001]
+
+    assert parse_hex([]).size == 0
+
+
+def test_parse_hex_reports_index():
+    for values in [
+        ["#000000", "#00000"],
+        ["#000000", "#0000000"],
+        ["#000000", "00000g"],
+        ["#000000", "##00000"],
+        ["#000000", "000000#"],
+    ]:
+        try:
+            parse_hex(values)
+        except TypeError as e:
+            assert "index 1" in str(e)
+        except:
+            assert False
+        else:
+            assert False
+
+
+def test_format_hex():
+    packed = np.array([0x000000, 0xABCDEF, 0x1A1B26])
+    assert format_hex(packed) == ["#000000", "#abcdef", "#1a1b26"]
+    assert format_hex(packed, prefix=False) == ["000000", "abcdef", "1a1b26"]
+    assert format_hex(np.array([])) == []
+
+
+def test_pack_unpack_rgb():
+    packed = np.random.default_rng(0).integers(0, 1 << 24, 1000)
+    assert np.array_equal(pack_rgb(unpack_rgb(packed)), packed)
+    assert np.array_equal(parse_hex(format_hex(packed)), packed)
+
+
+def test_fixed_kernels_match_colorsys():
+    rng = np.random.default_rng(0)
+    rgb = np.concatenate(
+        [rng.integers(0, 256, (2000, 3)), [[0, 0, 0], [255, 255, 255]]]
+    )
+    hsl = rgb_to_hsl_fixed_array(rgb)
+    for (r, g, b), fixed in zip(rgb.tolist(), hsl.tolist()):
+        assert rgb_to_hsl_fixed(r, g, b) == tuple(fixed)
+
+        # Every component is the exact value rounded to the nearest step
+        h, l, s = colorsys.rgb_to_hls(r / 255, g / 255, b / 255)
+        assert min(abs(fixed[0] - h * HUE_SCALE), HUE_SCALE - fixed[0]) <= 0.5 + 1e-6
+        assert abs(fixed[1] - s * PERCENT_SCALE) <= 0.5 + 1e-6
+        assert abs(fixed[2] - l * PERCENT_SCALE) <= 0.5 + 1e-6
+
+    hsl = np.stack(
+        [
+            rng.integers(0, HUE_SCALE, 2000),
+            rng.integers(0, PERCENT_SCALE + 1, 2000),
+            rng.integers(0, PERCENT_SCALE + 1, 2000),
+        ],
+        axis=1,
+    )
+    rgb = hsl_to_rgb_fixed_array(hsl)
+    for (h, s, l), fixed in zip(hsl.tolist(), rgb.tolist()):
+        assert hsl_to_rgb_fixed(h, s, l) == tuple(fixed)
+
+        expected = colorsys.hls_to_rgb(
+            h / HUE_SCALE, l / PERCENT_SCALE, s / PERCENT_SCALE
+        )
+        assert all(abs(a - b * 255) <= 0.5 + 1e-6 for a, b in zip(fixed, expected))
+
+
+def test_hex_hsl_round_trip_is_stable():
+    # Check every single 8-bit color, a few million at a time
+    chunk = 1 << 22
+    for start in range(0, 1 << 24, chunk):
+        rgb = unpack_rgb(np.arange(start, start + chunk, dtype=np.uint32))
+        hsl = ColorArray(rgb, ColorHex).cast(ColorHSL)
+        assert np.array_equal(hsl.cast(ColorHex).data, rgb)
+
+    # The scalar colors use the same kernels
+    for packed in np.random.default_rng(0).integers(0, 1 << 24, 2000).tolist():
+        color = ColorHex(f"{packed:06x}")
+        assert color.cast(ColorHSL).cast(ColorHex) == color
+
+
+def test_normalized_hsl_casts_to_float_rgb():
+    color = ColorHSL(0.6, 0.35, 0.42)
+    rgb = color.cast(ColorRGB)
+    assert rgb.is_normalized()
+    assert rgb.color == colorsys.hls_to_rgb(0.6, 0.42, 0.35)
+
+    colors = ColorArray([color.color], ColorHSL).cast(ColorRGB)
+    assert colors.is_normalized()
+    assert np.allclose(colors.data[0], rgb.color)
+
+    # Denormalized colors still take the integer kernel
+    assert ColorHSL(216, 35, 42).cast(ColorRGB).color == hsl_to_rgb_fixed(
+        216 * 256, 35 * 256, 42 * 256
+    )
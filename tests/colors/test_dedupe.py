@@ -0,0 +1,103 @@
+import numpy as np
+
+from chroma.colors import ColorArray
+from chroma.colors.dedupe import (
+    as_cielab,
+    ciede2000,
+    collapse_duplicates,
+    rgb_to_cielab,
+)
+
+
+def test_reference_pairs():
+    # Pairs from the CIEDE2000 test data by Sharma, Wu and Dalal
+    lab1 = np.array(
+        [
+            [50.0, 2.6772, -79.7751],
+            [50.0, 2.8361, -74.0200],
+            [50.0, 0.0, 0.0],
+            [50.0, 2.4900, -0.0010],
+            [50.0, 2.5000, 0.0],
+            [60.2574, -34.0099, 36.2677],
+            [22.7233, 20.0904, -46.6940],
+            [2.0776, 0.0795, -1.1350],
+        ]
+    )
+    lab2 = np.array(
+        [
+            [50.0, 0.0, -82.7485],
+            [50.0, 0.0, -82.7485],
+            [50.0, -1.0, 2.0],
+            [50.0, -2.4900, 0.0009],
+            [73.0, 25.0, -18.0],
+            [60.4626, -34.1751, 39.4387],
+            [23.0331, 14.9730, -42.5619],
+            [0.9033, -0.0636, -0.5514],
+        ]
+    )
+    expected = [2.0425, 3.4412, 2.3669, 7.1792, 27.1492, 1.2644, 2.0373, 0.9082]
+    assert np.allclose(ciede2000(lab1, lab2), expected, atol=1e-4)
+    assert np.allclose(ciede2000(lab2, lab1), expected, atol=1e-4)
+
+
+def test_cielab_reference_colors():
+    lab = rgb_to_cielab(np.array([[255, 255, 255], [0, 0, 0], [255, 0, 0]]))
+    assert np.allclose(lab[0], [100.0, 0.0, 0.0], atol=1e-4)
+    assert np.allclose(lab[1], [0.0, 0.0, 0.0], atol=1e-4)
+    assert np.allclose(lab[2], [53.2408, 80.0925, 67.2032], atol=1e-3)
+
+
+def brute_force_collapse(lab, counts, threshold):
+    distances = np.array([ciede2000(color, lab) for color in lab])
+    leaders = np.full(len(lab), -1)
+    for i in np.argsort(-counts, kind="stable"):
+        if leaders[i] == -1:
+            leaders[(distances[i] <= threshold) & (leaders == -1)] = i
+    return leaders
+
+
+def test_grid_matches_brute_force():
+    rng = np.random.default_rng(0)
+    # Clumps of near-identical shades, like a real histogram
+    centers = rng.integers(0, 256, (40, 3))
+    rgb = np.clip(centers.repeat(20, axis=0) + rng.integers(-6, 7, (800, 3)), 0, 255)
+    counts = rng.integers(1, 500, len(rgb))
+    lab = rgb_to_cielab(rgb)
+
+    for threshold in (1.0, 3.0, 8.0):
+        heads, sums, labels = collapse_duplicates(lab, counts, threshold)
+        leaders = brute_force_collapse(lab, counts, threshold)
+        assert np.array_equal(heads[labels], leaders)
+        assert sums.sum() == counts.sum()
+        assert (np.diff(sums) <= 0).all()
+
+
+def test_collapse_keeps_distinct_hues():
+    shades = [f"#{r:02x}0000" for r in range(200, 208)]
+    shades += [f"#0000{b:02x}" for b in range(200, 208)]
+    shades += ["#00c800"]
+    colors = ColorArray.from_hex(shades)
+    counts = [1] * 8 + [2] * 8 + [1]
+
+    heads, sums, labels = collapse_duplicates(colors, counts)
+    assert len(heads) == 3
+    assert sums.tolist() == [16, 8, 1]
+    assert heads.tolist() == [8, 0, 16]
+    assert np.array_equal(labels, [1] * 8 + [0] * 8 + [2])
+
+    # Every member is within the threshold of its representative
+    lab = as_cielab(colors)
+    assert (ciede2000(lab, lab[heads[labels]]) <= 3.0).all()
+
+
+def test_collapse_without_merging():
+    colors = ColorArray.from_hex(["#000000", "#000001", "#ffffff"])
+    heads, sums, labels = collapse_duplicates(colors, [1, 3, 2], threshold=0)
+    assert heads.tolist() == [1, 2, 0]
+    assert sums.tolist() == [3, 2, 1]
+    assert labels.tolist() == [2, 0, 1]
+
+    heads, sums, labels = collapse_duplicates(colors)
+    assert heads.tolist() == [0, 2]
+    assert sums.tolist() == [5, 1]
+    assert labels.tolist() == [0, 0, 1]
@@ -6,3 +6,9 @@ def test_create_hex_color():
     color = ColorHex("#000000")
     assert type(color) is ColorHex
     assert isinstance(color, Color)
+
+
+def test_check_hashing():
+    assert ColorHex("#abcdef") == ColorHex("ABCDEF")
+    assert ColorHex("#abcdef") != ColorHex("#abcdee")
+    assert len({ColorHex("#abcdef"), ColorHex("#ABCDEF")}) == 1
@@ -1,3 +1,5 @@
+import pytest
+
 from chroma.colors import ColorHSL
 from chroma.colors.base import Color
 from chroma.colors.utils import check_types
@@ -51,3 +53,35 @@ def test_check_saturate_desaturate():
     assert color.saturated(1.0).s == 1.0
     assert color.desaturated(0.25).s == 0.25
     assert color.desaturated(1.0).s == 0.0
+
+
+def test_check_immutability():
+    color = ColorHSL(0.5, 0.5, 0.5)
+    assert not hasattr(color, "__dict__")
+    assert color.set_h(0.25).h == 0.25
+    assert color.set_s(0.25).s == 0.25
+    assert color.set_l(50).l == 0.5
+    assert color.color == (0.5, 0.5, 0.5)
+
+    color = ColorHSL(180, 50, 50)
+    assert color.set_h(720).h == 360
+    assert color.set_l(0.25).l == 25
+
+
+def test_check_hashing():
+    assert ColorHSL(10, 20, 30) == ColorHSL(10, 20, 30)
+    assert ColorHSL(10, 20, 30) != ColorHSL(10, 20, 31)
+    assert len({ColorHSL(10, 20, 30), ColorHSL(10, 20, 30)}) == 1
+
+    # The same components on different scales are different colors
+    assert ColorHSL(1, 1, 1) != ColorHSL(1.0, 1.0, 1.0)
+    assert ColorHSL(0, 0, 1) != ColorHSL(0.0, 0.0, 1.0)
+    assert len({ColorHSL(1, 1, 1), ColorHSL(1.0, 1.0, 1.0)}) == 2
+
+
+def test_create_color_is_silent(capsys):
+    ColorHSL(10, 20, 30)
+    ColorHSL(0.1, 0.2, 0.3)
+    with pytest.raises(ValueError):
+        ColorHSL(400, 20, 30)
+    assert capsys.readouterr().out == ""
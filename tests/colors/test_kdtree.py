@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from chroma.colors.kdtree import KDTree
+
+
+def brute_force(points, queries):
+    distances = np.linalg.norm(queries[:, np.newaxis] - points[np.newaxis], axis=2)
+    return distances.argmin(axis=1), distances.min(axis=1)
+
+
+@pytest.mark.parametrize("size", [1, 7, 8, 9, 200, 1500])
+def test_matches_brute_force(size):
+    rng = np.random.default_rng(size)
+    points = rng.random((size, 3))
+    queries = rng.random((1024, 3)) * 1.2 - 0.1
+
+    indices, distances = KDTree(points).query(queries)
+    expected_indices, expected_distances = brute_force(points, queries)
+    assert np.allclose(distances, expected_distances)
+    assert np.allclose(
+        np.linalg.norm(points[indices] - queries, axis=1), expected_distances
+    )
+
+
+def test_exact_and_duplicate_points():
+    points = np.array([[0.0, 0.0], [1.0, 1.0], [1.0, 1.0], [2.0, 0.0]])
+    indices, distances = KDTree(points, leaf_size=1).query(points)
+    assert np.allclose(distances, 0)
+    assert indices[0] == 0 and indices[3] == 3
+    assert indices[1] in (1, 2)
+
+
+def test_invalid_trees():
+    with pytest.raises(ValueError):
+        KDTree(np.empty((0, 3)))
+    with pytest.raises(ValueError):
+        KDTree(np.zeros((4, 3)), leaf_size=0)
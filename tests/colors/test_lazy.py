@@ -0,0 +1,56 @@
+from chroma.colors import ColorArray, ColorHex, ColorHSL, ColorRGB, lazy
+
+HEX_COLORS = ["#000000", "#ffffff", "#ff0000", "#3b4261", "#ee9a68", "#1a1b26"]
+
+
+def test_lazy_compiles_stages():
+    mix = ColorHex("#884400")
+    expr = (
+        lazy(ColorHex("#3b4261")).darkened(0.1).saturated(0.1).blended(mix).blended(mix)
+    )
+    stages = expr.compile()
+    assert [space for space, _ in stages] == ["hsl", "rgb"]
+    assert [len(ops) for _, ops in stages] == [2, 2]
+
+    # An empty chain evaluates to the source itself
+    color = ColorHex("#3b4261")
+    assert lazy(color).evaluate() is color
+
+
+def test_lazy_matches_eager():
+    mix = ColorHex("#884400")
+    for value in HEX_COLORS:
+        # The eager chain rounds the color to 8 bits whenever it casts from
+        # HSL to RGB, while the lazy chain never does, so the results may
+        # differ by a couple of 8-bit steps.
+        color = ColorHex(value).cast(ColorRGB).normalized()
+        eager = color.darkened(0.4).blended(color, 0.2).lightened(0.4).saturated(0.1)
+        fused = (
+            lazy(color)
+            .darkened(0.4)
+            .blended(color, 0.2)
+            .lightened(0.4)
+            .saturated(0.1)
+            .evaluate()
+        )
+        assert type(fused) is ColorRGB
+        assert all(abs(a - b) < 2 / 255 for a, b in zip(fused.color, eager.normalized().color))
+
+        color = color.cast(ColorHSL)
+        eager = color.blended(mix, 0.3).desaturated(0.2)
+        fused = lazy(color).blended(mix, 0.3).desaturated(0.2).evaluate()
+        assert type(fused) is ColorHSL
+        assert all(abs(a - b) < 2 / 255 for a, b in zip(fused.color, eager.normalized().color))
+
+
+def test_lazy_array_matches_scalar():
+    mix = ColorHex("#884400")
+    colors = ColorArray.from_hex(HEX_COLORS)
+    expr = lazy(colors).darkened(0.2).blended(mix, 0.5).lightened(0.1)
+    result = expr.evaluate()
+    assert isinstance(result, ColorArray)
+    assert result.space is ColorHex
+
+    for i, value in enumerate(HEX_COLORS):
+        scalar = lazy(ColorHex(value)).darkened(0.2).blended(mix, 0.5).lightened(0.1)
+        assert result[i].color == scalar.evaluate().color
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from chroma.colors import ColorArray, ColorHex, ColorHSL
+from chroma.colors.convert import unpack_rgb
+from chroma.colors.lut import (
+    LUT_HEADER,
+    HSLLookupTable,
+    load_lut,
+    remove_stale_versions,
+)
+
+
+def test_lut_matches_conversion(global_setup_teardown):
+    tmpdir = global_setup_teardown
+    table = load_lut(tmpdir / "rgb_hsl.lut")
+
+    packed = np.random.default_rng(0).integers(0, 1 << 24, 10000)
+    packed = np.concatenate([packed, [0x000000, 0xFFFFFF, 0xFF0000, 0x808080]])
+    expected = ColorArray(unpack_rgb(packed), ColorHex).cast(ColorHSL).denormalized()
+    assert np.array_equal(table.lookup(packed), expected.data)
+
+
+def test_lut_rejects_other_versions(global_setup_teardown):
+    path = global_setup_teardown / "rgb_hsl.lut"
+    np.array([(b"CHROMLUT", 0, 0)], dtype=LUT_HEADER).tofile(path)
+
+    with pytest.raises(ValueError):
+        HSLLookupTable(path)
+
+
+def test_remove_stale_versions(tmp_path):
+    for name in [
+        "rgb_hsl.v1.lut",
+        "rgb_hsl.v2.lut",
+        "rgb_hsl.v3.lut",
+        "xterm256_rgb.v1.lut",
+        "rgb_hsl.v1.lut.123.tmp",
+    ]:
+        (tmp_path / name).touch()
+
+    remove_stale_versions(tmp_path / "rgb_hsl.v3.lut")
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "rgb_hsl.v1.lut.123.tmp",
+        "rgb_hsl.v3.lut",
+        "xterm256_rgb.v1.lut",
+    ]
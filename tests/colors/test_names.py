@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from chroma.colors import ColorArray, ColorHex, ColorRGB
+from chroma.colors.names import (
+    CSS_COLORS,
+    NAMED_COLORS,
+    describe,
+    load_index,
+    lookup,
+    nearest_name,
+    nearest_names,
+    normalize_name,
+)
+from chroma.colors.oklab import as_oklab, nearest
+from chroma.utils.theme import runtime
+
+
+def test_lookup():
+    assert str(lookup("rebeccapurple")) == "#663399"
+    assert str(lookup("Slate Gray")) == str(lookup("slate-gray")) == "#708090"
+    assert normalize_name(" Dark_Slate Blue ") == "darkslateblue"
+    with pytest.raises(KeyError):
+        lookup("not a color")
+
+
+def test_exact_names():
+    # Every named color is its own nearest name, unless an earlier name shares
+    # its value
+    names = list(NAMED_COLORS)
+    found, distances = nearest_names(ColorArray.from_hex(list(NAMED_COLORS.values())))
+    assert np.allclose(distances, 0, atol=1e-6)
+    for name, match in zip(names, found):
+        assert NAMED_COLORS[match] == NAMED_COLORS[name]
+        assert names.index(match) <= names.index(name)
+
+    assert nearest_name(ColorHex("#808080")) == "gray"
+    assert nearest_name(ColorHex("#ff0001")) == "red"
+    assert describe(ColorHex("#3b4261")) == "#3b4261 ≈ charcoal"
+    assert len(CSS_COLORS) == 148
+
+
+def test_batched_names_match_brute_force():
+    rng = np.random.default_rng(0)
+    histogram = ColorArray(rng.integers(0, 256, (1024, 3)), ColorRGB)
+    names, distances = nearest_names(histogram)
+
+    index = load_index()
+    candidates = as_oklab(ColorArray.from_hex([NAMED_COLORS[n] for n in index.names]))
+    expected, expected_distances = nearest(histogram, candidates)
+    assert np.allclose(distances, expected_distances)
+    assert len(names) == 1024
+
+
+def test_lua_builtins():
+    lua = runtime()
+    lib = 'local lib = require "chroma.builtins.lib"\n'
+    assert lua.execute(lib + 'return lib.named("Slate Gray")') == "#708090"
+    assert lua.execute(lib + 'return lib.name_of("#ff0001")') == "red"
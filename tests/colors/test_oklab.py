@@ -0,0 +1,78 @@
+import numpy as np
+
+from chroma.colors import ColorArray, ColorHex, ColorRGB
+from chroma.colors.oklab import (
+    as_oklab,
+    delta_e,
+    delta_e_matrix,
+    nearest,
+    oklab_to_oklch,
+    oklab_to_rgb,
+    oklch_to_oklab,
+    rgb_to_oklab,
+)
+
+
+def test_reference_colors():
+    lab = rgb_to_oklab(np.array([[255, 255, 255], [0, 0, 0], [255, 0, 0]]))
+    assert np.allclose(lab[0], [1.0, 0.0, 0.0], atol=1e-6)
+    assert np.allclose(lab[1], [0.0, 0.0, 0.0], atol=1e-6)
+    assert np.allclose(lab[2], [0.627955, 0.224863, 0.125846], atol=1e-5)
+
+    # 8-bit and normalized colors take different paths to the same result
+    rgb = np.random.default_rng(0).integers(0, 256, (1000, 3))
+    assert np.allclose(rgb_to_oklab(rgb), rgb_to_oklab(rgb / 255.0))
+
+
+def test_round_trips():
+    rgb = np.random.default_rng(0).random((1000, 3))
+    lab = rgb_to_oklab(rgb)
+    assert np.allclose(oklab_to_rgb(lab), rgb)
+    assert np.allclose(oklch_to_oklab(oklab_to_oklch(lab)), lab)
+
+    lch = oklab_to_oklch(lab)
+    assert (lch[:, 2] >= 0).all() and (lch[:, 2] < 360).all()
+
+
+def test_as_oklab():
+    colors = [ColorHex("#1a1b26"), ColorHex("#ee9a68")]
+    expected = rgb_to_oklab(np.array([[0x1A, 0x1B, 0x26], [0xEE, 0x9A, 0x68]]))
+    assert np.allclose(as_oklab(colors), expected)
+    assert np.allclose(as_oklab(ColorArray.from_colors(colors, ColorHex)), expected)
+    assert np.allclose(as_oklab(colors[0]), expected[:1])
+    assert np.allclose(as_oklab(colors[0].cast(ColorRGB).normalized()), expected[:1])
+    # Arrays are assumed to already hold OKLab colors
+    assert np.shares_memory(as_oklab(expected), expected)
+
+
+def test_delta_e():
+    a = ColorArray.from_hex(["#000000", "#ffffff", "#ff0000"])
+    b = ColorArray.from_hex(["#000000", "#000000", "#ff0000"])
+    assert np.allclose(delta_e(a, b), [0.0, 1.0, 0.0], atol=1e-6)
+    # A single color is compared with every color
+    assert np.allclose(delta_e(a, ColorHex("#000000")), delta_e_matrix(a, b)[:, 0])
+
+    matrix = delta_e_matrix(a, b)
+    assert matrix.shape == (3, 3)
+    for i in range(3):
+        for j in range(3):
+            assert np.isclose(matrix[i, j], delta_e(a[i], b[j])[0])
+
+
+def test_nearest_matches_brute_force(monkeypatch):
+    rng = np.random.default_rng(0)
+    queries = rng.integers(0, 256, (500, 3))
+    candidates = rng.integers(0, 256, (300, 3))
+    lab1, lab2 = rgb_to_oklab(queries), rgb_to_oklab(candidates)
+    matrix = delta_e_matrix(lab1, lab2)
+
+    # Use tiny chunks to exercise the chunking
+    monkeypatch.setattr("chroma.colors.oklab.NEAREST_CHUNK_SIZE", 1000)
+    indices, distances = nearest(lab1, lab2)
+    assert np.array_equal(indices, matrix.argmin(axis=1))
+    assert np.allclose(distances, matrix.min(axis=1))
+
+    indices, distances = nearest(lab1, lab2, k=5)
+    assert indices.shape == (500, 5)
+    assert np.allclose(distances, np.sort(matrix, axis=1)[:, :5])
+    assert (np.diff(distances, axis=1) >= 0).all()
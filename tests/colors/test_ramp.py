@@ -0,0 +1,41 @@
+import numpy as np
+
+from chroma.colors import ColorArray, ColorHex
+from chroma.colors.oklab import rgb_to_oklab
+from chroma.colors.ramp import ramp_offsets, shade_ramps
+
+BASE = ["#3584e4", "#33d17a", "#e01b24", "#ffffff", "#000000"]
+
+
+def test_ramp_offsets():
+    assert np.allclose(ramp_offsets(5, 2, 0.5), [0.5, 0.25, 0.0, -0.25, -0.5])
+    assert np.allclose(ramp_offsets(3, 0, 0.5), [0.0, -0.25, -0.5])
+    assert np.allclose(ramp_offsets(1, 0, 0.5), [0.0])
+
+
+def test_shade_ramps():
+    shades = shade_ramps(ColorArray.from_hex(BASE), steps=5)
+    assert len(shades) == 5
+    assert all(len(shade) == len(BASE) for shade in shades)
+    assert all(shade.space is ColorHex for shade in shades)
+
+    # The base colors are kept as they are
+    assert shades[2].color == BASE
+
+    # Every ramp goes from light to dark
+    lightness = np.stack([rgb_to_oklab(shade.data)[:, 0] for shade in shades])
+    assert (np.diff(lightness[:, :3], axis=0) < 0).all()
+
+    # The hue stays about the same, away from the ends
+    lab = rgb_to_oklab(shades[1].data[:3]), rgb_to_oklab(shades[3].data[:3])
+    base = rgb_to_oklab(shades[2].data[:3])
+    for ramp in lab:
+        hue = np.arctan2(ramp[:, 2], ramp[:, 1])
+        assert np.allclose(hue, np.arctan2(base[:, 2], base[:, 1]), atol=0.1)
+
+
+def test_shade_ramps_base_step():
+    shades = shade_ramps([ColorHex("#3584e4")], steps=5, base_step=0)
+    assert shades[0].color == ["#3584e4"]
+    lightness = [rgb_to_oklab(shade.data)[0, 0] for shade in shades]
+    assert all(a > b for a, b in zip(lightness, lightness[1:]))
@@ -37,3 +37,25 @@ def test_check_normalization_denormalization():
     assert color.r >= 0 and color.r <= 255
     assert color.g >= 0 and color.g <= 255
     assert color.b >= 0 and color.b <= 255
+
+
+def test_check_packed_storage():
+    color = ColorRGB(0x12, 0x34, 0x56)
+    assert not hasattr(color, "__dict__")
+    assert color.packed == 0x123456
+    assert ColorRGB.from_packed(0x123456) == color
+    assert color.normalized().packed == 0x123456
+
+
+def test_check_immutability():
+    color = ColorRGB(0, 0, 0)
+    assert color.set_r(255).color == (255, 0, 0)
+    assert color.set_g(1.0).color == (0, 255, 0)
+    assert color.normalized().set_b(255).color == (0.0, 0.0, 1.0)
+    assert color.color == (0, 0, 0)
+
+
+def test_check_hashing():
+    assert ColorRGB(1, 2, 3) == ColorRGB(1, 2, 3)
+    assert ColorRGB(1, 2, 3) != ColorRGB(3, 2, 1)
+    assert len({ColorRGB(1, 2, 3), ColorRGB(1, 2, 3), ColorRGB(3, 2, 1)}) == 2
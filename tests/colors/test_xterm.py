@@ -0,0 +1,65 @@
+import numpy as np
+
+from chroma.colors import ColorArray, ColorHex
+from chroma.colors.xterm import (
+    PALETTE_INDICES,
+    XTERM_COLORS,
+    build_table,
+    load_table,
+    nearest_index,
+    quantize,
+    to_xterm,
+)
+
+
+def brute_force(rgb, size):
+    indices = PALETTE_INDICES[size]
+    candidates = XTERM_COLORS[indices].astype(np.int64)
+    distances = ((rgb[:, np.newaxis, :] - candidates) ** 2).sum(axis=2)
+    return distances, indices
+
+
+def test_xterm_palette():
+    assert XTERM_COLORS.shape == (256, 3)
+    assert XTERM_COLORS[16].tolist() == [0, 0, 0]
+    assert XTERM_COLORS[196].tolist() == [255, 0, 0]
+    assert XTERM_COLORS[231].tolist() == [255, 255, 255]
+    assert XTERM_COLORS[232].tolist() == [8, 8, 8]
+    assert XTERM_COLORS[255].tolist() == [238, 238, 238]
+
+
+def test_nearest_index_matches_brute_force():
+    rgb = np.random.default_rng(0).integers(0, 256, (5000, 3))
+    for size in (256, 16):
+        indices = nearest_index(rgb, size)
+        distances, candidates = brute_force(rgb, size)
+        # Ties may pick either color, but never a farther one
+        chosen = distances[np.arange(len(rgb)), np.searchsorted(candidates, indices)]
+        assert np.array_equal(chosen, distances.min(axis=1))
+
+    # Perceptual distances pick different colors for some
+    oklab = nearest_index(rgb, 256, "oklab")
+    assert (oklab >= 16).all()
+    assert (oklab != nearest_index(rgb, 256)).any()
+
+
+def test_table_lookup(global_setup_teardown):
+    tmpdir = global_setup_teardown
+    path = build_table(tmpdir / "xterm16.lut", 16, "rgb")
+    table = load_table(16, "rgb", path)
+
+    packed = np.random.default_rng(0).integers(0, 1 << 24, 10000)
+    rgb = np.stack([(packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF], 1)
+    assert np.array_equal(table.lookup(packed), nearest_index(rgb, 16))
+
+    # A table for another palette size is rejected and rebuilt
+    table = load_table(256, "rgb", path)
+    assert table.size == 256
+    assert (table.lookup(packed) >= 16).all()
+
+
+def test_quantize():
+    colors = ColorArray.from_hex(["#ff0000", "#000000", "#eeeeee", "#1a1b26"])
+    assert quantize(colors).tolist()[:3] == [196, 16, 255]
+    assert to_xterm(ColorHex("#ff0000")) == 196
+    assert to_xterm(ColorHex("#ff0000"), 16) == 9
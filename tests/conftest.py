@@ -1,8 +1,12 @@
 import shutil
+import sys
 from pathlib import Path
 
 import pytest
 
+import chroma.main  # noqa: F401, imports every module using the cache directory
+from chroma.utils import paths
+
 from tests.utils import generate_name
 
 CHROMA_TEST_DIR = Path("/tmp/chroma-test")
@@ -17,6 +21,7 @@ def pytest_unconfigure():
     print("Global teardown")
     shutil.rmtree(CHROMA_TEST_DIR)
 
+
 @pytest.fixture
 def fixtures() -> Path:
     return Path(__file__).parent / "fixtures"
@@ -33,3 +38,23 @@ def global_setup_teardown():
 
     # Teardown
     shutil.rmtree(tmpdir)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch) -> Path:
+    """Redirects the cache directory into the temporary directory of the test,
+    so the lookup tables, compiled maps and palettes the tests build never end
+    up in the real cache of the user."""
+
+    path = tmp_path / "cache"
+
+    def cache_dir() -> Path:
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    # Modules import the function by name, so every reference is replaced
+    original = paths.cache_dir
+    for name, module in list(sys.modules.items()):
+        if name.startswith("chroma") and getattr(module, "cache_dir", None) is original:
+            monkeypatch.setattr(module, "cache_dir", cache_dir)
+    return path
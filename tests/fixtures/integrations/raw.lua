@@ -4,7 +4,7 @@ theme.raw = {{
       black = "#abcdef",
       white = "#abcdef",
     }},
-    format = "{{name}} = {{hex}}",
+    format = "{{name}} = {{hex}} {{xterm256}}",
     header = "// {{header}}",
     out = "{outpath}/out.raw",
   }},
@@ -0,0 +1,92 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from chroma.colors.convert import parse_hex
+from chroma.utils.assignment import (
+    assign_globally,
+    field_distance,
+    linear_sum_assignment,
+)
+from chroma.utils.hslmap import compile_hslmap
+from chroma.utils.palette import GENERATORS, build_palette
+
+
+def brute_force_cost(cost):
+    rows, cols = cost.shape
+    if rows > cols:
+        return brute_force_cost(cost.T)
+    return min(
+        cost[np.arange(rows), list(columns)].sum()
+        for columns in itertools.permutations(range(cols), rows)
+    )
+
+
+def test_solver_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        shape = tuple(int(size) for size in rng.integers(1, 6, 2))
+        cost = rng.integers(0, 20, shape).astype(float)
+
+        rows, cols = linear_sum_assignment(cost)
+        assert len(rows) == min(shape)
+        assert len(set(rows.tolist())) == len(set(cols.tolist())) == len(rows)
+        assert (np.diff(rows) > 0).all()
+        assert cost[rows, cols].sum() == brute_force_cost(cost)
+
+
+def test_solver_rejects_infinite_costs():
+    with pytest.raises(ValueError):
+        linear_sum_assignment([[0.0, np.inf], [1.0, 2.0]])
+
+
+def test_hue_distance_wraps_around():
+    hues = np.array([0, 20, 40, 180, 320, 359])
+    red = [(0, 35), (325, 360)]
+    assert field_distance(hues, red, circular=True).tolist() == [0, 0, 5, 145, 5, 0]
+    wrapped = field_distance(hues, (350, 360), circular=True)
+    assert wrapped.tolist() == [0, 20, 40, 170, 30, 0]
+    assert field_distance([5, 95], (40, 90)).tolist() == [35, 5]
+    assert field_distance([5, 95], None).tolist() == [0, 0]
+
+
+# A permissive slot first, which the most prominent color also satisfies
+HSL_MAP = {
+    "accent": (None, (60, 100), (50, 90)),
+    "red": ([(0, 35), (325, 360)], (40, 90), (30, 90)),
+}
+
+
+def test_global_assignment_beats_first_match():
+    # A saturated red, a less common saturated blue and a grey
+    hsl = np.array([[0, 80, 50], [220, 70, 60], [0, 0, 50]])
+    counts = [500, 100, 1000]
+
+    assert compile_hslmap(HSL_MAP).assign(hsl) == {"accent": 0}
+    assert assign_globally(hsl, counts, HSL_MAP) == {"red": 0, "accent": 1}
+
+    # A color fills one slot at most, and near misses only fill a slot within
+    # the tolerance
+    near = np.array([[40, 80, 50]])
+    assert assign_globally(near, [1], HSL_MAP) == {"accent": 0}
+    assert assign_globally(near, [1], {"red": HSL_MAP["red"]}) == {"red": 0}
+    assert assign_globally(near, [1], {"red": HSL_MAP["red"]}, tolerance=0) == {}
+
+
+def test_build_palette_global_assignment():
+    packed = parse_hex(["#e62e2e", "#4d88e6", "#808080", "#1a1a1a"])
+    counts = np.array([500, 100, 1000, 50])
+
+    first = build_palette(packed, counts, hsl_map=HSL_MAP, contrast_pairs=[])
+    assert str(first["accent"]) == "#e62e2e"
+
+    palette = build_palette(
+        packed, counts, hsl_map=HSL_MAP, contrast_pairs=[], assignment="global"
+    )
+    assert str(palette["red"]) == "#e62e2e"
+    assert str(palette["accent"]) == "#4d88e6"
+    assert set(GENERATORS) <= set(palette)
+
+    with pytest.raises(ValueError):
+        build_palette(packed, counts, assignment="closest")
@@ -0,0 +1,68 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from chroma import generator
+from chroma.generator import find_images, output_paths
+
+pytest.importorskip("PIL")
+
+
+@pytest.fixture
+def wallpapers(fixtures, tmp_path) -> Path:
+    source = tmp_path / "wallpapers"
+    source.mkdir()
+    for image in (fixtures / "images").glob("*.jpg"):
+        shutil.copy(image, source)
+    (source / "broken.jpg").write_bytes(b"not an image")
+    (source / "notes.txt").write_text("not an image either")
+    return source
+
+
+def test_find_images(wallpapers):
+    images = find_images(wallpapers)
+    assert [image.name for image in images] == sorted(
+        path.name for path in wallpapers.glob("*.jpg")
+    )
+    assert find_images(wallpapers / "image_*.jpg") == [
+        image for image in images if image.name != "broken.jpg"
+    ]
+    assert find_images(images[0]) == [images[0]]
+
+
+def test_output_paths_are_unique(tmp_path):
+    images = [Path("a/wall.jpg"), Path("b/wall.png"), Path("b/other.png")]
+    assert output_paths(images, tmp_path) == [
+        tmp_path / "wall.lua",
+        tmp_path / "wall-1.lua",
+        tmp_path / "other.lua",
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_many_reports_failures(wallpapers, tmp_path, workers):
+    output_dir = tmp_path / "palettes"
+    results = list(
+        generator.generate_many(
+            name="pillow",
+            source=wallpapers,
+            output_dir=output_dir,
+            workers=workers,
+            image_size=64,
+        )
+    )
+
+    assert len(results) == len(list(wallpapers.glob("*.jpg")))
+    failed = [result for result in results if not result.ok]
+    assert [result.image_path.name for result in failed] == ["broken.jpg"]
+    assert not failed[0].output_path.exists()
+    for result in results:
+        if result.ok:
+            assert result.output_path.parent == output_dir
+            assert "return" in result.output_path.read_text()
+
+
+def test_generate_many_rejects_unknown_backend(wallpapers, tmp_path):
+    with pytest.raises(ValueError):
+        generator.generate_many(name="nope", source=wallpapers, output_dir=tmp_path)
@@ -0,0 +1,162 @@
+import os
+
+import numpy as np
+import pytest
+
+from chroma.colors import ColorArray, ColorHex, ColorHSL
+from chroma.utils.generator import (
+    check_value,
+    clamp_color_to_hslrules,
+    match_color_from_hslmap,
+)
+from chroma.utils.hslmap import CUBE_HEADER, compile_hslmap, read_cube
+from chroma.utils.palette import HSL_MAP
+
+
+def reference_check(value, field):
+    if field is None:
+        return True
+    ranges = [field] if type(field) is tuple else field
+    return any(lower <= value <= upper for lower, upper in ranges)
+
+
+def reference_match(color, hsl_map, ignore=()):
+    h, s, l = color.denormalize().color
+    for name, (hue, saturation, luminance) in hsl_map.items():
+        if (
+            name not in ignore
+            and reference_check(h, hue)
+            and reference_check(s, saturation)
+            and reference_check(l, luminance)
+        ):
+            return name
+
+
+def random_histogram(n=2000, seed=0):
+    rgb = np.random.default_rng(seed).integers(0, 256, (n, 3))
+    return ColorArray(rgb, ColorHex).cast(ColorHSL).denormalized()
+
+
+def test_first_match_agrees_with_reference():
+    histogram = random_histogram()
+    classifier = compile_hslmap(HSL_MAP)
+
+    for ignore in ([], ["accent", "black"], list(HSL_MAP.keys())):
+        expected = [reference_match(color, HSL_MAP, ignore) for color in histogram]
+        assert classifier.first_match(histogram, ignore) == expected
+
+        scalar = [match_color_from_hslmap(c, HSL_MAP, ignore) for c in histogram]
+        assert scalar == expected
+
+
+def test_assign_agrees_with_reference():
+    histogram = random_histogram(500, seed=1)
+
+    expected = {}
+    for i, color in enumerate(histogram):
+        name = reference_match(color, HSL_MAP, list(expected.keys()))
+        if name is not None:
+            expected[name] = i
+
+    found = compile_hslmap(HSL_MAP).assign(histogram)
+    assert found == expected
+    assert list(found.keys()) == list(expected.keys())
+
+
+def test_hue_ranges_wrap_around():
+    assert check_value(5, [(0, 35), (325, 360)])
+    assert check_value(340, [(0, 35), (325, 360)])
+    assert not check_value(180, [(0, 35), (325, 360)])
+
+    hsl = np.array([[5, 60, 50], [340, 60, 50], [180, 60, 50], [340, 10, 50]])
+    classifier = compile_hslmap({"red": HSL_MAP["red"]})
+    assert classifier.matches(hsl)[:, 0].tolist() == [True, True, False, False]
+
+
+def test_assign_honors_ignore():
+    hsl = np.array([[0, 0, 10], [0, 0, 12], [0, 0, 85]])
+    hsl_map = {
+        "black": (None, None, (5, 20)),
+        "white": (None, None, (80, 95)),
+        "any": (None, None, None),
+    }
+    classifier = compile_hslmap(hsl_map)
+
+    assert classifier.assign(hsl) == {"black": 0, "any": 1, "white": 2}
+    assert classifier.assign(hsl, ignore=["black"]) == {"any": 0, "white": 2}
+    assert classifier.assign(hsl, ignore=hsl_map.keys()) == {}
+    assert classifier.first_match(hsl) == ["black", "black", "white"]
+
+
+def test_fields_are_tabulated():
+    fields = [None, (40, 90), [(0, 35), (325, 360)], [(10, 20), (60, 70)]]
+    for field in fields:
+        for value in range(361):
+            assert check_value(value, field) == reference_check(value, field)
+
+    # Values outside the field move to the nearest bound, and the earlier bound
+    # wins a tie
+    red = HSL_MAP["red"]
+    assert clamp_color_to_hslrules(ColorHSL(180, 10, 95), red).color == (35, 40, 90)
+    assert clamp_color_to_hslrules(ColorHSL(300, 50, 50), red).color == (325, 50, 50)
+    assert clamp_color_to_hslrules(ColorHSL(340, 50, 50), red).color == (340, 50, 50)
+
+
+def test_cube_is_stored(global_setup_teardown):
+    path = global_setup_teardown / "custom.cube"
+    hsl_map = {"dark": (None, None, (0, 30)), "grey": (None, (0, 10), None)}
+
+    classifier = compile_hslmap(hsl_map, path)
+    assert path.exists()
+    assert classifier.match(200, 5, 20) == "dark"
+    assert classifier.match(200, 5, 20, ignore=["dark"]) == "grey"
+    assert classifier.match(200, 50, 50) is None
+
+    reloaded = compile_hslmap(hsl_map, path)
+    assert np.array_equal(reloaded.cube, classifier.cube)
+
+    # A cube written for another map is rebuilt instead of being read
+    with pytest.raises(ValueError):
+        read_cube(path, len(hsl_map) + 1)
+    np.array([(b"CHROMHSL", 0, 2)], dtype=CUBE_HEADER).tofile(path)
+    assert compile_hslmap(hsl_map, path).match(200, 5, 20) == "dark"
+
+
+def test_cubes_are_evicted(isolated_cache_dir):
+    from chroma.utils import hslmap
+
+    maps = [{f"rule{i}": (None, None, (0, i + 1))} for i in range(hslmap.MAX_CUBES + 2)]
+    for hsl_map in maps:
+        hslmap.compile_hslmap(hsl_map)
+
+    directory = isolated_cache_dir / "hslmaps"
+    assert len(list(directory.glob("*.cube"))) == hslmap.MAX_CUBES
+
+    # The cubes of the last maps are the most recently used ones
+    for i, hsl_map in enumerate(maps[-hslmap.MAX_CUBES :]):
+        os.utime(hslmap.cube_path(hsl_map), ns=(i * 10**9, i * 10**9))
+    (directory / "stale.v0.cube").touch()
+    hslmap.evict_cubes(directory, keep=2)
+
+    kept = sorted(path.name for path in directory.iterdir())
+    assert kept == sorted(hslmap.cube_path(hsl_map).name for hsl_map in maps[-2:])
+
+
+def test_compiled_maps_are_remembered(isolated_cache_dir, monkeypatch):
+    from chroma.utils import hslmap
+
+    hsl_map = {"dark": (None, None, (0, 30)), "light": (None, None, (70, 100))}
+    assert match_color_from_hslmap(ColorHSL(0, 0, 20), hsl_map) == "dark"
+
+    # Later matches find the map by identity, without hashing its rules
+    def fail(hsl_map):
+        raise AssertionError("The map was hashed again")
+
+    monkeypatch.setattr(hslmap, "hslmap_digest", fail)
+    for l in range(101):
+        match_color_from_hslmap(ColorHSL(0, 0, l), hsl_map)
+    monkeypatch.undo()
+
+    # Editing the map compiles it again
+    hsl_map["dark"] = (None, None, (0, 10))
+    assert match_color_from_hslmap(ColorHSL(0, 0, 20), hsl_map) is None
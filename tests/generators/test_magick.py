@@ -41,3 +41,153 @@ def test_magick_output_dict(fixtures):
     )
     assert type(retval) is dict, f"Unexpected return value, expected dict, got {retval}"
     assert len(retval) == 29, f"Number of output colors must be 29, got {len(retval)}"
+
+
+def test_magick_contrast(fixtures):
+    from chroma.colors.contrast import contrast_ratio, luminances
+    from chroma.generators.magick import CONTRAST_PAIRS
+
+    retval = generator.generate(
+        name="magick",
+        image_path=fixtures / "images/image_small.jpg",
+    )
+    for name, against, ratio in CONTRAST_PAIRS:
+        lum = luminances([retval[name], retval[against]])
+        assert contrast_ratio(lum[0], lum[1]) >= ratio, f"{name} on {against}"
+
+
+def test_magick_raw_pixels(fixtures):
+    retval = generator.generate(
+        name="magick",
+        image_path=fixtures / "images/image_small.jpg",
+        raw=True,
+    )
+    assert type(retval) is dict, f"Unexpected return value, expected dict, got {retval}"
+    assert len(retval) == 29, f"Number of output colors must be 29, got {len(retval)}"
+
+
+def test_read_histogram():
+    from chroma.generators.magick import read_histogram
+
+    lines = [
+        b"         9: (255,  0,  0) #FF0000 srgb(255,0,0)\n",
+        b"      1000: (  0,255,  0) #00FF00 srgb(0,255,0)\n",
+        b"        42: (  0,  0,255) #0000FF srgb(0,0,255)\n",
+        b"        42: ( 16, 16, 16) #101010 srgb(16,16,16)\n",
+        b"\n",
+        b"       100: (255,255,255) #FFFFFF srgb(255,255,255)\n",
+    ]
+
+    # Counts are compared as numbers, so 1000 outranks 9
+    packed, counts = read_histogram(iter(lines), max_colors=3)
+    assert counts.tolist() == [1000, 100, 42]
+    assert packed.tolist() == [0x00FF00, 0xFFFFFF, 0x0000FF]
+
+    packed, counts = read_histogram(iter(lines), max_colors=10)
+    assert counts.tolist() == [1000, 100, 42, 42, 9]
+    assert packed.tolist() == [0x00FF00, 0xFFFFFF, 0x0000FF, 0x101010, 0xFF0000]
+
+
+def test_read_histograms():
+    from chroma.generators.magick import read_histograms
+
+    lines = [
+        b"\n",
+        b"chroma-image\n",
+        b"         9: (255,  0,  0) #FF0000 srgb(255,0,0)\n",
+        b"        42: (  0,  0,255) #0000FF srgb(0,0,255)\n",
+        b"\n",
+        b"chroma-image\n",
+        b"\n",
+        b"chroma-image\n",
+        b"       100: (255,255,255) #FFFFFF srgb(255,255,255)\n",
+    ]
+
+    # The histograms are numbered by the order of their delimiters
+    histograms = read_histograms(iter(lines), max_colors=10)
+    assert len(histograms) == 3
+    assert histograms[0][0].tolist() == [0x0000FF, 0xFF0000]
+    assert histograms[1][0].tolist() == []
+    assert histograms[2][1].tolist() == [100]
+
+
+def test_magick_batch_matches_single(fixtures, monkeypatch):
+    from chroma.generators import magick
+
+    images = [
+        fixtures / "images/image_large.jpg",
+        fixtures / "images/image_small.jpg",
+        fixtures / "images/image_large.jpg",
+    ]
+    for raw in (False, True):
+        single = [magick.generate(image, image_size=64, raw=raw) for image in images]
+
+        # Every image is read out of the one batched invocation
+        def fail(*args, **kwargs):
+            raise AssertionError("An image was generated on its own")
+
+        with monkeypatch.context() as m:
+            m.setattr(magick, "generate", fail)
+            batch = magick.generate_batch(images, image_size=64, raw=raw)
+
+        for a, b in zip(batch, single):
+            assert {k: str(v) for k, v in a.items()} == {
+                k: str(v) for k, v in b.items()
+            }
+
+
+def test_magick_batch_needs_a_histogram_per_image(fixtures, monkeypatch):
+    from chroma.generators import magick
+
+    messages = []
+    monkeypatch.setattr(magick.logger, "error", messages.append)
+
+    # Histograms are matched with images by their order, so a batch which
+    # lost one can't be split, and every image is generated on its own
+    read_histograms = magick.read_histograms
+    monkeypatch.setattr(
+        magick, "read_histograms", lambda *args: read_histograms(*args)[1:]
+    )
+    images = [fixtures / "images/image_small.jpg", fixtures / "images/image_large.jpg"]
+    batch = magick.generate_batch(images, image_size=64)
+
+    for palette, image in zip(batch, images):
+        single = magick.generate(image, image_size=64)
+        assert {k: str(v) for k, v in palette.items()} == {
+            k: str(v) for k, v in single.items()
+        }
+    assert any("1 histograms for a batch of 2 images" in m for m in messages)
+
+
+def test_magick_batch_reports_broken_images(fixtures, tmp_path, monkeypatch):
+    from chroma.generators import magick
+
+    messages = []
+    for level in ("debug", "info", "warn", "error"):
+        monkeypatch.setattr(magick.logger, level, messages.append)
+
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+    images = [fixtures / "images/image_small.jpg", broken]
+
+    palette, error = magick.generate_batch(images, image_size=64)
+    assert type(palette) is dict and len(palette) == 29
+    assert isinstance(error, Exception)
+
+    # The errors of magick and the images it failed on are logged
+    assert any(isinstance(message, bytes) and message for message in messages)
+    assert any(isinstance(m, str) and str(broken) in m for m in messages)
+
+
+def test_generate_many_with_magick(fixtures, tmp_path):
+    images = [fixtures / "images/image_small.jpg", fixtures / "images/image_large.jpg"]
+    results = list(
+        generator.generate_many(
+            name="magick", source=images, output_dir=tmp_path, image_size=64
+        )
+    )
+    assert all(result.ok for result in results)
+    assert sorted(path.name for path in tmp_path.glob("*.lua")) == [
+        "image_large.lua",
+        "image_small.lua",
+    ]
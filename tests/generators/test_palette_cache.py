@@ -0,0 +1,101 @@
+import functools
+import os
+import shutil
+
+import pytest
+
+from chroma import generator
+from chroma.colors import ColorHex
+from chroma.utils import palette_cache
+from chroma.utils.palette_cache import PaletteCache, palette_key
+
+PALETTE = {"background": ColorHex("#101010"), "accent": ColorHex("#e16920")}
+
+
+def test_cache_round_trip(tmp_path):
+    cache = PaletteCache(tmp_path)
+    assert cache.get("missing") is None
+
+    cache.put("key", PALETTE)
+    palette = cache.get("key")
+    assert {name: str(color) for name, color in palette.items()} == {
+        name: str(color) for name, color in PALETTE.items()
+    }
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = PaletteCache(tmp_path)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, PALETTE)
+        os.utime(tmp_path / f"{key}.json", ns=(i * 10**9, i * 10**9))
+
+    # Reading `a` makes `b` the least recently used entry
+    assert cache.get("a") is not None
+    size = (tmp_path / "a.json").stat().st_size
+    PaletteCache(tmp_path, max_bytes=2 * size).evict()
+
+    assert sorted(path.stem for path in tmp_path.glob("*.json")) == ["a", "c"]
+
+
+def test_cache_removes_unreadable_entries(tmp_path):
+    cache = PaletteCache(tmp_path)
+    (tmp_path / "key.json").write_text("{not json")
+    assert cache.get("key") is None
+    assert not (tmp_path / "key.json").exists()
+
+
+def test_key_depends_on_contents_and_options(fixtures, tmp_path):
+    image = fixtures / "images/image_small.jpg"
+    key = palette_key(image, "pillow", {"image_size": 64})
+
+    renamed = tmp_path / "renamed.jpg"
+    shutil.copy(image, renamed)
+    assert palette_key(renamed, "pillow", {"image_size": 64}) == key
+
+    assert palette_key(image, "magick", {"image_size": 64}) != key
+    assert palette_key(image, "pillow", {"image_size": 128}) != key
+    assert palette_key(image, "pillow", {"image_size": 64, "f": len}) != key
+
+    renamed.write_bytes(renamed.read_bytes() + b"\0")
+    assert palette_key(renamed, "pillow", {"image_size": 64}) != key
+
+
+def test_generate_reuses_cached_palette(fixtures, isolated_cache_dir, monkeypatch):
+    pytest.importorskip("PIL")
+    image = fixtures / "images/image_small.jpg"
+
+    palette = generator.generate(name="pillow", image_path=image, use_cache=True)
+    assert len(list((isolated_cache_dir / "palette-cache").glob("*.json"))) == 1
+
+    @functools.wraps(generator.GENERATORS_REGISTRY["pillow"])
+    def fail(*args, **kwargs):
+        raise AssertionError("The backend ran on a cache hit")
+
+    monkeypatch.setitem(generator.GENERATORS_REGISTRY, "pillow", fail)
+    cached = generator.generate(name="pillow", image_path=image, use_cache=True)
+    assert {name: str(color) for name, color in cached.items()} == {
+        name: str(color.cast(ColorHex)) for name, color in palette.items()
+    }
+
+
+def test_key_depends_on_pipeline_source(fixtures, tmp_path, monkeypatch):
+    from chroma.utils.paths import chroma_dir
+
+    root = tmp_path / "chroma"
+    for source in palette_cache.PIPELINE_SOURCES:
+        if (chroma_dir() / source).is_dir():
+            shutil.copytree(chroma_dir() / source, root / source)
+        else:
+            shutil.copy(chroma_dir() / source, root / source)
+    monkeypatch.setattr(palette_cache, "chroma_dir", lambda: root)
+
+    image = fixtures / "images/image_small.jpg"
+    monkeypatch.setattr(palette_cache, "_SOURCE_DIGEST", None)
+    key = palette_key(image, "pillow", {})
+
+    # Editing a helper of the generators, and not only the backend, changes
+    # every key
+    with open(root / "utils/palette.py", "a") as f:
+        f.write("\n# edited\n")
+    monkeypatch.setattr(palette_cache, "_SOURCE_DIGEST", None)
+    assert palette_key(image, "pillow", {}) != key
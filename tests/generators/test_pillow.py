@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from chroma import generator
+from chroma.utils.palette import CONTRAST_PAIRS, pixel_histogram, top_colors
+
+pytest.importorskip("PIL")
+
+
+def test_pillow_output_dict(fixtures):
+    retval = generator.generate(
+        name="pillow",
+        image_path=fixtures / "images/image_small.jpg",
+    )
+    assert type(retval) is dict, f"Unexpected return value, expected dict, got {retval}"
+    assert len(retval) == 29, f"Number of output colors must be 29, got {len(retval)}"
+
+
+def test_pillow_matches_magick_pipeline(fixtures):
+    from chroma.colors.contrast import contrast_ratio, luminances
+    from chroma.generators.pillow import load_pixels
+
+    pixels = load_pixels(fixtures / "images/image_large.jpg", image_size=64)
+    assert pixels.shape == (64, 64, 3) and pixels.dtype == np.uint8
+
+    retval = generator.generate(
+        name="pillow",
+        image_path=fixtures / "images/image_large.jpg",
+        image_size=64,
+    )
+    for name, against, ratio in CONTRAST_PAIRS:
+        lum = luminances([retval[name], retval[against]])
+        assert contrast_ratio(lum[0], lum[1]) >= ratio, f"{name} on {against}"
+
+
+def test_pixel_histogram():
+    pixels = np.array(
+        [[[255, 0, 0], [0, 0, 255]], [[255, 0, 0], [0, 0, 255]], [[0, 255, 0]] * 2]
+    )
+    pixels[2, 1] = [255, 0, 0]
+    packed, counts = pixel_histogram(pixels)
+    assert packed.tolist() == [0x0000FF, 0x00FF00, 0xFF0000]
+    assert counts.tolist() == [2, 1, 3]
+
+    packed, counts = top_colors(packed, counts, max_colors=2)
+    assert packed.tolist() == [0xFF0000, 0x0000FF]
+    assert counts.tolist() == [3, 2]
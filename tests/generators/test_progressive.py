@@ -0,0 +1,56 @@
+import math
+
+import pytest
+
+from chroma import generator
+from chroma.colors import ColorHex
+from chroma.generator import palette_distance, progressive_sizes
+
+pytest.importorskip("PIL")
+
+
+def test_progressive_sizes():
+    assert progressive_sizes(256) == [32, 64, 128, 256]
+    assert progressive_sizes(200) == [32, 64, 128, 200]
+    assert progressive_sizes(32) == [32]
+    assert progressive_sizes(16) == [16]
+
+
+def test_palette_distance():
+    a = {"background": ColorHex("#101010"), "accent": ColorHex("#e16920")}
+    assert palette_distance(a, dict(a)) == pytest.approx(0.0)
+    assert palette_distance(a, {**a, "accent": ColorHex("#2069e1")}) > 0.1
+    assert math.isinf(palette_distance(a, {"background": a["background"]}))
+
+
+def test_progressive_refines_to_full_size(fixtures):
+    image = fixtures / "images/image_large.jpg"
+
+    # A negative tolerance never settles, so every size is generated
+    steps = list(
+        generator.generate_progressive(
+            name="pillow", image_path=image, image_size=128, tolerance=-1
+        )
+    )
+    assert [size for size, _ in steps] == [32, 64, 128]
+
+    final = generator.generate(name="pillow", image_path=image, image_size=128)
+    assert {k: str(v) for k, v in steps[-1][1].items()} == {
+        k: str(v) for k, v in final.items()
+    }
+
+
+def test_progressive_stops_once_settled(fixtures):
+    steps = generator.generate_progressive(
+        name="pillow",
+        image_path=fixtures / "images/image_small.jpg",
+        tolerance=math.inf,
+    )
+    assert [size for size, _ in steps] == [32, 64]
+
+
+def test_progressive_rejects_unknown_backend(fixtures):
+    with pytest.raises(ValueError):
+        generator.generate_progressive(
+            name="nope", image_path=fixtures / "images/image_small.jpg"
+        )
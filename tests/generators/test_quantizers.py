@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from chroma import generator
+from chroma.colors.convert import pack_rgb
+from chroma.generators.quantizers import QUANTIZERS, quantize
+
+
+def gradient_histogram():
+    # A smooth gradient between two colors, with some noise, like a sky
+    rng = np.random.default_rng(0)
+    ramp = np.linspace([20, 40, 120], [240, 180, 90], 2000)
+    rgb = np.clip(np.rint(ramp + rng.normal(0, 4, ramp.shape)), 0, 255)
+    packed, counts = np.unique(pack_rgb(rgb), return_counts=True)
+    return packed, counts
+
+
+@pytest.mark.parametrize("engine", list(QUANTIZERS))
+def test_quantizer_reduces_histogram(engine):
+    packed, counts = gradient_histogram()
+    quantized, quantized_counts = quantize(packed, counts, engine, n_colors=16)
+
+    assert 1 <= len(quantized) <= 16
+    assert len(np.unique(quantized)) == len(quantized)
+    assert quantized_counts.sum() == counts.sum()
+    assert (np.diff(quantized_counts) <= 0).all()
+
+    # The same histogram always gives the same palette
+    again, _ = quantize(packed, counts, engine, n_colors=16)
+    assert np.array_equal(again, quantized)
+
+
+@pytest.mark.parametrize("engine", list(QUANTIZERS))
+def test_quantizer_keeps_small_histograms(engine):
+    packed = np.array([0xFF0000, 0x00FF00, 0x0000FF, 0x101010], dtype=np.uint32)
+    counts = np.array([5, 3, 8, 1])
+
+    quantized, quantized_counts = quantize(packed, counts, engine, n_colors=8)
+    assert quantized.tolist() == [0x0000FF, 0xFF0000, 0x00FF00, 0x101010]
+    assert quantized_counts.tolist() == [8, 5, 3, 1]
+
+    quantized, quantized_counts = quantize(packed, counts, engine, n_colors=1)
+    assert len(quantized) == 1 and quantized_counts.tolist() == [17]
+
+
+def test_quantize_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        quantize([0xFF0000], [1], "popularity")
+    with pytest.raises(ValueError):
+        quantize([0xFF0000], [1], "octree", n_colors=0)
+
+
+def test_pillow_quantized_palette(fixtures):
+    pytest.importorskip("PIL")
+    retval = generator.generate(
+        name="pillow",
+        image_path=fixtures / "images/image_large.jpg",
+        image_size=64,
+        quantizer="median-cut",
+        quantize_colors=32,
+    )
+    assert len(retval) == 29, f"Number of output colors must be 29, got {len(retval)}"
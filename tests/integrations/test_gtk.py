@@ -1,5 +1,6 @@
 from chroma import theme
 
+
 def test_gtk_integration(global_setup_teardown, fixtures):
     tmpdir = global_setup_teardown
 
@@ -19,3 +20,48 @@ def test_gtk_integration(global_setup_teardown, fixtures):
     # Asserts
     assert (tmpdir / "out.gtk3").exists(), "Output file does not exist"
     assert (tmpdir / "out.gtk4").exists(), "Output file does not exist"
+
+    # Palettes 3 to 5 are unset, so they are synthesized from palette 1
+    with open(tmpdir / "out.gtk3", mode="r") as f:
+        lines = f.read().splitlines()
+    for i in range(1, 6):
+        for name in ["blue", "light", "dark"]:
+            assert any(line.startswith(f"@define-color {name}_{i} ") for line in lines)
+    assert "@define-color blue_1 #abcdef;" in lines
+
+
+def test_gtk_keeps_non_hex_palette_colors(global_setup_teardown):
+    from chroma.integrations.gtk import GTK_PALETTE_VALID_COLORS, GTKIntegration
+
+    tmpdir = global_setup_teardown
+    palette = {name: "#abcdef" for name in GTK_PALETTE_VALID_COLORS}
+    palette["blue"] = "@accent_color"
+    palette["dark"] = "shade(@window_bg_color, 0.5)"
+    group = {
+        "colors": {"accent_color": "#abcdef"},
+        "palettes": {"palette1": palette},
+        "out": {"gtk3": str(tmpdir / "out.gtk3"), "gtk4": str(tmpdir / "out.gtk4")},
+        "sidebar_patch": "",
+    }
+    GTKIntegration(group, {}, {}).apply()
+
+    with open(tmpdir / "out.gtk4", mode="r") as f:
+        lines = f.read().splitlines()
+
+    # The colors which aren't hex are passed through, and only those which
+    # are get synthesized
+    assert "@define-color blue_1 @accent_color;" in lines
+    assert "@define-color dark_1 shade(@window_bg_color, 0.5);" in lines
+    assert not any(line.startswith("@define-color blue_3 ") for line in lines)
+    for i in range(1, 6):
+        assert any(line.startswith(f"@define-color green_{i} ") for line in lines)
+
+
+def test_gtk_validate_palette():
+    from chroma.integrations.gtk import GTK_PALETTE_VALID_COLORS, validate_palette
+
+    palette = {name: "#abcdef" for name in GTK_PALETTE_VALID_COLORS}
+    assert validate_palette(palette, 1) is True
+    assert validate_palette({**palette, "pink": "#ff00ff"}, 2) is False
+    del palette["blue"]
+    assert validate_palette(palette, 3) is False
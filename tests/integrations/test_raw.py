@@ -1,5 +1,6 @@
 from chroma import theme
 
+
 def test_raw_integration(global_setup_teardown, fixtures):
     tmpdir = global_setup_teardown
 
@@ -18,3 +19,27 @@ def test_raw_integration(global_setup_teardown, fixtures):
 
     # Asserts
     assert (tmpdir / "out.raw").exists(), "Output file does not exist"
+    with open(tmpdir / "out.raw", mode="r") as f:
+        lines = f.read().splitlines()
+    assert "black = #abcdef 153" in lines, "Missing xterm-256 index"
+
+
+def test_raw_integration_skips_unused_xterm_table(global_setup_teardown, monkeypatch):
+    from chroma.integrations import raw
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The xterm table was loaded without being used")
+
+    monkeypatch.setattr(raw, "load_table", fail)
+    out = global_setup_teardown / "out.raw"
+    group = {
+        "testing": {
+            "colors": {"black": "#abcdef"},
+            "format": "{name} = {hex}",
+            "out": str(out),
+        }
+    }
+    raw.RawIntegration(group, {}, {}).apply()
+    assert out.read_text().splitlines() == ["black = #abcdef"]
+
+    assert raw.template_fields("{name} {xterm256:>3}") == {"name", "xterm256"}